@@ -0,0 +1,112 @@
+"""Synthetic YAML corpora for the benchmarks.
+
+Every generator is deterministic and takes a size ``n``; ``CORPORA`` maps a
+corpus name to its generator and full-scale size.
+"""
+
+from typing import Callable, Dict, Tuple
+
+# Not real credentials; shaped to trip policies/security/secrets.yaml.
+_AWS_KEY = "AKIA" + "ABCDEFGHIJKLMNOP"
+_GH_TOKEN = "ghp_" + "a1B2c3D4e5F6g7H8i9J0k1L2m3N4o5P6q7R8"
+
+
+def _container(i: int, indent: str) -> str:
+    tag = "latest" if i % 3 == 0 else f"1.{i % 20}.{i % 7}"
+    lines = [
+        f"- name: app-{i}",
+        f"  image: registry.example.com/team/app-{i % 50}:{tag}",
+        "  ports:",
+        f"  - containerPort: {8000 + i % 1000}",
+        "  env:",
+        "  - name: LOG_LEVEL",
+        "    value: info",
+        f"  - name: SHARD\n    value: '{i}'",
+    ]
+    if i % 2:
+        lines += [
+            "  resources:",
+            "    limits:",
+            "      cpu: 500m",
+            "      memory: 256Mi",
+        ]
+    return "".join(f"{indent}{ln}\n" for ln in "\n".join(lines).splitlines())
+
+
+def _pod(name: str, containers: int, start: int = 0) -> str:
+    body = "".join(_container(start + i, "  ") for i in range(containers))
+    return (
+        "apiVersion: v1\n"
+        "kind: Pod\n"
+        "metadata:\n"
+        f"  name: {name}\n"
+        "  labels:\n"
+        f"    app: {name}\n"
+        "spec:\n"
+        "  containers:\n"
+        f"{body}"
+    )
+
+
+def huge_pod(n: int) -> str:
+    """One Pod with ``n`` containers."""
+    return _pod("huge", n)
+
+
+def multi_doc_bundle(n: int) -> str:
+    """``n`` small Pods in one multi-document stream."""
+    return "---\n".join(_pod(f"pod-{i}", 2, i * 2) for i in range(n))
+
+
+def deep_workflow(n: int, depth: int = 12) -> str:
+    """A GitHub Actions workflow with ``n`` jobs of deeply nested ``with:`` blocks."""
+    out = ["name: ci\n", "on: [push, pull_request]\n", "jobs:\n"]
+    for j in range(n):
+        out.append(f"  job-{j}:\n    runs-on: ubuntu-latest\n    steps:\n")
+        for s in range(8):
+            ref = "main" if (j + s) % 5 == 0 else "8f4b7f84864484a7bf31766abe9204da3cbe65b3"
+            out.append(f"    - uses: actions/step-{s}@{ref}\n")
+            out.append("      with:\n")
+            pad = "        "
+            for d in range(depth):
+                out.append(f"{pad}level{d}:\n")
+                pad += "  "
+            out.append(f"{pad}value: job-{j}-step-{s}\n")
+            if (j + s) % 7 == 0:
+                out.append(f"      env:\n        TOKEN: {_GH_TOKEN}\n")
+    return "".join(out)
+
+
+def secret_env(n: int) -> str:
+    """A Deployment whose container has ``n`` env vars, every tenth a leaked key."""
+    env = []
+    for i in range(n):
+        value = _AWS_KEY if i % 10 == 0 else f"value-{i}-" + "x" * (i % 40)
+        env.append(f"        - name: VAR_{i}\n          value: '{value}'\n")
+    return (
+        "apiVersion: apps/v1\n"
+        "kind: Deployment\n"
+        "metadata:\n"
+        "  name: secrets\n"
+        "spec:\n"
+        "  template:\n"
+        "    spec:\n"
+        "      containers:\n"
+        "      - name: app\n"
+        "        image: app:1.0\n"
+        "        env:\n"
+        f"{''.join(env)}"
+    )
+
+
+CORPORA: Dict[str, Tuple[Callable[[int], str], int]] = {
+    "huge_pod": (huge_pod, 2000),
+    "multi_doc_bundle": (multi_doc_bundle, 5000),
+    "deep_workflow": (deep_workflow, 200),
+    "secret_env": (secret_env, 5000),
+}
+
+
+def generate(name: str, scale: float = 1.0) -> str:
+    fn, full = CORPORA[name]
+    return fn(max(1, int(full * scale)))
@@ -0,0 +1,300 @@
+"""Benchmark runner and regression gate.
+
+Usage:
+  python -m benchmarks.run run [--scale 1.0] [--repeat 3] [--only PATTERN] [-o results.json]
+  python -m benchmarks.run compare BASELINE.json RESULTS.json [--threshold 0.25]
+
+``run`` generates each corpus in ``benchmarks.corpus`` and times every stage
+on it: ``load_yaml`` (with the default parser backend), ``parse_<name>`` for
+each installed parser backend (``core.backend``), ``apply_rules`` (all
+policies under ``policies/``), ``guess_location`` and ``suggest_for_file`` (on
+the first ``FINDINGS_LIMIT`` findings), ``canonicalize``, the CLI end to end
+(a subprocess, ``--no-cache``) and ``POST /v1/validate`` through the
+TestClient. Each case records the best of ``--repeat`` runs, the throughput in
+MB/s of YAML and the peak memory: Python allocations under tracemalloc for
+in-process stages, the child's max RSS for the CLI. Results are printed as a
+table and written as JSON with ``-o``.
+
+``compare`` exits 1 if any case present in both files got slower (or used
+more memory) than the baseline by more than the threshold. Cases faster than
+``--min-seconds`` (or peaks under 1 MiB) in the baseline are too noisy to
+gate on and only reported. Passing ``--baseline`` to ``run`` does both in
+one step.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.corpus import CORPORA, generate
+
+ROOT = Path(__file__).resolve().parents[1]
+STAGES = (
+    "load_yaml",
+    "apply_rules",
+    "guess_location",
+    "suggest_for_file",
+    "canonicalize",
+    "cli",
+    "api_validate",
+)
+FINDINGS_LIMIT = 200
+MIN_PEAK_BYTES = 1 << 20  # smaller peaks are too noisy to gate on
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _traced_peak(fn: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _run_cli(path: str, rules_path: str) -> int:
+    """Run the CLI on ``path``; returns the child's peak RSS in bytes (0 if unknown)."""
+    cmd = [sys.executable, "-m", "yamlguard.cli.main", path, "--rules", rules_path, "--no-cache"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    else:  # pragma: no cover - no wait4 on Windows
+        proc.wait()
+        peak = 0
+    err = proc.stderr.read().decode("utf-8", "replace")
+    proc.stderr.close()
+    if proc.returncode not in (0, 1):  # 1 = findings
+        raise RuntimeError(f"CLI failed ({proc.returncode}): {err.strip()}")
+    return peak
+
+
+def _api_client():
+    # Keep everything in this process (so tracemalloc sees it) and out of the
+    # request size and rate limits; explicit settings in the environment win.
+    os.environ.setdefault("YG_WORKERS", "0")
+    os.environ.setdefault("MAX_BYTES", str(1 << 31))
+    os.environ.setdefault("RL_MAX_REQUESTS", str(1 << 30))
+    from fastapi.testclient import TestClient
+
+    from yamlguard.server.main import app
+
+    return TestClient(app)
+
+
+def run(
+    scale: float = 1.0,
+    repeat: int = 3,
+    only: Optional[List[str]] = None,
+    out=sys.stdout,
+) -> Dict[str, Any]:
+    from yamlguard.cli.cache import tool_version
+    from yamlguard.core.backend import available, backend
+    from yamlguard.core.loader import load_yaml
+    from yamlguard.core.locate import guess_location
+    from yamlguard.core.optimize import canonicalize
+    from yamlguard.core.policy import PolicyRegistry
+    from yamlguard.core.recommend import suggest_for_file
+    from yamlguard.core.rules import apply_rules, compile_rules
+
+    def wanted(case: str) -> bool:
+        return not only or any(fnmatch.fnmatchcase(case, pat) for pat in only)
+
+    parsers = {f"parse_{name}": backend(name) for name in available()}
+    rules = list(PolicyRegistry(str(ROOT / "policies")).snapshot().rules)
+    compiled = compile_rules(rules)
+    results: Dict[str, Dict[str, Any]] = {}
+    out.write(f"{'case':<36} {'seconds':>10} {'MB/s':>9} {'peak MiB':>9}\n")
+
+    with tempfile.TemporaryDirectory(prefix="yamlguard-bench-") as tmp, _api_client() as client:
+        rules_path = os.path.join(tmp, "rules.json")
+        with open(rules_path, "w", encoding="utf-8") as fh:
+            json.dump(rules, fh)
+
+        for name in CORPORA:
+            cases = [s for s in (*STAGES[:1], *parsers, *STAGES[1:]) if wanted(f"{name}/{s}")]
+            if not cases:
+                continue
+            text = generate(name, scale)
+            size = len(text.encode("utf-8"))
+            path = os.path.join(tmp, f"{name}.yaml")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            doc = load_yaml(text)
+            findings = apply_rules(doc, compiled)[:FINDINGS_LIMIT]
+            payload = {"files": [{"path": f"{name}.yaml", "content": text}], "rules": rules}
+
+            def locate_all(text=text, findings=findings):
+                for f in findings:
+                    guess_location(text, f.get("path", ""), f.get("values", []))
+
+            def post(payload=payload):
+                resp = client.post("/v1/validate", json=payload)
+                resp.raise_for_status()
+
+            stages: Dict[str, Callable[[], Any]] = {
+                "load_yaml": lambda text=text: load_yaml(text),
+                **{
+                    stage: lambda text=text, parser=parser: parser.load_all(StringIO(text))
+                    for stage, parser in parsers.items()
+                },
+                "apply_rules": lambda doc=doc: apply_rules(doc, compiled),
+                "guess_location": locate_all,
+                "suggest_for_file": lambda text=text, findings=findings: suggest_for_file(
+                    "bench.yaml", findings, text
+                ),
+                "canonicalize": lambda doc=doc: canonicalize(doc),
+                "cli": lambda path=path: _run_cli(path, rules_path),
+                "api_validate": post,
+            }
+            for stage in cases:
+                fn = stages[stage]
+                seconds = _best_of(fn, repeat)
+                peak = fn() if stage == "cli" else _traced_peak(fn)
+                case = f"{name}/{stage}"
+                results[case] = {
+                    "seconds": seconds,
+                    "mb_per_s": size / 1e6 / seconds if seconds else 0.0,
+                    "peak_bytes": peak,
+                    "bytes": size,
+                }
+                out.write(
+                    f"{case:<36} {seconds:10.4f} {results[case]['mb_per_s']:9.2f} "
+                    f"{peak / 2**20:9.1f}\n"
+                )
+                out.flush()
+
+    return {
+        "meta": {
+            "scale": scale,
+            "repeat": repeat,
+            "findings_limit": FINDINGS_LIMIT,
+            "yamlguard": tool_version(),
+            "yaml_backend": backend().name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.25,
+    min_seconds: float = 0.005,
+    out=sys.stdout,
+) -> List[str]:
+    """Regressed case names (slower or bigger than baseline by more than ``threshold``)."""
+    bscale, cscale = baseline["meta"].get("scale"), current["meta"].get("scale")
+    if bscale != cscale:
+        raise ValueError(f"baseline was run at scale {bscale}, results at {cscale}")
+    regressions = []
+    out.write(f"{'case':<36} {'time':>8} {'memory':>8}\n")
+    for case, new in current["results"].items():
+        old = baseline["results"].get(case)
+        if old is None:
+            out.write(f"{case:<36} {'new':>8}\n")
+            continue
+        dt = new["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        dm = new["peak_bytes"] / old["peak_bytes"] - 1 if old["peak_bytes"] else 0.0
+        gated = old["seconds"] >= min_seconds
+        bad = (gated and dt > threshold) or (old["peak_bytes"] >= MIN_PEAK_BYTES and dm > threshold)
+        if bad:
+            regressions.append(case)
+        note = "  REGRESSION" if bad else ("" if gated else "  (below --min-seconds)")
+        out.write(f"{case:<36} {dt:+8.1%} {dm:+8.1%}{note}\n")
+    return regressions
+
+
+def _read(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _gate(baseline: str, current: Dict[str, Any], args) -> int:
+    try:
+        bad = compare(_read(baseline), current, args.threshold, args.min_seconds)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if bad:
+        print(f"{len(bad)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    gate = argparse.ArgumentParser(add_help=False)
+    gate.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown / memory growth (default: 0.25 = 25%%)",
+    )
+    gate.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.005,
+        help="Do not gate on the time of cases faster than this in the baseline",
+    )
+
+    r = sub.add_parser("run", parents=[gate], help="Run the benchmarks")
+    r.add_argument(
+        "--scale", type=float, default=1.0, help="Corpus size relative to the full sizes"
+    )
+    r.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    r.add_argument(
+        "--only",
+        action="append",
+        metavar="PATTERN",
+        help="Only cases matching this glob, e.g. 'huge_pod/*' or '*/load_yaml' (repeatable)",
+    )
+    r.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    r.add_argument("--baseline", help="Compare against this results file and gate on it")
+
+    c = sub.add_parser("compare", parents=[gate], help="Compare results against a baseline")
+    c.add_argument("baseline")
+    c.add_argument("results")
+
+    args = ap.parse_args(argv)
+    if args.command == "compare":
+        return _gate(args.baseline, _read(args.results), args)
+
+    current = run(args.scale, max(1, args.repeat), args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(current, fh, indent=2)
+    return _gate(args.baseline, current, args) if args.baseline else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+# src/yamlguard/cli/autofix.py
+"""Writing autofix results back to files.
+
+All of a file's fixes are computed in memory as one combined patch
+(``suggest_for_file``) and written once: through a temp file in the same
+directory + ``os.replace`` (so a crash never leaves a half-written file), with
+the original permission bits and line endings. Files the patch leaves equal
+are not touched.
+"""
+
+import os
+import stat
+import tempfile
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+
+@dataclass
+class FixResult:
+    path: str
+    removed: int  # bytes of the original replaced by the patch
+    added: int  # bytes the patch put in their place
+    written: bool  # False for --dry-run
+
+
+def newline_of(newlines: Union[str, Tuple[str, ...], None]) -> str:
+    """Line ending to write back, from a text file object's ``newlines``.
+
+    Files mixing endings are written with CRLF if they use it at all.
+    """
+    if isinstance(newlines, tuple):
+        return "\r\n" if "\r\n" in newlines else newlines[0]
+    return newlines or "\n"
+
+
+def changed_span(before: bytes, after: bytes) -> Tuple[int, int]:
+    """``(removed, added)`` bytes between the common prefix and suffix."""
+    n = min(len(before), len(after))
+    head = _longest(n, lambda k: before[:k] == after[:k])
+    tail = _longest(n - head, lambda k: before[len(before) - k :] == after[len(after) - k :])
+    return len(before) - head - tail, len(after) - head - tail
+
+
+def _longest(n: int, holds) -> int:
+    """Largest ``k <= n`` with ``holds(k)``, for a ``holds`` that is monotone in ``k``."""
+    lo, hi = 0, n  # slice comparisons run in C, so bisecting beats a byte loop
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if holds(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def write_fix(
+    path: str, text: str, patched: str, newline: str = "\n", dry_run: bool = False
+) -> Optional[FixResult]:
+    """Replace ``path`` (read as ``text``) with ``patched``; None if nothing changes."""
+    if patched == text:
+        return None
+    before = text.replace("\n", newline).encode("utf-8")
+    after = patched.replace("\n", newline).encode("utf-8")
+    removed, added = changed_span(before, after)
+    if dry_run:
+        return FixResult(path, removed, added, False)
+    mode = stat.S_IMODE(os.stat(path).st_mode)
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(after)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return FixResult(path, removed, added, True)
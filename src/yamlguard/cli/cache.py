@@ -0,0 +1,143 @@
+# src/yamlguard/cli/cache.py
+"""On-disk, content-addressed cache of per-file findings for the CLI.
+
+Entries are keyed by hash(yamlguard version + rule set fingerprint + file
+content), so an entry is only reused when neither the file, the rules nor the
+tool changed. Writes go through a temp file + ``os.replace`` and readers treat
+any unreadable entry as a miss, which keeps parallel CI jobs sharing one
+workspace safe without locks.
+
+The cache size is tracked in a small ledger (``USAGE_FILE``): every write
+appends its size, and ``evict`` only walks the cache when the ledger says
+the bound may have been crossed, so a run that adds nothing costs one read.
+"""
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import tempfile
+from typing import Optional
+
+DEFAULT_CACHE_DIR = ".yamlguard-cache"
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+USAGE_FILE = ".usage"
+
+
+def tool_version() -> str:
+    try:
+        return importlib.metadata.version("yamlguard")
+    except importlib.metadata.PackageNotFoundError:
+        return "0.0.0"
+
+
+class ResultCache:
+    def __init__(self, root: str, rules_fingerprint: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._salt = f"{tool_version()}\0{rules_fingerprint}\0".encode("utf-8")
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(self._salt + text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[list]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                findings = json.load(fh)
+            os.utime(path)  # recency for eviction
+        except (OSError, ValueError):
+            return None
+        return findings if isinstance(findings, list) else None
+
+    def put(self, key: str, findings: list) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump(findings, fh)
+                size = os.path.getsize(tmp)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        except (OSError, TypeError, ValueError):
+            return  # caching is best effort (e.g. read-only workspace, non-JSON values)
+        self._record(f"{size}\n")
+
+    def _record(self, line: str) -> None:
+        # A single short O_APPEND write, so concurrent runs do not interleave.
+        try:
+            fd = os.open(
+                os.path.join(self.root, USAGE_FILE), os.O_WRONLY | os.O_APPEND | os.O_CREAT
+            )
+            try:
+                os.write(fd, line.encode("ascii"))
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    def usage(self) -> Optional[int]:
+        """Bytes recorded in the ledger, or None when there is no ledger yet.
+
+        Overwritten entries are counted twice, so this may overestimate (which
+        only triggers an earlier, correcting walk) but does not underestimate.
+        """
+        try:
+            with open(os.path.join(self.root, USAGE_FILE), "r", encoding="ascii") as fh:
+                return sum(int(ln) for ln in fh if ln.strip())
+        except (OSError, ValueError):
+            return None
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache is under its size bound.
+
+        The cache is only walked when the ledger is missing or over the bound.
+        """
+        if not os.path.isdir(self.root):
+            return
+        used = self.usage()
+        if used is not None and used <= self.max_bytes:
+            return
+        entries = []
+        total = 0
+        for dirpath, _dirs, files in os.walk(self.root):
+            if dirpath == self.root:
+                continue  # the ledger lives at the top; entries are in subdirectories
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total > self.max_bytes:
+            target = int(self.max_bytes * 0.8)
+            for _mtime, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue  # already removed by a concurrent run
+                total -= size
+                if total <= target:
+                    break
+        self._reset_usage(total)
+
+    def _reset_usage(self, total: int) -> None:
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="ascii") as fh:
+                fh.write(f"{total}\n")
+            os.replace(tmp, os.path.join(self.root, USAGE_FILE))
+        except OSError:
+            pass
@@ -0,0 +1,294 @@
+# src/yamlguard/cli/daemon.py
+"""A local daemon that runs CLI invocations in a warm process.
+
+``yamlguard daemon`` imports everything the CLI needs once and listens on a
+Unix domain socket. While it runs, ``yamlguard ...`` sends its arguments,
+working directory and ``YG_*`` environment there and relays the output and
+exit status instead of importing, parsing rules and compiling them itself;
+rule sets stay compiled across invocations in ``compile_rules``' cache, keyed
+by their content, so an edited rules file takes effect on the next run.
+When no daemon answers, or it runs a different copy of yamlguard, the CLI
+runs in-process as before (``--no-daemon`` forces that).
+
+Invocations are served one at a time, each as an ordinary in-process run in
+the client's directory. The protocol is one JSON object per line: the client
+sends ``{"argv", "cwd", "env", "identity"}`` (or ``{"command"}`` for
+``--status`` / ``--stop``), the daemon answers ``{"fd", "data"}`` chunks of
+stdout (1) / stderr (2) and then ``{"exit": status}``, or ``{"error"}``
+when it refuses.
+
+This module only imports the standard library, so the client side stays
+cheap on the CLI's startup path.
+"""
+
+import contextlib
+import io
+import json
+import os
+import select
+import signal
+import socket
+import sys
+from typing import IO, Iterator, List, Optional
+
+SOCKET_ENV = "YG_DAEMON_SOCKET"
+# Imported before serving, so the first invocation is as fast as the rest.
+WARM_MODULES = (
+    "yamlguard.cli.main",
+    "yamlguard.cli.autofix",
+    "yamlguard.cli.cache",
+    "yamlguard.cli.files",
+    "yamlguard.cli.output",
+    "yamlguard.core.backend",
+    "yamlguard.core.loader",
+    "yamlguard.core.locate",
+    "yamlguard.core.profile",
+    "yamlguard.core.recommend",
+    "yamlguard.core.rules",
+    "concurrent.futures.process",
+)
+
+
+def socket_path() -> str:
+    """``YG_DAEMON_SOCKET``, else ``yamlguard.sock`` in ``$XDG_RUNTIME_DIR`` or ``~/.cache``."""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "yamlguard.sock")
+    return os.path.join(os.path.expanduser("~"), ".cache", "yamlguard", "daemon.sock")
+
+
+def identity() -> str:
+    """Which yamlguard code this process runs: package location + newest source mtime.
+
+    A daemon started before an upgrade (or an edit of an editable install)
+    no longer matches its clients, which then run in-process.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    newest = 0
+    for d, _, names in os.walk(root):
+        for n in names:
+            if n.endswith(".py"):
+                newest = max(newest, os.stat(os.path.join(d, n)).st_mtime_ns)
+    return f"{root}:{newest}"
+
+
+def _messages(sock: socket.socket) -> Iterator[dict]:
+    with sock.makefile("r", encoding="utf-8") as fh:
+        for line in fh:
+            yield json.loads(line)
+
+
+def _send(sock: socket.socket, request: dict, out: IO[str], err: IO[str]) -> Optional[int]:
+    """Send ``request`` and relay the answer; None if it was refused before any output."""
+    sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    relayed = False
+    try:
+        for msg in _messages(sock):
+            if "data" in msg:
+                (out if msg["fd"] == 1 else err).write(msg["data"])
+                relayed = True
+            elif "exit" in msg:
+                return msg["exit"]
+            elif "error" in msg and not relayed:
+                print(f"yamlguard: daemon: {msg['error']}; running in-process", file=err)
+                return None
+    except (OSError, ValueError):
+        pass
+    if not relayed:
+        return None
+    print("yamlguard: lost the connection to the daemon", file=err)
+    return 2
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def run_via_daemon(argv: List[str], out: IO[str] = None, err: IO[str] = None) -> Optional[int]:
+    """Run the CLI with ``argv`` in the daemon; its exit status, or None if none is serving."""
+    sock = _connect(socket_path())
+    if sock is None:
+        return None
+    request = {
+        "argv": list(argv),
+        "cwd": os.getcwd(),
+        "env": {k: v for k, v in os.environ.items() if k.startswith("YG_")},
+        "identity": identity(),
+    }
+    with sock:
+        try:
+            return _send(sock, request, out or sys.stdout, err or sys.stderr)
+        except OSError:
+            return None
+
+
+class _Relay(io.TextIOBase):
+    """A text stream that forwards writes to the client as ``{"fd", "data"}`` messages."""
+
+    def __init__(self, wfile: IO[str], fd: int):
+        self._wfile = wfile
+        self._fd = fd
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if s:
+            self._wfile.write(json.dumps({"fd": self._fd, "data": s}) + "\n")
+        return len(s)
+
+    def flush(self) -> None:
+        self._wfile.flush()
+
+
+@contextlib.contextmanager
+def _client_context(cwd: str, env: dict):
+    """Run in the client's directory with its ``YG_*`` variables, restoring ours after."""
+    saved_cwd = os.getcwd()
+    saved_env = {k: v for k, v in os.environ.items() if k.startswith("YG_")}
+    os.chdir(cwd)
+    for k in saved_env:
+        if k not in env:
+            del os.environ[k]
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.chdir(saved_cwd)
+        for k in env:
+            os.environ.pop(k, None)
+        os.environ.update(saved_env)
+
+
+def _exit_status(exc: SystemExit) -> int:
+    if exc.code is None or isinstance(exc.code, int):
+        return exc.code or 0
+    print(exc.code, file=sys.stderr)  # sys.exit("message"): printed, status 1
+    return 1
+
+
+class Daemon:
+    def __init__(self, path: str):
+        self.path = path
+        self.identity = identity()
+        self.served = 0
+        self._stopping = False
+
+    def serve(self) -> None:
+        for name in WARM_MODULES:
+            __import__(name)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if _connect(self.path) is not None:
+            raise SystemExit(f"a yamlguard daemon is already listening on {self.path}")
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)  # left behind by a daemon that did not exit cleanly
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # the socket is only usable by this user
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        # SIGTERM / SIGINT stop the daemon after the invocation in hand: the
+        # handler sets a flag and the wakeup fd ends the wait for connections.
+        wake_r, wake_w = socket.socketpair()
+        wake_w.setblocking(False)
+        signal.set_wakeup_fd(wake_w.fileno())
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._stop)
+        print(f"yamlguard daemon listening on {self.path} (pid {os.getpid()})", file=sys.stderr)
+        try:
+            with server, wake_r, wake_w:
+                while not self._stopping:
+                    ready, _, _ = select.select([server, wake_r], [], [])
+                    if server not in ready:
+                        continue
+                    conn, _ = server.accept()
+                    with conn, contextlib.suppress(OSError):  # e.g. the client went away
+                        self.handle(conn)
+        finally:
+            signal.set_wakeup_fd(-1)
+            with contextlib.suppress(OSError):
+                os.unlink(self.path)
+
+    def _stop(self, *_) -> None:
+        self._stopping = True
+
+    def handle(self, conn: socket.socket) -> None:
+        with conn.makefile("r", encoding="utf-8") as rfile:
+            try:
+                request = json.loads(rfile.readline())
+            except (OSError, ValueError):
+                return
+        with conn.makefile("w", encoding="utf-8") as wfile:
+
+            def answer(**msg) -> None:
+                wfile.write(json.dumps(msg) + "\n")
+
+            command = request.get("command")
+            if command == "status":
+                answer(fd=1, data=f"pid {os.getpid()}, {self.served} invocation(s) served\n")
+                answer(exit=0)
+            elif command == "stop":
+                self._stopping = True
+                answer(exit=0)
+            elif request.get("identity") != self.identity:
+                answer(error="it runs a different copy of yamlguard; restart it")
+            else:
+                answer(exit=self.run(request, wfile))
+                self.served += 1
+            with contextlib.suppress(OSError):
+                wfile.flush()
+
+    def run(self, request: dict, wfile: IO[str]) -> int:
+        from yamlguard.cli.main import run
+
+        out, err = _Relay(wfile, 1), _Relay(wfile, 2)
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                with _client_context(request["cwd"], request.get("env") or {}):
+                    run(request["argv"])
+                return 0
+            except SystemExit as exc:
+                return _exit_status(exc)
+            except Exception:
+                import traceback
+
+                traceback.print_exc()
+                return 1
+
+
+def main(argv: List[str]) -> int:
+    """``yamlguard daemon``: serve in the foreground, or query / stop a running daemon."""
+    import argparse
+
+    ap = argparse.ArgumentParser("yamlguard daemon", description=__doc__.split("\n\n")[0])
+    ap.add_argument(
+        "--socket", default=socket_path(), help=f"Socket to listen on (default: ${SOCKET_ENV})"
+    )
+    group = ap.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true", help="Report whether a daemon is running")
+    group.add_argument("--stop", action="store_true", help="Ask the running daemon to exit")
+    args = ap.parse_args(argv)
+    if args.status or args.stop:
+        sock = _connect(args.socket)
+        if sock is None:
+            print(f"no yamlguard daemon on {args.socket}", file=sys.stderr)
+            return 1
+        with sock:
+            command = {"command": "status" if args.status else "stop"}
+            status = _send(sock, command, sys.stdout, sys.stderr)
+        return 1 if status is None else status
+    Daemon(args.socket).serve()
+    return 0
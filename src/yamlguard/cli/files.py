@@ -0,0 +1,296 @@
+# src/yamlguard/cli/files.py
+"""File selection for the CLI: directory walking, ignore files and git changed files."""
+
+import fnmatch
+import glob
+import os
+import re
+import subprocess
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+YAML_GLOB = "*.y*ml"
+IGNORE_FILE = ".yamlguardignore"
+
+# Directories never descended into while walking (VCS metadata, dependencies, caches).
+DEFAULT_EXCLUDE_DIRS = (
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "vendor",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".tox",
+    ".yamlguard-cache",
+)
+
+
+def is_yaml_name(name: str) -> bool:
+    return fnmatch.fnmatch(name, YAML_GLOB)
+
+
+def _translate(pattern: str) -> str:
+    """Translate one gitignore-style glob into a regex over '/'-separated paths."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1 : j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """A small gitignore-compatible matcher (comments, ``!`` negation, ``/`` anchoring,
+    trailing ``/`` for directories, ``*``/``?``/``**`` globs)."""
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._rules = []
+        for raw in patterns:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line  # a leading or inner slash anchors to the root
+            line = line.lstrip("/")
+            body = _translate(line)
+            regex = re.compile(("^" if anchored else "^(?:.*/)?") + body + "$")
+            self._rules.append((regex, negate, dir_only))
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    @classmethod
+    def from_file(cls, path: str) -> "IgnoreRules":
+        return cls(_read_lines(path))
+
+    def _match(self, relpath: str, is_dir: bool) -> bool:
+        ignored = False
+        for regex, negate, dir_only in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath):
+                ignored = not negate
+        return ignored
+
+    def ignored(self, relpath: str, is_dir: bool = False) -> bool:
+        """True if ``relpath`` (relative, '/'-separated) or any parent directory is ignored."""
+        parts = relpath.strip("/").split("/")
+        for i in range(1, len(parts)):
+            if self._match("/".join(parts[:i]), True):
+                return True
+        return self._match("/".join(parts), is_dir)
+
+
+def _git(args: List[str], cwd: str) -> str:
+    try:
+        proc = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except FileNotFoundError as e:
+        raise SystemExit("git not found; required for --changed-since") from e
+    if proc.returncode != 0:
+        raise SystemExit(f"git {' '.join(args)} failed: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+def _under(path: str, scopes: List[str]) -> bool:
+    return any(path == s or path.startswith(s.rstrip(os.sep) + os.sep) for s in scopes)
+
+
+def changed_yaml_files(
+    ref: str, scopes: Optional[List[str]] = None, cwd: Optional[str] = None
+) -> List[str]:
+    """YAML files added, copied, modified or renamed relative to ``ref``.
+
+    Uses the local git binary only: committed, staged and unstaged changes are
+    compared against ``ref``, and untracked files are included unless
+    ``.gitignore`` excludes them. Paths matched by the repository's
+    ``.yamlguardignore`` are dropped, and ``scopes`` (files or directories)
+    further restricts the result. Returned paths are relative to ``cwd``.
+    """
+    cwd = os.path.realpath(cwd or os.getcwd())
+    top = _git(["rev-parse", "--show-toplevel"], cwd).strip()
+    # Resolve the ref to a commit first so a value such as "--output=..." can
+    # never be taken as an option by git diff.
+    try:
+        verify = ["rev-parse", "--verify", "--quiet", "--end-of-options", f"{ref}^{{commit}}"]
+        sha = _git(verify, top)
+    except SystemExit:
+        raise SystemExit(f"--changed-since: {ref!r} is not a commit") from None
+    changed = _git(["diff", "--name-only", "--diff-filter=ACMR", "-z", sha.strip(), "--"], top)
+    untracked = _git(["ls-files", "--others", "--exclude-standard", "-z"], top)
+    ignore = IgnoreRules.from_file(os.path.join(top, IGNORE_FILE))
+    abs_scopes = [os.path.realpath(os.path.join(cwd, s)) for s in scopes or []]
+
+    out: List[str] = []
+    seen = set()
+    for rel in (changed + untracked).split("\0"):
+        if not rel or rel in seen or not is_yaml_name(os.path.basename(rel)):
+            continue
+        seen.add(rel)
+        if ignore and ignore.ignored(rel):
+            continue
+        full = os.path.join(top, rel)
+        if not os.path.isfile(full):
+            continue
+        if abs_scopes and not _under(full, abs_scopes):
+            continue
+        out.append(os.path.relpath(full, cwd))
+    return sorted(out)
+
+
+def find_ignore_file(start: Optional[str] = None) -> Optional[str]:
+    """The ``.yamlguardignore`` that applies to ``start`` (default: the cwd).
+
+    Looks in ``start`` and its parents, stopping at the repository root (the
+    first directory containing ``.git``).
+    """
+    d = os.path.abspath(start or os.getcwd())
+    while True:
+        candidate = os.path.join(d, IGNORE_FILE)
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(d)
+        if os.path.exists(os.path.join(d, ".git")) or parent == d:
+            return None
+        d = parent
+
+
+def _included(relpath: str, include: Sequence[str]) -> bool:
+    name = relpath.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(relpath if "/" in pat else name, pat) for pat in include)
+
+
+def iter_yaml_files(
+    paths: Iterable[str],
+    include: Sequence[str] = (YAML_GLOB,),
+    exclude: Sequence[str] = (),
+    ignore_file: Optional[str] = None,
+    hidden: bool = False,
+) -> Iterator[str]:
+    """Stream files to validate, as they are discovered.
+
+    Directories are walked with ``os.scandir`` (entries sorted for a stable
+    order), pruning ``DEFAULT_EXCLUDE_DIRS``, anything matched by ``exclude``
+    (gitignore syntax, relative to the walked directory) and anything matched
+    by ``ignore_file`` (gitignore syntax, relative to the ignore file's own
+    directory, as git does). Files under a directory must match one of the ``include``
+    globs and, unless ``hidden`` is set, dot-files and dot-directories are
+    skipped as ``glob`` does; files named explicitly or via a glob are always
+    yielded. Every file
+    is yielded once, by real path, and symlinked directories are followed
+    without looping.
+    """
+    rules = IgnoreRules([*(f"{d}/" for d in DEFAULT_EXCLUDE_DIRS), *exclude])
+    ignore = IgnoreRules(_read_lines(ignore_file)) if ignore_file else IgnoreRules()
+    ignore_root = os.path.dirname(os.path.abspath(ignore_file)) if ignore else ""
+    seen_files = set()
+    seen_dirs = set()
+
+    def emit(path: str) -> Iterator[str]:
+        real = os.path.realpath(path)
+        if real not in seen_files:
+            seen_files.add(real)
+            yield path
+
+    def anchor(root: str) -> Optional[str]:
+        """``root`` relative to the ignore file's directory; None if outside it."""
+        if not ignore:
+            return None
+        rel = os.path.relpath(os.path.abspath(root), ignore_root)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return "" if rel == os.curdir else rel.replace(os.sep, "/") + "/"
+
+    def skipped(base: Optional[str], rel: str, is_dir: bool) -> bool:
+        if rules.ignored(rel, is_dir=is_dir):
+            return True
+        return base is not None and ignore.ignored(base + rel, is_dir=is_dir)
+
+    def walk(root: str) -> Iterator[str]:
+        base = anchor(root)
+        stack = [(root, "")]
+        while stack:
+            path, rel = stack.pop()
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in seen_dirs:
+                continue  # symlink loop or overlapping argument
+            seen_dirs.add((st.st_dev, st.st_ino))
+            try:
+                with os.scandir(path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                if not hidden and entry.name.startswith("."):
+                    continue
+                child_rel = f"{rel}/{entry.name}" if rel else entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    if not skipped(base, child_rel, True):
+                        subdirs.append((entry.path, child_rel))
+                elif not skipped(base, child_rel, False) and _included(child_rel, include):
+                    yield from emit(entry.path)
+            stack.extend(reversed(subdirs))
+
+    for p in paths:
+        if os.path.isdir(p):
+            yield from walk(p)
+            continue
+        for match in glob.iglob(p):
+            if os.path.isdir(match):
+                yield from walk(match)
+            else:
+                yield from emit(match)
+
+
+def _read_lines(path: str) -> List[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return fh.readlines()
+    except OSError:
+        return []
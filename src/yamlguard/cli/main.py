@@ -1,41 +1,195 @@
 # src/yamlguard/cli/main.py
+"""The ``yamlguard`` command.
+
+The entry point hands the invocation to a running ``yamlguard daemon`` when
+there is one (see ``daemon``); the modules an in-process run needs are only
+imported once it is clear the run happens here.
+"""
+
+from __future__ import annotations
+
 import argparse
-import glob
-import json
 import os
 import sys
+from collections import deque
+from typing import TYPE_CHECKING
 
-from yamlguard.core.loader import load_yaml
-from yamlguard.core.locate import guess_location  # add import
-from yamlguard.core.recommend import suggest_for_file, suggest_for_finding
-from yamlguard.core.rules import apply_rules
+from yamlguard.cli import daemon
 
-try:
-    import yaml as pyyaml
-except Exception:  # pragma: no cover
-    pyyaml = None
+if TYPE_CHECKING:
+    from yamlguard.cli.cache import ResultCache
 
 
 def _load_rules(path: str | None):
+    from yamlguard.core.backend import backend
+
     if not path:
         return []
-    if not pyyaml:
-        raise SystemExit("pyyaml not installed; required to load rules")
     with open(path, "r", encoding="utf-8") as f:
-        return pyyaml.safe_load(f) or []
+        docs = backend().load_all(f)
+    return (docs[0] if docs else None) or []
+
+
+def _evaluate(text: str, rules, profiler=None) -> list:
+    # Documents are parsed, evaluated and located one at a time, so only the
+    # document at hand is held in memory (plus the text and the findings).
+    from yamlguard.core.loader import PositionIndex, iter_documents
+    from yamlguard.core.locate import locate_finding
+    from yamlguard.core.rules import iter_findings
+
+    positions = PositionIndex(text)
+    lines = text.splitlines()
+    fs = []
+    for x in iter_findings(iter_documents(text), rules, profiler=profiler):
+        fs.append(x)
+        ln, col, snip = locate_finding(text, x, positions, lines)
+        if ln is not None:
+            x["line"] = ln
+        if col is not None:
+            x["column"] = col
+        if snip:
+            x["snippet"] = snip
+    return fs
+
+
+def _check_file(
+    p: str,
+    rules,
+    mode: str | None,
+    cache: ResultCache | None = None,
+    profile: bool = False,
+    fix: str | None = None,
+):
+    """Validate one file and, with ``fix`` ("write" or "dry-run"), autofix it.
+
+    Returns (findings, suggestions, profile rows or None, FixResult or None).
+    Profiling bypasses the cache so every file's rule costs are measured. All
+    fixes are applied as one combined patch, written once.
+    """
+    with open(p, "r", encoding="utf-8") as fh:
+        text = fh.read()
+        newlines = fh.newlines
+    fs = None
+    profiler = None
+    if profile:
+        from yamlguard.core.profile import RuleProfiler
+
+        profiler = RuleProfiler()
+    if cache is not None and not profile:
+        key = cache.key(text)
+        fs = cache.get(key)
+    if fs is None:
+        fs = _evaluate(text, rules, profiler)
+        if cache is not None and not profile:
+            cache.put(key, fs)
+    for x in fs:
+        x["file"] = p
+
+    suggestions = []
+    fixed = None
+    if fs and (mode or fix):
+        # difflib and the round-trip machinery only load when fixes are wanted
+        from yamlguard.core.recommend import suggest_for_file, suggest_for_finding
+
+        if mode == "combine":
+            s = suggest_for_file(p, fs, text)
+            if s:
+                suggestions.append(s)
+        elif mode == "each":
+            for x in fs:
+                s = suggest_for_finding(p, x, text)
+                if s:
+                    suggestions.append(s)
+        if fix:
+            from yamlguard.cli.autofix import newline_of, write_fix
+
+            if mode == "combine":
+                combined = suggestions[0] if suggestions else None
+            else:
+                combined = suggest_for_file(p, fs, text)
+            if combined:
+                patched = combined.patched_text
+                fixed = write_fix(p, text, patched, newline_of(newlines), fix == "dry-run")
+    return fs, suggestions, profiler.rows() if profiler else None, fixed
+
 
+# Per-process state for --jobs workers: the rule set is compiled once per worker.
+_worker_rules = None
+_worker_cache = None
 
-def _expand(paths):
-    for p in paths:
-        if os.path.isdir(p):
-            yield from glob.glob(os.path.join(p, "**/*.y*ml"), recursive=True)
-        else:
-            yield from glob.glob(p)
 
+def _init_worker(rules: list, cache: ResultCache | None) -> None:
+    from yamlguard.core.rules import compile_rules
+
+    global _worker_rules, _worker_cache
+    _worker_rules = compile_rules(rules)
+    _worker_cache = cache
+
+
+def _check_in_worker(p: str, mode: str | None, profile: bool = False, fix: str | None = None):
+    return _check_file(p, _worker_rules, mode, _worker_cache, profile, fix)
+
+
+def _iter_results(
+    paths,
+    rules,
+    mode: str | None,
+    jobs: int,
+    cache: ResultCache | None = None,
+    profile: bool = False,
+    fix: str | None = None,
+):
+    """Yield (path, findings, suggestions, profile rows, fix result) in input order,
+    serially or from a process pool (fixes are written by the workers)."""
+    if jobs == 1:
+        for p in paths:
+            yield (p, *_check_file(p, rules, mode, cache, profile, fix))
+        return
+    # Submit files as they are discovered, keeping a bounded window in flight,
+    # and yield results in submission order.
+    from concurrent.futures import ProcessPoolExecutor
+
+    window = jobs * 8
+    pending = deque()
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(rules.source, cache)
+    ) as pool:
+        for p in paths:
+            pending.append((p, pool.submit(_check_in_worker, p, mode, profile, fix)))
+            if len(pending) >= window:
+                p0, fut = pending.popleft()
+                yield (p0, *fut.result())
+        while pending:
+            p0, fut = pending.popleft()
+            yield (p0, *fut.result())
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Console entry point: ``yamlguard daemon ...``, or a run (in the daemon if one serves)."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["daemon"]:
+        sys.exit(daemon.main(argv[1:]))
+    if "--no-daemon" not in argv:
+        status = daemon.run_via_daemon(argv)
+        if status is not None:
+            sys.exit(status)
+    run(argv)
+
+
+def run(argv: list[str]) -> None:
+    """Run the CLI in this process; exits with 1 if there are findings."""
+    from yamlguard.cli.cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache, tool_version
+    from yamlguard.cli.files import (
+        YAML_GLOB,
+        changed_yaml_files,
+        find_ignore_file,
+        iter_yaml_files,
+    )
+    from yamlguard.cli.output import FORMATS, make_writer
+    from yamlguard.core.rules import compile_rules
 
-def main():
     ap = argparse.ArgumentParser("yamlguard")
-    ap.add_argument("paths", nargs="+", help="Files or globs to validate")
+    ap.add_argument("paths", nargs="*", help="Files or globs to validate")
     ap.add_argument("--rules", help="Rules YAML file (list)")
     ap.add_argument(
         "--optimize",
@@ -43,52 +197,164 @@ def main():
         help="Write canonicalized YAML back to files",
     )
     ap.add_argument("--suggest", action="store_true", help="Print suggested fixes (diffs)")
-    ap.add_argument("--autofix", action="store_true", help="Apply safe fixes to files")
+    ap.add_argument(
+        "--autofix",
+        action="store_true",
+        help="Apply safe fixes to files (all of a file's fixes in one write)",
+    )
+    ap.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --autofix, report the files and bytes that would change without writing",
+    )
     ap.add_argument(
         "--combine",
         action="store_true",
         help="Combine multiple suggestions into one patch per file",
     )
-    args = ap.parse_args()
+    ap.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help=(
+            "When walking directories, only validate files whose name (or, for a GLOB "
+            f"containing '/', relative path) matches GLOB (default: {YAML_GLOB})"
+        ),
+    )
+    ap.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Skip files/directories matching GLOB (gitignore syntax; repeatable)",
+    )
+    ap.add_argument(
+        "--hidden",
+        action="store_true",
+        help="Also walk dot-files and dot-directories (e.g. .github/)",
+    )
+    ap.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Only validate YAML files added/modified relative to git REF "
+        "(restricted to the given paths, if any)",
+    )
+    ap.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="json",
+        help="json: one document at the end (default); ndjson: one finding per line as "
+        "produced plus a summary line; sarif: SARIF 2.1.0 written incrementally",
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Validate files in N worker processes (0 = one per CPU)",
+    )
+    ap.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached per-file results (default: {DEFAULT_CACHE_DIR})",
+    )
+    ap.add_argument("--no-cache", action="store_true", help="Do not read or write the cache")
+    ap.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size",
+    )
+    ap.add_argument(
+        "--profile-rules",
+        action="store_true",
+        help="Report time, matched nodes, regex calls and findings per rule assertion "
+        "on stderr, most expensive first (bypasses the cache)",
+    )
+    ap.add_argument(
+        "--profile-json",
+        metavar="PATH",
+        help="With --profile-rules, also write the profile as JSON to PATH",
+    )
+    ap.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even if a yamlguard daemon is running",
+    )
+    args = ap.parse_args(argv)
+    if not args.paths and not args.changed_since:
+        ap.error("the following arguments are required: paths")
+    if args.jobs < 0:
+        ap.error("--jobs must be >= 0")
+    if args.dry_run and not args.autofix:
+        ap.error("--dry-run requires --autofix")
+    jobs = args.jobs or os.cpu_count() or 1
+
+    rules = compile_rules(_load_rules(args.rules))
+    for rule_id, msg in rules.errors + rules.risky:
+        print(f"warning: rule {rule_id}: {msg}", file=sys.stderr)
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, rules.fingerprint, args.cache_max_mb * 1024 * 1024)
+
+    mode = None
+    if args.combine:
+        mode = "combine"
+    elif args.suggest:
+        mode = "each"
+    fix = None
+    if args.autofix:
+        fix = "dry-run" if args.dry_run else "write"
 
-    rules = _load_rules(args.rules)
+    if args.changed_since:
+        paths = changed_yaml_files(args.changed_since, args.paths)
+    else:
+        paths = iter_yaml_files(
+            args.paths,
+            include=args.include or (YAML_GLOB,),
+            exclude=args.exclude,
+            ignore_file=find_ignore_file(),
+            hidden=args.hidden,
+        )
 
-    findings = []
-    for p in _expand(args.paths):
-        with open(p, "r", encoding="utf-8") as fh:
-            text = fh.read()
-        doc = load_yaml(text)
-        fs = apply_rules(doc, rules)
+    writer = make_writer(args.format, tool_version())
+    # keep stdout machine-readable for the streaming formats
+    diff_out = sys.stdout if args.format == "json" else sys.stderr
+    profile = args.profile_rules or bool(args.profile_json)
+    profiler = None
+    if profile:
+        from yamlguard.core.profile import RuleProfiler
+
+        profiler = RuleProfiler()
+    fixed_files = removed = added = 0
+    writer.begin()
+    results = _iter_results(paths, rules, mode, jobs, cache, profile, fix)
+    for p, fs, suggestions, rows, fixed in results:
+        if rows:
+            profiler.merge(rows)
+        for s in suggestions:
+            print(s.diff, file=diff_out)
+        if fixed:
+            verb = "fixed" if fixed.written else "would fix"
+            print(f"{verb} {p} (-{fixed.removed}/+{fixed.added} bytes)", file=sys.stderr)
+            fixed_files += 1
+            removed += fixed.removed
+            added += fixed.added
         for x in fs:
-            x["file"] = p
-            ln, snip = guess_location(text, x.get("path", ""), x.get("values", []))
-            if ln is not None:
-                x["line"] = ln
-            if snip:
-                x["snippet"] = snip
-        if args.suggest or args.autofix or args.combine:
-            if args.combine:
-                s = suggest_for_file(p, fs, text)
-                if s:
-                    if args.suggest or args.combine:
-                        print(s.diff)
-                    if args.autofix:
-                        with open(p, "w", encoding="utf-8") as out:
-                            out.write(s.patched_text)
-            else:
-                for x in fs:
-                    s = suggest_for_finding(p, x, text)
-                    if s:
-                        if args.suggest:
-                            print(s.diff)
-                        if args.autofix:
-                            with open(p, "w", encoding="utf-8") as out:
-                                out.write(s.patched_text)
-
-        findings.extend(fs)
-
-    print(json.dumps({"ok": len(findings) == 0, "findings": findings}, indent=2))
-    sys.exit(1 if findings else 0)
+            writer.add(x)
+        writer.file_done(p)
+
+    if cache is not None:
+        cache.evict()
+    writer.end()
+    if fix:
+        verb = "fixed" if fix == "write" else "would fix"
+        print(f"autofix: {verb} {fixed_files} file(s) (-{removed}/+{added} bytes)", file=sys.stderr)
+    if profiler is not None:
+        profiler.report(sys.stderr)
+        if args.profile_json:
+            profiler.dump(args.profile_json)
+    sys.exit(1 if writer.count else 0)
 
 
 if __name__ == "__main__":  # pragma: no cover
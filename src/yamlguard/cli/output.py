@@ -0,0 +1,145 @@
+# src/yamlguard/cli/output.py
+"""Finding writers for the CLI's --format option.
+
+``json`` keeps the historical single document printed at the end. ``ndjson``
+and ``sarif`` write each finding as soon as it is produced and do not keep
+findings in memory, so long scans can be consumed while they run.
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+from typing import Dict, Optional, TextIO
+
+FORMATS = ("json", "ndjson", "sarif")
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+_SARIF_LEVELS = {"critical": "error", "high": "error", "medium": "warning"}
+
+
+class FindingWriter:
+    def __init__(self, out: Optional[TextIO] = None):
+        self.out = out or sys.stdout
+        self.files = 0
+        self.count = 0
+        self.by_severity: Counter = Counter()
+
+    def begin(self) -> None:
+        pass
+
+    def add(self, finding: dict) -> None:
+        self.count += 1
+        self.by_severity[finding.get("severity", "unknown")] += 1
+
+    def file_done(self, path: str) -> None:
+        self.files += 1
+
+    def summary(self) -> dict:
+        return {
+            "ok": self.count == 0,
+            "files": self.files,
+            "findings": self.count,
+            "by_severity": dict(sorted(self.by_severity.items())),
+        }
+
+    def end(self) -> None:
+        pass
+
+
+class JsonWriter(FindingWriter):
+    def __init__(self, out: Optional[TextIO] = None):
+        super().__init__(out)
+        self.findings = []
+
+    def add(self, finding: dict) -> None:
+        super().add(finding)
+        self.findings.append(finding)
+
+    def end(self) -> None:
+        doc = {"ok": self.count == 0, "findings": self.findings}
+        print(json.dumps(doc, indent=2), file=self.out)
+
+
+class NdjsonWriter(FindingWriter):
+    """One finding per line, flushed immediately, then a ``{"summary": ...}`` line."""
+
+    def add(self, finding: dict) -> None:
+        super().add(finding)
+        self.out.write(json.dumps(finding) + "\n")
+        self.out.flush()
+
+    def end(self) -> None:
+        self.out.write(json.dumps({"summary": self.summary()}) + "\n")
+        self.out.flush()
+
+
+class SarifWriter(FindingWriter):
+    """SARIF 2.1.0 log written incrementally: results first, the tool/rules block last.
+
+    The compact summary goes to stderr so stdout stays a valid SARIF document.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None, version: str = "0.0.0"):
+        super().__init__(out)
+        self.version = version
+        self.rules: Dict[str, dict] = {}
+
+    def begin(self) -> None:
+        head = json.dumps({"$schema": SARIF_SCHEMA, "version": "2.1.0"})[:-1]
+        self.out.write(head + ', "runs": [{"results": [\n')
+        self.out.flush()
+
+    def add(self, finding: dict) -> None:
+        rid = finding.get("rule_id", "RULE")
+        if rid not in self.rules:
+            rule = {"id": rid, "properties": {"severity": finding.get("severity")}}
+            if finding.get("remediation"):
+                rule["help"] = {"text": finding["remediation"]}
+            self.rules[rid] = rule
+        result = {
+            "ruleId": rid,
+            "level": _SARIF_LEVELS.get(finding.get("severity"), "note"),
+            "message": {"text": finding.get("message", "")},
+        }
+        if finding.get("file"):
+            location = {"artifactLocation": {"uri": _uri(finding["file"])}}
+            if finding.get("line"):
+                region = {"startLine": finding["line"]}
+                if finding.get("column"):
+                    region["startColumn"] = finding["column"]
+                location["region"] = region
+                if finding.get("snippet"):
+                    location["contextRegion"] = {
+                        "startLine": max(1, finding["line"] - 1),
+                        "snippet": {"text": finding["snippet"]},
+                    }
+            result["locations"] = [{"physicalLocation": location}]
+        self.out.write(("" if self.count == 0 else ",\n") + json.dumps(result))
+        self.out.flush()
+        super().add(finding)
+
+    def end(self) -> None:
+        tool = {
+            "driver": {
+                "name": "yamlguard",
+                "version": self.version,
+                "rules": list(self.rules.values()),
+            }
+        }
+        self.out.write('\n], "tool": ' + json.dumps(tool) + "}]}\n")
+        self.out.flush()
+        print(json.dumps({"summary": self.summary()}), file=sys.stderr)
+
+
+def _uri(path: str) -> str:
+    path = os.path.relpath(path) if os.path.isabs(path) else path
+    return path.replace(os.sep, "/")
+
+
+def make_writer(fmt: str, version: str = "0.0.0") -> FindingWriter:
+    if fmt == "ndjson":
+        return NdjsonWriter()
+    if fmt == "sarif":
+        return SarifWriter(version=version)
+    return JsonWriter()
@@ -1 +1 @@
-__all__ = ["load_yaml", "dump_yaml", "apply_rules", "canonicalize"]
+__all__ = ["load_yaml", "dump_yaml", "apply_rules", "compile_rules", "canonicalize"]
@@ -0,0 +1,194 @@
+"""Safe YAML parser backends.
+
+Everything yamlguard parses as data (files under validation, policy and rule
+files) goes through one backend:
+
+* ``libyaml``: PyYAML's C loader (PyYAML built against libyaml); parses an
+  order of magnitude faster than the pure-Python loaders.
+* ``pyyaml``: PyYAML's pure-Python safe loader.
+* ``ruamel``: ruamel.yaml's pure-Python safe loader, the reference.
+
+``YG_YAML_BACKEND`` selects one by name; ``auto`` (the default), and a named
+backend that is not installed, use the fastest available. The output is the
+same whichever backend parses: the PyYAML loaders resolve plain scalars with
+ruamel's YAML 1.2 rules (``yes``, ``on`` and ``1:30`` are strings, ``017`` is
+17, ``1e3`` is a float) and reject duplicate keys as it does. The corpus in
+``tests/conformance`` checks this. A ``%YAML 1.1`` directive is only
+honoured by ``ruamel``.
+
+Node positions (``loader.PositionIndex``, composed with ``ruamel_nodes``)
+and the round-trip editing in ``recommend`` need ruamel's node and comment
+model and do not go through a backend.
+"""
+
+import os
+import re
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from ruamel.yaml import YAML
+from ruamel.yaml.compat import ordereddict
+from ruamel.yaml.constructor import SafeConstructor
+from ruamel.yaml.docinfo import DocInfo, version
+from ruamel.yaml.resolver import implicit_resolvers as _RUAMEL_RESOLVERS
+from ruamel.yaml.util import create_timestamp
+
+try:
+    import yaml as _pyyaml
+except ImportError:  # optional: PyYAML, with libyaml for the C loader
+    _pyyaml = None
+
+NAMES = ("libyaml", "pyyaml", "ruamel")  # fastest first
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+_TIMESTAMP = re.compile(SafeConstructor.timestamp_regexp.pattern, re.X)
+
+
+class Backend:
+    """A safe loader: plain dicts, lists, scalars (no custom tags)."""
+
+    name = ""
+
+    def documents(self, stream: IO[str]) -> Iterator[Tuple[int, Any]]:
+        """Yield ``(start_line, document)`` per document, parsing only as far as asked."""
+        raise NotImplementedError
+
+    def load_all(self, stream: IO[str]) -> List[Any]:
+        return [doc for _, doc in self.documents(stream)]
+
+    def __repr__(self) -> str:
+        return f"<yaml backend {self.name}>"
+
+
+class _Ruamel(Backend):
+    name = "ruamel"
+
+    def documents(self, stream: IO[str]) -> Iterator[Tuple[int, Any]]:
+        for constructor, node in ruamel_nodes(stream):
+            yield node.start_mark.line + 1, constructor.construct_document(node)
+
+
+def ruamel_nodes(stream: IO[str]) -> Iterator[Tuple[Any, Any]]:
+    """``(constructor, root node)`` per document of ``stream``, composed one at a time."""
+    y = YAML(typ="safe", pure=True)
+    # YAML.load_all keeps one DocInfo per document; the scanner records
+    # %YAML directives in the last one.
+    y.doc_infos.append(DocInfo(requested_version=version(y.version)))
+    constructor, parser = y.get_constructor_parser(stream)
+    try:
+        composer = constructor.composer
+        while composer.check_node():
+            yield constructor, composer.get_node()
+            y.doc_infos.append(DocInfo(requested_version=version(y.version)))
+    finally:
+        parser.dispose()
+
+
+class _PyYAML(Backend):
+    def __init__(self, name: str, loader: type):
+        self.name = name
+        self._loader = _yaml12(loader)
+
+    def documents(self, stream: IO[str]) -> Iterator[Tuple[int, Any]]:
+        loader = self._loader(stream)
+        try:
+            while loader.check_node():
+                node = loader.get_node()
+                yield node.start_mark.line + 1, loader.construct_document(node)
+        finally:
+            loader.dispose()
+
+
+def _yaml12(base: type) -> type:
+    """A subclass of PyYAML loader ``base`` that constructs what ruamel's safe loader does."""
+
+    class Loader(base):
+        yaml_implicit_resolvers: Dict[Any, list] = {}
+
+        def construct_mapping(self, node, deep=False):
+            # As ruamel: merged-in keys may be overridden but explicit keys must
+            # be unique, and sequence keys become tuples.
+            if not isinstance(node, _pyyaml.MappingNode):
+                return super().construct_mapping(node, deep=deep)
+            explicit = sum(1 for k, _ in node.value if k.tag != _MERGE_TAG)
+            self.flatten_mapping(node)
+            merged = len(node.value) - explicit
+            mapping, seen = {}, set()
+            for i, (key_node, value_node) in enumerate(node.value):
+                key = self.construct_object(key_node, deep=True)
+                if isinstance(key, list):
+                    key = tuple(key)
+                try:
+                    hash(key)
+                except TypeError:
+                    raise _error(node, "found unhashable key", key_node) from None
+                if i >= merged:
+                    if key in seen:
+                        raise _error(node, f'found duplicate key "{key}"', key_node)
+                    seen.add(key)
+                mapping[key] = self.construct_object(value_node, deep=deep)
+            return mapping
+
+    for versions, tag, regexp, first in _RUAMEL_RESOLVERS:
+        if (1, 2) in versions:
+            Loader.add_implicit_resolver(tag, re.compile(regexp.pattern, regexp.flags), first)
+    Loader.add_constructor("tag:yaml.org,2002:int", _construct_int)
+    Loader.add_constructor("tag:yaml.org,2002:timestamp", _construct_timestamp)
+    Loader.add_constructor("tag:yaml.org,2002:omap", _construct_omap)
+    return Loader
+
+
+def _error(node, problem: str, at) -> Exception:
+    return _pyyaml.constructor.ConstructorError(
+        "while constructing a mapping", node.start_mark, problem, at.start_mark
+    )
+
+
+def _construct_int(loader, node) -> int:
+    """YAML 1.2 integers: ``0o`` octal, and a leading ``0`` is just a digit."""
+    value = loader.construct_scalar(node).replace("_", "")
+    sign = -1 if value[0] == "-" else 1
+    if value[0] in "+-":
+        value = value[1:]
+    for prefix, base in (("0b", 2), ("0x", 16), ("0o", 8)):
+        if value.startswith(prefix):
+            return sign * int(value[2:], base)
+    return sign * int(value)
+
+
+def _construct_timestamp(loader, node):
+    """Timestamps built by ruamel's code (its tzinfo objects differ from PyYAML's)."""
+    match = _TIMESTAMP.match(loader.construct_scalar(node))
+    if match is None:
+        raise _pyyaml.constructor.ConstructorError(
+            None, None, f'failed to construct timestamp from "{node.value}"', node.start_mark
+        )
+    return create_timestamp(**match.groupdict())
+
+
+def _construct_omap(loader, node):
+    omap = ordereddict()
+    yield omap
+    steps = loader.construct_yaml_omap(node)
+    pairs = next(steps)
+    for _ in steps:  # fills ``pairs``
+        pass
+    omap.update(pairs)
+
+
+_BACKENDS: Dict[str, Backend] = {"ruamel": _Ruamel()}
+if _pyyaml is not None:
+    _BACKENDS["pyyaml"] = _PyYAML("pyyaml", _pyyaml.SafeLoader)
+    if getattr(_pyyaml, "CSafeLoader", None) is not None:
+        _BACKENDS["libyaml"] = _PyYAML("libyaml", _pyyaml.CSafeLoader)
+
+
+def available() -> Tuple[str, ...]:
+    """Names of the installed backends, fastest first."""
+    return tuple(n for n in NAMES if n in _BACKENDS)
+
+
+def backend(name: Optional[str] = None) -> Backend:
+    """The backend ``name`` (default: ``YG_YAML_BACKEND``), or the fastest if unavailable."""
+    wanted = (name or os.environ.get("YG_YAML_BACKEND", "auto")).strip().lower() or "auto"
+    if wanted != "auto" and wanted not in NAMES:
+        raise ValueError(f"YG_YAML_BACKEND must be 'auto' or one of {NAMES}, not {wanted!r}")
+    return _BACKENDS.get(wanted) or _BACKENDS[available()[0]]
@@ -1,8 +1,296 @@
-from jsonpath_ng.ext import parse
+import re
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_\-]*$")
+_SEGMENT = re.compile(r"\.([A-Za-z_][A-Za-z0-9_\-]*)|\[(\d+)\]|\['((?:[^'\\]|\\.)*)'\]")
+_UNESCAPE = re.compile(r"\\(.)")
+
+Segment = Union[str, int]  # mapping keys are str, sequence positions are int
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str):
+    """Parse a JSONPath expression once; later calls reuse the cached AST."""
+    from jsonpath_ng.ext import parse  # on first use: rule sets without paths never need it
+
+    return parse(path)
 
 
 def match(doc, path: str):
     try:
-        return [m.value for m in parse(path).find(doc)]
+        return [m.value for m in compile_path(path).find(doc)]
     except Exception:
         return []
+
+
+def format_path(segments: Iterable[Segment]) -> str:
+    """Render concrete segments: ``("spec", "containers", 1)`` -> ``$.spec.containers[1]``."""
+    out = ["$"]
+    for seg in segments:
+        if isinstance(seg, int):
+            out.append(f"[{seg}]")
+        elif _IDENT.match(seg):
+            out.append(f".{seg}")
+        else:
+            out.append("['" + seg.replace("\\", "\\\\").replace("'", "\\'") + "']")
+    return "".join(out)
+
+
+@lru_cache(maxsize=4096)
+def parse_concrete_path(path: str) -> Optional[tuple]:
+    """Inverse of ``format_path``; None when ``path`` is not in that form."""
+    if not path.startswith("$"):
+        return None
+    segments = []
+    pos = 1
+    while pos < len(path):
+        m = _SEGMENT.match(path, pos)
+        if m is None:
+            return None
+        name, index, quoted = m.groups()
+        if name is not None:
+            segments.append(name)
+        elif index is not None:
+            segments.append(int(index))
+        else:
+            segments.append(_UNESCAPE.sub(r"\1", quoted))
+        pos = m.end()
+    return tuple(segments)
+
+
+def concrete_path(unit: Any, datum) -> Optional[str]:
+    """Concrete path of a jsonpath_ng match inside ``unit`` (None if it is not a document node).
+
+    jsonpath_ng wraps scalars and mappings in a one-element list when ``[*]`` is
+    applied to them; those synthetic ``[0]`` steps are dropped by re-walking the
+    real document alongside the match's context chain.
+    """
+    from jsonpath_ng.jsonpath import Fields, Index
+
+    steps = []
+    while datum is not None:
+        steps.append(datum.path)
+        datum = datum.context
+    segments: list = []
+    cur = unit
+    for step in reversed(steps):
+        if isinstance(step, Fields) and len(step.fields) == 1:
+            key = step.fields[0]
+            if not isinstance(cur, dict) or key not in cur:
+                return None
+            cur = cur[key]
+            segments.append(str(key))
+        elif isinstance(step, Index) and len(step.indices) == 1:
+            i = step.indices[0]
+            if isinstance(cur, list):
+                i = i + len(cur) if i < 0 else i
+                cur = cur[i]
+                segments.append(i)
+            elif i != 0:
+                return None
+        elif isinstance(step, Fields):
+            return None
+    return format_path(segments)
+
+
+# Rule paths are nearly always ``$`` followed by ``.name``, ``.*``, ``[n]``,
+# ``[*]`` and ``..name`` / ``..*`` steps. Those are evaluated natively, step
+# by step over plain lists, instead of through jsonpath_ng's per-node
+# ``DatumInContext`` objects; anything else (filters, slices, unions, quoted
+# names, ...) still goes through jsonpath_ng. The native steps reproduce
+# jsonpath_ng's results, their order and its quirks (``[*]`` on a mapping or a
+# scalar selects the value itself, ``[n]`` indexes strings, ``..`` yields the
+# mapping values of every node but not sequence items); tests/test_jsonpath.py
+# checks that differentially.
+_FAST_STEP = re.compile(
+    r"(?P<dots>\.\.?)(?:(?P<name>[A-Za-z_][A-Za-z0-9_\-]*)|\*)|\[(?:(?P<index>-?\d+)|\*)\]"
+)
+_RESERVED = frozenset({"where", "wherenot", "true", "false"})  # keywords to jsonpath_ng
+_SCALARS = (int, float, str, bool)
+
+
+def _field(items: list, name: str) -> list:
+    return [v[name] for v in items if isinstance(v, dict) and name in v]
+
+
+def _field_located(items: list, name: str) -> list:
+    return [
+        (v[name], None if p is None else p + (name,))
+        for v, p in items
+        if isinstance(v, dict) and name in v
+    ]
+
+
+def _star(items: list, _) -> list:
+    return [x for v in items if isinstance(v, dict) for x in v.values()]
+
+
+def _star_located(items: list, _) -> list:
+    return [
+        (x, None if p is None else p + (str(k),))
+        for v, p in items
+        if isinstance(v, dict)
+        for k, x in v.items()
+    ]
+
+
+def _index(items: list, i: int) -> list:
+    # The same test as jsonpath_ng, so a value without len() raises as it does.
+    return [v[i] for v in items if not isinstance(v, dict) and v and -len(v) <= i < len(v)]
+
+
+def _index_located(items: list, i: int) -> list:
+    return [
+        (v[i], _index_path(v, p, i))
+        for v, p in items
+        if not isinstance(v, dict) and v and -len(v) <= i < len(v)
+    ]
+
+
+def _index_path(v: Any, p: Optional[tuple], i: int) -> Optional[tuple]:
+    if p is None:
+        return None
+    if isinstance(v, list):
+        return p + (i + len(v) if i < 0 else i,)
+    return p if i == 0 else None  # a string's characters have no node of their own
+
+
+def _each(items: list, _) -> list:
+    out: list = []
+    for v in items:
+        if v is None:
+            continue
+        if isinstance(v, (dict, *_SCALARS)):
+            out.append(v)
+        else:
+            out.extend(v[i] for i in range(len(v)))
+    return out
+
+
+def _each_located(items: list, _) -> list:
+    out: list = []
+    for v, p in items:
+        if v is None:
+            continue
+        if isinstance(v, (dict, *_SCALARS)):
+            out.append((v, p))
+        else:
+            out.extend((v[i], _index_path(v, p, i)) for i in range(len(v)))
+    return out
+
+
+def _descend(items: list, name: Optional[str]) -> list:
+    out: list = []
+    for v in items:
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if name is None:
+                    out.extend(node.values())
+                elif name in node:
+                    out.append(node[name])
+                stack.extend(reversed(node.values()))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+    return out
+
+
+def _descend_located(items: list, name: Optional[str]) -> list:
+    out: list = []
+    for v, p in items:
+        stack = [(v, p)]
+        while stack:
+            node, at = stack.pop()
+            if isinstance(node, dict):
+                children = [(x, None if at is None else at + (str(k),)) for k, x in node.items()]
+                if name is None:
+                    out.extend(children)
+                elif name in node:
+                    out.append((node[name], None if at is None else at + (name,)))
+                stack.extend(reversed(children))
+            elif isinstance(node, list):
+                stack.extend(
+                    reversed([(x, None if at is None else at + (i,)) for i, x in enumerate(node)])
+                )
+    return out
+
+
+class FastPath:
+    """A path in the native subset: ``values`` and ``located`` as jsonpath_ng would find them."""
+
+    __slots__ = ("path", "_steps")
+
+    def __init__(self, path: str, steps: tuple):
+        self.path = path
+        self._steps = steps  # (values step, located step, argument)
+
+    def values(self, unit: Any) -> list:
+        items = [unit]
+        for step, _, arg in self._steps:
+            items = step(items, arg)
+        return items
+
+    def located(self, unit: Any) -> List[Tuple[Any, Optional[str]]]:
+        """``(value, concrete path)`` per match; the path is None where jsonpath_ng's would be."""
+        items = [(unit, ())]
+        for _, step, arg in self._steps:
+            items = step(items, arg)
+        return [(v, None if p is None else format_path(p)) for v, p in items]
+
+    def __repr__(self) -> str:
+        return f"FastPath({self.path!r})"
+
+
+class JsonPathNgPath:
+    """A path jsonpath_ng evaluates, with the interface of ``FastPath``."""
+
+    __slots__ = ("path", "expr")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.expr = compile_path(path)
+
+    def values(self, unit: Any) -> list:
+        return [m.value for m in self.expr.find(unit)]
+
+    def located(self, unit: Any) -> List[Tuple[Any, Optional[str]]]:
+        return [(m.value, concrete_path(unit, m)) for m in self.expr.find(unit)]
+
+    def __repr__(self) -> str:
+        return f"JsonPathNgPath({self.path!r})"
+
+
+def fast_path(path: str) -> Optional[FastPath]:
+    """``path`` as a ``FastPath``, or None when it is outside the native subset."""
+    if not path.startswith("$"):
+        return None
+    steps = []
+    pos = 1
+    while pos < len(path):
+        m = _FAST_STEP.match(path, pos)
+        if m is None:
+            return None
+        dots, name, index = m.group("dots", "name", "index")
+        if name in _RESERVED:
+            return None
+        if dots == "..":
+            steps.append((_descend, _descend_located, name))
+        elif dots:
+            steps.append((_field, _field_located, name) if name else (_star, _star_located, None))
+        elif index is not None:
+            steps.append((_index, _index_located, int(index)))
+        else:
+            steps.append((_each, _each_located, None))
+        pos = m.end()
+    return FastPath(path, tuple(steps))
+
+
+@lru_cache(maxsize=1024)
+def compile_accessor(path: str) -> Union[FastPath, JsonPathNgPath]:
+    """How rules evaluate ``path``: natively when possible, else with jsonpath_ng.
+
+    Raises like ``compile_path`` for paths jsonpath_ng cannot parse.
+    """
+    return fast_path(path) or JsonPathNgPath(path)
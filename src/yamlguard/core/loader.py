@@ -1,14 +1,122 @@
 from io import StringIO
+from typing import IO, Any, Iterator, Optional, Tuple, Union
 
 from ruamel.yaml import YAML
+from ruamel.yaml.nodes import MappingNode, SequenceNode
 
-yaml = YAML(typ="safe")
+from .backend import backend, ruamel_nodes
+from .jsonpath import parse_concrete_path
+
+yaml = YAML(typ="safe")  # for dump_yaml; parsing goes through .backend
+
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+
+
+class PositionIndex:
+    """Maps ``(doc_index, concrete JSONPath)`` to the 1-based ``(line, column)`` of its value.
+
+    ``doc_index`` is the document's position in the stream, as yielded by
+    ``iter_documents`` (a top-level sequence is one document).
+
+    Nothing is done until the first lookup, so files without findings pay no
+    extra cost. The text is then composed (nodes only, no construction) one
+    document at a time and each lookup descends that document's node tree
+    along the path's segments. Only the current document's nodes are kept:
+    lookups in increasing ``doc_index`` order, as made while streaming
+    findings, compose the text once; looking back starts over.
+    """
+
+    def __init__(self, text: str):
+        self._text = text
+        self._docs: Optional[Iterator[Any]] = None
+        self._index = -1
+        self._root = None
+
+    def _document(self, doc_index: int):
+        if self._docs is None or doc_index < self._index:
+            self._docs = (node for _, node in ruamel_nodes(StringIO(self._text)))
+            self._index, self._root = -1, None
+        while self._index < doc_index:
+            try:
+                self._root = next(self._docs)
+            except Exception:  # past the end, or a parse error further down
+                self._index, self._root = doc_index, None
+                break
+            self._index += 1
+        return self._root
+
+    def get(self, doc_index: int, path: str) -> Optional[Tuple[int, int]]:
+        segments = parse_concrete_path(path)
+        if segments is None or doc_index < 0:
+            return None
+        node = self._document(doc_index)
+        if node is None:
+            return None
+        for seg in segments:
+            if isinstance(seg, int):
+                if not isinstance(node, SequenceNode) or seg >= len(node.value):
+                    return None
+                node = node.value[seg]
+            else:
+                node = mapping_value(node, seg)
+                if node is None:
+                    return None
+        return node.start_mark.line + 1, node.start_mark.column + 1
+
+
+def mapping_value(node, key: str):
+    """Value node for ``key`` in a mapping node; explicit keys win over ``<<`` merges."""
+    if not isinstance(node, MappingNode):
+        return None
+    merges = []
+    for k, v in node.value:
+        if k.tag == _MERGE_TAG:
+            merges.extend(v.value if isinstance(v, SequenceNode) else [v])
+        elif not isinstance(k.value, (list, tuple)) and str(k.value) == key:
+            return v
+    for m in merges:
+        found = mapping_value(m, key)
+        if found is not None:
+            return found
+    return None
+
+
+def iter_documents(source: Union[str, IO[str]]) -> Iterator[Tuple[int, int, Any]]:
+    """Yield ``(doc_index, start_line, document)`` for each document of a YAML stream.
+
+    ``source`` is text or a text file object, which is read in chunks as
+    parsing proceeds. Each document is composed and constructed only when the
+    consumer asks for it, and dropped once it moves on, so memory is bounded
+    by the largest document rather than the whole stream. Unlike
+    ``load_yaml``, a document whose root is a sequence is yielded as one
+    document. ``start_line`` (1-based) is where the document's content
+    starts. Parse errors raise ``ValueError("YAML_PARSE_ERROR: ...")`` when
+    the consumer reaches the broken document.
+    """
+    stream = StringIO(source) if isinstance(source, str) else source
+    docs = backend().documents(stream)
+    index = 0
+    while True:
+        try:
+            item = next(docs, None)
+        except Exception as e:
+            raise ValueError(f"YAML_PARSE_ERROR: {e}") from e
+        if item is None:
+            return
+        start_line, document = item
+        yield index, start_line, document
+        index += 1
 
 
 def load_yaml(text: str):
+    """All documents of ``text``: one document, a list of them, or None when empty.
+
+    A list is ambiguous (a stream, or one document with a sequence root), and
+    the whole stream is materialized; ``iter_documents`` has neither problem.
+    """
     try:
         # support multi-document YAML (--- ... ---)
-        docs = list(yaml.load_all(StringIO(text)))
+        docs = backend().load_all(StringIO(text))
         if not docs:
             return None
         return docs if len(docs) > 1 else docs[0]
@@ -16,6 +124,11 @@ def load_yaml(text: str):
         raise ValueError(f"YAML_PARSE_ERROR: {e}") from e
 
 
+def load_yaml_with_positions(text: str) -> Tuple[Any, PositionIndex]:
+    """Like ``load_yaml`` but also returns a (lazy) PositionIndex for ``text``."""
+    return load_yaml(text), PositionIndex(text)
+
+
 def dump_yaml(obj) -> str:
     sio = StringIO()
     yaml.default_flow_style = False
@@ -45,3 +45,31 @@ def guess_location(
                 return idx + 1, snippet
 
     return None, None
+
+
+def locate_finding(
+    yaml_text: str,
+    finding: dict,
+    positions=None,
+    lines: Optional[list[str]] = None,
+) -> tuple[Optional[int], Optional[int], Optional[str]]:
+    """
+    Exact locator: look the finding's first concrete path up in the loader's
+    PositionIndex (see core.loader.load_yaml_with_positions), falling back to
+    guess_location when no index or concrete path is available.
+    Returns (line_1_based or None, column_1_based or None, snippet or None).
+    """
+    paths = finding.get("paths") or []
+    pos = None
+    if positions is not None and paths and paths[0]:
+        pos = positions.get(finding.get("doc_index", 0), paths[0])
+    if pos is None:
+        ln, snip = guess_location(yaml_text, finding.get("path", ""), finding.get("values", []))
+        return ln, None, snip
+
+    if lines is None:
+        lines = yaml_text.splitlines()
+    line, column = pos
+    lo = max(0, line - 2)
+    hi = min(len(lines), line + 1)
+    return line, column, "\n".join(lines[lo:hi])
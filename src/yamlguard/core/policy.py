@@ -0,0 +1,129 @@
+"""Loading of policy files (``policies/<group>/*.yaml``) with change detection."""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from io import StringIO
+from typing import Callable, List, Optional, Tuple, Union
+
+from .backend import backend
+from .rules import CompiledRuleSet, compile_rules
+
+
+@dataclass(frozen=True)
+class PolicyFile:
+    group: str
+    file: str
+    path: str
+    rules: int  # number of ``- id:`` entries, as listed by /v1/policies
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    files: Tuple[PolicyFile, ...] = ()
+    rules: Tuple[dict, ...] = ()
+    compiled: CompiledRuleSet = field(default_factory=lambda: compile_rules([]))
+    signature: tuple = ()
+
+
+def count_rules(text: str) -> int:
+    return sum(1 for ln in text.splitlines() if ln.lstrip().startswith("- id:"))
+
+
+def rules_from_docs(docs) -> List[dict]:
+    """Collect rule mappings (anything with an ``id``) from parsed policy documents."""
+    out: List[dict] = []
+    for doc in docs:
+        if isinstance(doc, list):
+            out.extend(item for item in doc if isinstance(item, dict) and "id" in item)
+        elif isinstance(doc, dict) and "id" in doc:
+            out.append(doc)
+    return out
+
+
+def _policy_paths(base: str) -> List[Tuple[str, str]]:
+    """(group, path) for every ``<base>/<group>/*.yaml``, sorted."""
+    out = []
+    for group in sorted(os.listdir(base)):
+        gpath = os.path.join(base, group)
+        if not os.path.isdir(gpath):
+            continue
+        for name in sorted(os.listdir(gpath)):
+            if name.endswith(".yaml") and not name.startswith("."):
+                out.append((group, os.path.join(gpath, name)))
+    return out
+
+
+class PolicyRegistry:
+    """Loads and compiles a policy tree once and serves it until it changes on disk.
+
+    Freshness is checked by comparing the mtimes/sizes of the policy
+    directories and files, at most once every ``recheck_seconds``; ``reload()``
+    forces a re-read.
+    """
+
+    def __init__(self, base: Union[str, Callable[[], str]], recheck_seconds: float = 2.0):
+        self._base = base
+        self.recheck_seconds = recheck_seconds
+        self._snapshot = PolicySnapshot()
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def base_dir(self) -> str:
+        return self._base() if callable(self._base) else self._base
+
+    def _signature(self, base: str) -> tuple:
+        if not base or not os.path.isdir(base):
+            return ()
+        try:
+            sig = [(base, os.stat(base).st_mtime_ns)]
+            for group in sorted(os.listdir(base)):
+                gpath = os.path.join(base, group)
+                if os.path.isdir(gpath):
+                    sig.append((gpath, os.stat(gpath).st_mtime_ns))
+            for _group, path in _policy_paths(base):
+                st = os.stat(path)
+                sig.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            return ("changing", time.monotonic())  # tree changed mid-scan; check again next time
+        return tuple(sig)
+
+    def _load(self, base: str, signature: tuple) -> PolicySnapshot:
+        if not signature:
+            return PolicySnapshot()
+        parser = backend()
+        files: List[PolicyFile] = []
+        rules: List[dict] = []
+        for group, path in _policy_paths(base):
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    text = fh.read()
+            except OSError:
+                continue
+            files.append(PolicyFile(group, os.path.basename(path), path, count_rules(text)))
+            try:
+                rules.extend(rules_from_docs(parser.load_all(StringIO(text))))
+            except Exception:
+                continue
+        return PolicySnapshot(tuple(files), tuple(rules), compile_rules(rules), signature)
+
+    def snapshot(self) -> PolicySnapshot:
+        now = time.monotonic()
+        checked = self._checked_at
+        if checked is not None and now - checked < self.recheck_seconds:
+            return self._snapshot
+        with self._lock:
+            base = self.base_dir()
+            signature = self._signature(base)
+            if self._checked_at is None or signature != self._snapshot.signature:
+                self._snapshot = self._load(base, signature)
+            self._checked_at = now
+            return self._snapshot
+
+    def reload(self) -> PolicySnapshot:
+        with self._lock:
+            base = self.base_dir()
+            self._snapshot = self._load(base, self._signature(base))
+            self._checked_at = time.monotonic()
+            return self._snapshot
@@ -0,0 +1,83 @@
+"""Per-rule, per-assertion cost accounting for ``apply_rules(..., profiler=...)``."""
+
+import json
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, TextIO, Tuple
+
+
+@dataclass
+class AssertionStats:
+    rule_id: str
+    path: str
+    seconds: float = 0.0
+    evaluations: int = 0  # (document, assertion) pairs evaluated
+    nodes: int = 0  # nodes matched by the JSONPath (scalars visited for $..* scans)
+    regex_calls: int = 0
+    findings: int = 0
+
+
+class RuleProfiler:
+    """Accumulates AssertionStats keyed by (rule id, assertion index).
+
+    Profilers from several processes are combined with ``merge(other.rows())``.
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, int], AssertionStats] = {}
+
+    def record(
+        self,
+        rule_id,
+        index: int,
+        path: str,
+        seconds: float,
+        nodes: int,
+        regex_calls: int,
+        findings: int,
+    ) -> None:
+        key = (str(rule_id), index)
+        st = self._stats.get(key)
+        if st is None:
+            st = self._stats[key] = AssertionStats(str(rule_id), path)
+        st.seconds += seconds
+        st.evaluations += 1
+        st.nodes += nodes
+        st.regex_calls += regex_calls
+        st.findings += findings
+
+    def rows(self) -> List[dict]:
+        """Stats as dicts (with the assertion index), most expensive first."""
+        out = [dict(asdict(st), index=key[1]) for key, st in self._stats.items()]
+        out.sort(key=lambda r: (-r["seconds"], r["rule_id"], r["index"]))
+        return out
+
+    def merge(self, rows: Iterable[dict]) -> None:
+        for r in rows:
+            key = (r["rule_id"], r["index"])
+            st = self._stats.get(key)
+            if st is None:
+                st = self._stats[key] = AssertionStats(r["rule_id"], r["path"])
+            st.seconds += r["seconds"]
+            st.evaluations += r["evaluations"]
+            st.nodes += r["nodes"]
+            st.regex_calls += r["regex_calls"]
+            st.findings += r["findings"]
+
+    def report(self, out: TextIO, limit: int = 0) -> None:
+        """Human-readable table, most expensive assertion first."""
+        rows = self.rows()
+        total = sum(r["seconds"] for r in rows) or 1.0
+        head = ("ms", "%", "evals", "nodes", "regex", "found")
+        widths = (10, 6, 7, 9, 9, 6)
+        out.write(" ".join(h.rjust(w) for h, w in zip(head, widths, strict=True)))
+        out.write("  rule / path\n")
+        for r in rows[:limit] if limit else rows:
+            out.write(
+                f"{r['seconds'] * 1000:10.2f} {100 * r['seconds'] / total:6.1f} "
+                f"{r['evaluations']:7d} {r['nodes']:9d} {r['regex_calls']:9d} "
+                f"{r['findings']:6d}  {r['rule_id']}  {r['path']}\n"
+            )
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"assertions": self.rows()}, fh, indent=2)
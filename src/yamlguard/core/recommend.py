@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import difflib
+import json
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from io import StringIO
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from ruamel.yaml import YAML
+from ruamel.yaml.comments import CommentedMap
+from ruamel.yaml.nodes import MappingNode, ScalarNode, SequenceNode
+from ruamel.yaml.scalarstring import DoubleQuotedScalarString, SingleQuotedScalarString
 
-yaml = YAML(typ="safe")
-yaml.default_flow_style = False
+from .backend import backend
+from .jsonpath import parse_concrete_path
+from .loader import mapping_value
+
+DIGEST_PLACEHOLDER = "@sha256:REPLACE_WITH_REAL_DIGEST"
+MASK = "*****"
+COMBINED_TITLE = "Apply recommended hardening (pin tag + digest, add limits, mask secrets)"
+LIMITS = {"resources": {"limits": {"cpu": "100m", "memory": "128Mi"}}}
+
+_STR_TAG = "tag:yaml.org,2002:str"
 
 
 @dataclass
@@ -21,18 +33,6 @@ class Suggestion:
     confidence: float  # 0..1
 
 
-def _dump(obj) -> str:
-    sio = StringIO()
-    y = YAML()
-    y.default_flow_style = False
-    y.dump(obj, sio)
-    return sio.getvalue()
-
-
-def _load(text: str) -> Any:
-    return yaml.load(StringIO(text))
-
-
 def _unified_diff(before: str, after: str, path: str) -> str:
     return "".join(
         difflib.unified_diff(
@@ -45,157 +45,527 @@ def _unified_diff(before: str, after: str, path: str) -> str:
     )
 
 
-def _update_at_key_scalar_text(text: str, key: str, replace: callable) -> str:
-    # very targeted line-level replace: key: value lines only (keeps comments stable)
-    lines = text.splitlines()
-    pat = re.compile(rf"^(\s*{re.escape(key)}\s*:\s*)(.+)$")
+def _container_paths(finding: Dict[str, Any]) -> Iterator[tuple]:
+    """Segments of the ``...containers[i]`` prefix of each of a finding's paths."""
+    for p in finding.get("paths") or []:
+        segments = parse_concrete_path(p) if p else None
+        if segments and "containers" in segments:
+            yield segments[: segments.index("containers") + 2]
+
+
+class _Unsupported(Exception):
+    """An edit the span engine cannot make exactly; the file is redone on the tree."""
+
+
+class _SpanDocument:
+    """Edits applied as splices of the original text at node positions.
+
+    The text is composed once (nodes with start/end offsets, no
+    construction). Scalar fixes replace exactly the scalar's span, keeping its
+    quoting style; added mapping entries are inserted after the mapping's last
+    line at its indentation. Everything else in the file, comments and
+    formatting included, is left byte for byte, so patches are minimal.
+    Anchored or tagged scalars and flow-style mappings raise ``_Unsupported``.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.units = list(YAML().compose_all(StringIO(text)))  # doc_index as iter_documents
+        self._values: Dict[int, Tuple[ScalarNode, str]] = {}
+        self._inserts: List[Tuple[int, str]] = []
+        self._step = _guess_indent(text)[0]
+
+    def _unit(self, finding: Dict[str, Any]):
+        i = finding.get("doc_index") or 0
+        return self.units[i] if 0 <= i < len(self.units) else None
+
+    def _node(self, node, segments):
+        for seg in segments or ():
+            if isinstance(seg, int):
+                if not isinstance(node, SequenceNode) or seg >= len(node.value):
+                    return None
+                node = node.value[seg]
+            else:
+                node = _value(node, seg)
+                if node is None:
+                    return None
+        return node
+
+    def scalars(self, finding: Dict[str, Any]) -> List[ScalarNode]:
+        unit = self._unit(finding)
+        found = []
+        for p in finding.get("paths") or []:
+            node = self._node(unit, parse_concrete_path(p) if p else None)
+            if isinstance(node, ScalarNode) and node not in found:
+                found.append(node)
+        if found:
+            return found
+        values = {str(v) for v in finding.get("values") or []}
+        scope = [unit] if "doc_index" in finding else self.units
+        return [n for u in scope for n in _iter_scalar_nodes(u) if n.value in values]
+
+    def get(self, node: ScalarNode) -> Any:
+        if str(node.tag) != _STR_TAG:
+            return None
+        return self._values.get(id(node), (node, node.value))[1]
+
+    def set(self, node: ScalarNode, value: str) -> None:
+        if self.text[node.start_mark.index] in "&!":
+            raise _Unsupported("anchored or tagged scalar")
+        self._values[id(node)] = (node, value)
+
+    def containers(self, finding: Dict[str, Any]) -> List[MappingNode]:
+        unit = self._unit(finding)
+        picked = []
+        for segments in _container_paths(finding):
+            node = self._node(unit, segments)
+            if isinstance(node, MappingNode) and node not in picked:
+                picked.append(node)
+        if picked:
+            return picked
+        found = self._node(unit, ("spec", "containers"))
+        if not isinstance(found, SequenceNode):
+            return []
+        return [n for n in found.value if isinstance(n, MappingNode)]
+
+    def ensure(self, node: MappingNode, entries: Dict[str, Any]) -> bool:
+        """Add the missing keys of the nested ``entries`` below ``node``."""
+        if node.flow_style or not node.value:
+            raise _Unsupported("flow or empty mapping")
+        changed = False
+        missing = {}
+        for key, want in entries.items():
+            child = _value(node, key)
+            if child is None:
+                missing[key] = want
+            elif isinstance(want, dict):
+                if not isinstance(child, MappingNode):
+                    raise _Unsupported(f"{key} is not a mapping")
+                changed |= self.ensure(child, want)
+        if missing:
+            indent = node.value[0][0].start_mark.column
+            self._inserts.append((self._end_of(node), _block(missing, indent, self._step)))
+            changed = True
+        return changed
+
+    def _end_of(self, node) -> int:
+        """Offset just past the line holding the last character of ``node``."""
+        while isinstance(node, (MappingNode, SequenceNode)) and node.value and not node.flow_style:
+            last = node.value[-1]
+            node = last[1] if isinstance(node, MappingNode) else last
+        end = node.end_mark.index
+        if end and self.text[end - 1] == "\n":
+            return end  # block scalars end after their line break
+        nl = self.text.find("\n", end)
+        return len(self.text) if nl < 0 else nl + 1
+
+    def render(self) -> str:
+        splices = [
+            (n.start_mark.index, n.end_mark.index, _render_scalar(v, n, self.text))
+            for n, v in self._values.values()
+        ]
+        splices += [(at, at, snippet) for at, snippet in self._inserts]
+        splices.sort(key=lambda s: s[0])
+        out, pos = [], 0
+        for start, end, new in splices:
+            if start < pos:
+                raise _Unsupported("overlapping edits")
+            if start == len(self.text) and self.text and not self.text.endswith("\n"):
+                new = "\n" + new
+            out.append(self.text[pos:start])
+            out.append(new)
+            pos = end
+        out.append(self.text[pos:])
+        return "".join(out)
+
+
+def _value(node, key: str):
+    """Value node of ``key`` in a mapping node, if written there (not merged in)."""
+    found = mapping_value(node, key)
+    if found is not None and not any(v is found for _, v in node.value):
+        raise _Unsupported(f"{key} comes from a merge key")
+    return found
+
+
+def _iter_scalar_nodes(node) -> Iterator[ScalarNode]:
+    if isinstance(node, MappingNode):
+        children = [v for _, v in node.value]
+    elif isinstance(node, SequenceNode):
+        children = node.value
+    else:
+        return
+    for child in children:
+        if isinstance(child, ScalarNode):
+            yield child
+        else:
+            yield from _iter_scalar_nodes(child)
+
+
+def _block(entries: Dict[str, Any], indent: int, step: int) -> str:
+    """Block-style YAML lines for nested ``entries`` at ``indent``."""
     out = []
-    changed = False
-    for ln in lines:
-        m = pat.match(ln)
-        if m:
-            prefix, val = m.group(1), m.group(2)
-            new_val = replace(val)
-            if new_val != val:
-                out.append(prefix + new_val)
+    for k, v in entries.items():
+        if isinstance(v, dict):
+            out.append(f"{' ' * indent}{k}:\n{_block(v, indent + step, step)}")
+        else:
+            out.append(f"{' ' * indent}{k}: {_render_value(v)}\n")
+    return "".join(out)
+
+
+def _plain_ok(value: str) -> bool:
+    """Would ``value`` written as a plain scalar read back as the same string?"""
+    if not value or value != value.strip() or "\n" in value:
+        return False
+    if value[0] in "-?:,[]{}#&*!|>'\"%@`" or ": " in value or " #" in value or value[-1] == ":":
+        return False
+    if any(c in value for c in ",[]{}"):
+        return False  # would end a scalar inside flow collections
+    try:
+        return backend().load_all(StringIO(value)) == [value]
+    except Exception:
+        return False
+
+
+def _render_value(value: str) -> str:
+    return value if _plain_ok(value) else json.dumps(value, ensure_ascii=False)
+
+
+def _render_scalar(value: str, node: ScalarNode, text: str) -> str:
+    """``value`` in the quoting style of ``node`` (block scalars become one-line scalars)."""
+    if node.style == "'":
+        return "'" + value.replace("'", "''") + "'"
+    if node.style == '"':
+        return json.dumps(value, ensure_ascii=False)
+    rendered = _render_value(value)
+    if node.style in ("|", ">"):
+        span = text[node.start_mark.index : node.end_mark.index]
+        rendered += span[len(span.rstrip("\n")) :]
+    return rendered
+
+
+def _round_trip() -> YAML:
+    y = YAML()  # round-trip: keeps comments, key order and quoting
+    y.preserve_quotes = True
+    y.width = 4096  # do not re-wrap long scalars
+    return y
+
+
+def _guess_indent(text: str) -> Tuple[int, int]:
+    """(mapping indent, sequence dash offset) used by ``text``, for re-serializing it."""
+    mapping, offset = 2, 0
+    prev_key_indent = None
+    for line in text.splitlines():
+        stripped = line.lstrip(" ")
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(line) - len(stripped)
+        if stripped.startswith("- ") and prev_key_indent is not None:
+            offset = max(0, indent - prev_key_indent)
+            break
+        prev_key_indent = indent if stripped.rstrip().endswith(":") else None
+    indents = sorted(
+        {len(ln) - len(ln.lstrip(" ")) for ln in text.splitlines() if ln.strip()} - {0}
+    )
+    if indents:
+        mapping = indents[0] if indents[0] > offset else 2
+    return mapping, offset
+
+
+class _TreeDocument:
+    """A file parsed once into a round-trip tree that fixers edit in place.
+
+    The fallback for edits ``_SpanDocument`` cannot make: the whole file is
+    re-serialized, which keeps comments and quoting but may normalize
+    indentation, flow style and spacing elsewhere in the file.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._yaml = _round_trip()
+        self.docs = self.units = list(self._yaml.load_all(StringIO(text)))
+
+    def _unit(self, finding: Dict[str, Any]) -> Any:
+        i = finding.get("doc_index") or 0
+        return self.units[i] if 0 <= i < len(self.units) else None
+
+    def scalars(self, finding: Dict[str, Any]) -> List[Tuple[Any, Any]]:
+        """Slots ``(container, key)`` a finding points at."""
+        unit = self._unit(finding)
+        out = []
+        for p in finding.get("paths") or []:
+            container, key = _walk(unit, parse_concrete_path(p) if p else None)
+            if container is not None:
+                out.append((container, key))
+        if out:
+            return out
+        values = {str(v) for v in finding.get("values") or []}
+        scope = [unit] if "doc_index" in finding else self.units
+        return [(c, k) for u in scope for c, k in _iter_leaves(u) if c[k] in values]
+
+    def get(self, slot: Tuple[Any, Any]) -> Any:
+        container, key = slot
+        value = container[key]
+        return value if isinstance(value, str) else None
+
+    def set(self, slot: Tuple[Any, Any], value: str) -> None:
+        container, key = slot
+        container[key] = _like(container[key], value)
+
+    def containers(self, finding: Dict[str, Any]) -> List[Any]:
+        unit = self._unit(finding)
+        picked: List[Any] = []
+        for segments in _container_paths(finding):
+            container, key = _walk(unit, segments)
+            if container is not None and not any(c is container[key] for c in picked):
+                picked.append(container[key])
+        if picked:
+            return picked
+        spec = unit.get("spec") if isinstance(unit, dict) else None
+        found = spec.get("containers") if isinstance(spec, dict) else None
+        return list(found) if isinstance(found, list) else []
+
+    def ensure(self, node: Any, entries: Dict[str, Any]) -> bool:
+        if not isinstance(node, dict):
+            return False
+        changed = False
+        for key, want in entries.items():
+            if isinstance(want, dict):
+                if not isinstance(node.get(key), dict):
+                    node[key] = CommentedMap()
+                changed |= self.ensure(node[key], want)
+            elif key not in node:
+                node[key] = want
                 changed = True
-            else:
-                out.append(ln)
+        return changed
+
+    def render(self) -> str:
+        mapping, offset = _guess_indent(self.text)
+        self._yaml.indent(mapping=mapping, sequence=mapping + offset, offset=offset)
+        head, starts_with_marker = _preamble(self.text)
+        self._yaml.explicit_start = starts_with_marker
+        sio = StringIO()
+        if len(self.docs) == 1:
+            self._yaml.dump(self.docs[0], sio)
         else:
-            out.append(ln)
-    return "\n".join(out) + ("\n" if text.endswith("\n") else ""), changed
+            self._yaml.dump_all(self.docs, sio)
+        out = sio.getvalue()
+        # ruamel drops comments that precede an explicit '---'
+        return out if out.startswith(head) else head + out
 
 
-def suggest_for_finding(
-    path: str, finding: Dict[str, Any], original_text: str
-) -> Optional[Suggestion]:
+def _preamble(text: str) -> Tuple[str, bool]:
+    """Comment/blank lines before the first document, and whether it opens with ``---``."""
+    head = []
+    for line in text.splitlines(keepends=True):
+        if line.strip() and not line.lstrip().startswith("#"):
+            return "".join(head), line.startswith("---")
+        head.append(line)
+    return "".join(head), False
+
+
+def _child(node: Any, seg) -> Tuple[bool, Any]:
+    """``(found, key)`` of segment ``seg`` in ``node`` (keys compare as strings)."""
+    if isinstance(seg, int):
+        return (isinstance(node, list) and seg < len(node)), seg
+    if isinstance(node, dict):
+        for k in node:
+            if str(k) == seg:
+                return True, k
+    return False, None
+
+
+def _walk(unit: Any, segments) -> Tuple[Any, Any]:
+    """``(container, key)`` of the node at ``segments``, or ``(None, None)``."""
+    if not segments:
+        return None, None
+    node = unit
+    for i, seg in enumerate(segments):
+        ok, key = _child(node, seg)
+        if not ok:
+            return None, None
+        if i == len(segments) - 1:
+            return node, key
+        node = node[key]
+
+
+def _iter_leaves(node: Any) -> Iterator[Tuple[Any, Any]]:
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = enumerate(node)
+    else:
+        return
+    for k, v in items:
+        if isinstance(v, (dict, list)):
+            yield from _iter_leaves(v)
+        else:
+            yield node, k
+
+
+def _like(old: Any, new: str) -> Any:
+    """``new`` with the quoting style of ``old`` (plain for block scalars)."""
+    if isinstance(old, (SingleQuotedScalarString, DoubleQuotedScalarString)):
+        return type(old)(new)
+    return new
+
+
+_Doc = Any  # a _SpanDocument or a _TreeDocument; fixers only use their shared methods
+
+
+def _edit_scalars(doc: _Doc, finding: Dict[str, Any], fn: Callable[[str], str]) -> bool:
+    changed = False
+    for node in doc.scalars(finding):
+        old = doc.get(node)
+        if old is None:
+            continue
+        new = fn(str(old))
+        if new != old:
+            doc.set(node, new)
+            changed = True
+    return changed
+
+
+def _pin_tag(value: str) -> str:
+    new = re.sub(r":latest(\b|$)", ":1.0", value)
+    return new if "@sha256:" in new else new + DIGEST_PLACEHOLDER
+
+
+def _pin_digest(value: str) -> str:
+    return value if "@sha256:" in value else value + DIGEST_PLACEHOLDER
+
+
+def _fix_latest(doc: _Doc, finding: Dict[str, Any]) -> bool:
+    return _edit_scalars(doc, finding, _pin_tag)
+
+
+def _fix_digest(doc: _Doc, finding: Dict[str, Any]) -> bool:
+    return _edit_scalars(doc, finding, _pin_digest)
+
+
+def _fix_secret(doc: _Doc, finding: Dict[str, Any]) -> bool:
+    return _edit_scalars(doc, finding, lambda v: MASK)
+
+
+def _fix_limits(doc: _Doc, finding: Dict[str, Any]) -> bool:
+    changed = False
+    for c in doc.containers(finding):
+        changed |= doc.ensure(c, LIMITS)
+    return changed
+
+
+@dataclass(frozen=True)
+class _Fixer:
+    fix: Callable[[_Doc, Dict[str, Any]], bool]
+    title: str
+    rationale: str
+    confidence: float
+    rank: int  # application order across a file's findings
+
+
+_LATEST = _Fixer(
+    _fix_latest,
+    "Pin image tag (avoid :latest)",
+    "Floating tags break reproducibility. Replace ':latest' with a pinned "
+    "version; ideally also add a digest.",
+    0.75,
+    0,
+)
+_FIXERS: Dict[str, _Fixer] = {
+    "K8S-NO-LATEST-TAG": _LATEST,
+    "NO_LATEST": _LATEST,
+    "K8S-IMAGE-PIN-DIGEST": _Fixer(
+        _fix_digest,
+        "Pin image by digest",
+        "Use immutable digests to guarantee exact image contents.",
+        0.8,
+        1,
+    ),
+    "K8S-RESOURCES-LIMITS-PRESENT": _Fixer(
+        _fix_limits,
+        "Add resource limits",
+        "Define CPU/Memory limits for each container to prevent noisy-neighbor issues.",
+        0.7,
+        2,
+    ),
+}
+_SECRET = _Fixer(
+    _fix_secret,
+    "Remove hardcoded secret",
+    "Delete hardcoded credentials and reference a secret (e.g., GitHub Actions "
+    "`${{ secrets.MY_TOKEN }}` or K8s Secret).",
+    0.9,
+    3,  # secrets last
+)
+
+
+def _fixer_for(finding: Dict[str, Any]) -> Optional[_Fixer]:
     rid = finding.get("rule_id", "")
-    values = finding.get("values") or []
-    title = rationale = ""
-    patched = original_text
-
-    # 1) K8S-NO-LATEST-TAG: replace ":latest" with a stable placeholder tag
-    if rid in ("K8S-NO-LATEST-TAG", "NO_LATEST"):
-
-        def repl(v: str) -> str:
-            new = re.sub(r":latest(\b|$)", ":1.0", v)
-            if "@sha256:" not in new:
-                new = f"{new}@sha256:REPLACE_WITH_REAL_DIGEST"
-            return new
-
-        patched2, changed = _update_at_key_scalar_text(patched, "image", repl)
-        if not changed and values:
-            # fallback: global text replace for that literal (safe enough for sample)
-            patched2 = patched.replace(values[0], repl(values[0]))
-            changed = patched2 != patched
-        if changed:
-            title = "Pin image tag (avoid :latest)"
-            rationale = (
-                "Floating tags break reproducibility. Replace ':latest' with a pinned "
-                "version; ideally also add a digest."
-            )
-            patched = patched2
-            diff = _unified_diff(original_text, patched, path)
-            return Suggestion(title, rationale, patched, diff, 0.75)
-
-    # 2) K8S-IMAGE-PIN-DIGEST: append a digest placeholder if missing
-    if rid in ("K8S-IMAGE-PIN-DIGEST",):
-
-        def repl(v: str) -> str:
-            if "@sha256:" in v:
-                return v
-            return f"{v}@sha256:REPLACE_WITH_REAL_DIGEST"
-
-        patched2, changed = _update_at_key_scalar_text(patched, "image", repl)
-        if changed:
-            title = "Pin image by digest"
-            rationale = "Use immutable digests to guarantee exact image contents."
-            patched = patched2
-            diff = _unified_diff(original_text, patched, path)
-            return Suggestion(title, rationale, patched, diff, 0.8)
-
-    # 3) K8S-RESOURCES-LIMITS-PRESENT: add resource limits if missing
-    if rid in ("K8S-RESOURCES-LIMITS-PRESENT",):
+    return _FIXERS.get(rid) or (_SECRET if rid.startswith("SECRET-") else None)
+
+
+@dataclass
+class _Applied:
+    text: str
+    titles: List[str] = field(default_factory=list)
+    rationales: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+
+
+def _run(doc: _Doc, fixable, original_text: str) -> Optional[_Applied]:
+    applied = _Applied(original_text)
+    for f, fx in fixable:
+        if fx.fix(doc, f):
+            applied.titles.append(fx.title)
+            applied.rationales.append(fx.rationale)
+            applied.confidence = max(applied.confidence, fx.confidence)
+    if not applied.titles:
+        return None
+    applied.text = doc.render()
+    return applied if applied.text != original_text else None
+
+
+def _apply(findings: List[Dict[str, Any]], original_text: str) -> Optional[_Applied]:
+    """Run every applicable fixer on one parse of the file and render it once.
+
+    Edits are spliced into the original text (``_SpanDocument``); if any of
+    them cannot be made that way, the file is redone on a round-trip tree.
+    """
+    fixable = [(f, _fixer_for(f)) for f in findings]
+    fixable = sorted(((f, fx) for f, fx in fixable if fx), key=lambda p: p[1].rank)
+    if not fixable:
+        return None
+    for engine in (_SpanDocument, _TreeDocument):
         try:
-            doc = _load(patched)
-            containers = ((doc or {}).get("spec") or {}).get("containers") or []
-            changed = False
-            for c in containers:
-                res = c.setdefault("resources", {})
-                lim = res.setdefault("limits", {})
-                if "cpu" not in lim:
-                    lim["cpu"] = "100m"
-                if "memory" not in lim:
-                    lim["memory"] = "128Mi"
-                changed = True
-            if changed:
-                patched2 = _dump(doc)
-                title = "Add resource limits"
-                rationale = (
-                    "Define CPU/Memory limits for each container to prevent noisy-neighbor issues."
-                )
-                diff = _unified_diff(patched, patched2, path)
-                return Suggestion(title, rationale, patched2, diff, 0.7)
+            return _run(engine(original_text), fixable, original_text)
+        except _Unsupported:
+            continue
         except Exception:
-            pass
-
-    # 4) Secrets (mask and move to secrets)
-    if rid.startswith("SECRET-"):
-        # replace literal value with a placeholder and hint to use secret reference
-        def repl(v: str) -> str:
-            return "*****"
-
-        # common keys are variable values, not fixed key names, so mask any matching literal
-        patched2 = patched
-        for v in values:
-            patched2 = patched2.replace(str(v), "*****")
-        if patched2 != patched:
-            title = "Remove hardcoded secret"
-            rationale = (
-                "Delete hardcoded credentials and reference a secret (e.g., GitHub Actions "
-                "`${{ secrets.MY_TOKEN }}` or K8s Secret)."
-            )
-            diff = _unified_diff(patched, patched2, path)
-            return Suggestion(title, rationale, patched2, diff, 0.9)
+            return None
+    return None
+
+
+def suggest_for_finding(
+    path: str, finding: Dict[str, Any], original_text: str
+) -> Optional[Suggestion]:
+    applied = _apply([finding], original_text)
+    if applied is None:
+        return None
+    diff = _unified_diff(original_text, applied.text, path)
+    return Suggestion(
+        applied.titles[0], applied.rationales[0], applied.text, diff, applied.confidence
+    )
 
 
 def suggest_for_file(path: str, findings: list[dict], original_text: str) -> Optional[Suggestion]:
     """
-    Apply multiple rule-specific suggestions in sequence to produce one combined patch.
+    Fix all findings of one file in a single patch: the text is composed once,
+    each finding's fixer edits the nodes its concrete paths point at, and the
+    edits are spliced into the original text, leaving every other byte alone.
     Order: tag pin -> digest -> resources -> secret masking.
     """
-    order = [
-        "K8S-NO-LATEST-TAG",
-        "NO_LATEST",
-        "K8S-IMAGE-PIN-DIGEST",
-        "K8S-RESOURCES-LIMITS-PRESENT",
-    ]
-
-    # secrets last
-    def order_key(f):
-        rid = f.get("rule_id", "")
-        base = order.index(rid) if rid in order else 999
-        sec_bias = 1 if rid.startswith("SECRET-") else 0
-        return (base, sec_bias)
-
-    current = original_text
-    changed = False
-    rationales, titles = [], []
-    confidence = 0.0
-
-    for f in sorted(findings, key=order_key):
-        s = suggest_for_finding(path, f, current)
-        if s and s.patched_text != current:
-            current = s.patched_text
-            changed = True
-            rationales.append(s.rationale)
-            titles.append(s.title)
-            confidence = max(confidence, s.confidence)
-
-    if not changed:
+    applied = _apply(findings, original_text)
+    if applied is None:
         return None
-
-    diff = _unified_diff(original_text, current, path)
-    title = "Apply recommended hardening (pin tag + digest, add limits, mask secrets)"
-    rationale = " ".join(dict.fromkeys(rationales))  # de-duplicate
-    return Suggestion(title, rationale, current, diff, confidence if confidence else 0.7)
+    diff = _unified_diff(original_text, applied.text, path)
+    rationale = " ".join(dict.fromkeys(applied.rationales))  # de-duplicate
+    return Suggestion(COMBINED_TITLE, rationale, applied.text, diff, applied.confidence or 0.7)
@@ -0,0 +1,301 @@
+"""Compilation and safety checks for rule patterns (``not_matches``).
+
+Patterns come from policy files and from API clients, and Python's ``re``
+backtracks: a pattern like ``(a+)+$`` takes exponential time on a short
+non-matching string. Three layers keep that from pinning a worker:
+
+* ``backtracking_risk`` inspects a pattern's parse tree for the classic
+  exponential shapes (a loop whose body an inner quantifier can match on its
+  own, or whose alternatives overlap), so callers can refuse or flag it before
+  it runs.
+* ``YG_REGEX_ENGINE=re2`` compiles patterns with Google's RE2 (``pip install
+  google-re2``), which runs in linear time. Patterns RE2 cannot express
+  (look-arounds, back-references) and installs without the module fall back
+  to ``re``. RE2 classes such as ``\\d`` and ``\\w`` are ASCII-only.
+* ``Budget`` bounds the wall-clock time of one evaluation; ``apply_rules``
+  checks it between regex searches and raises ``BudgetExceeded``.
+"""
+
+import functools
+import os
+import re
+import time
+from typing import Any, Optional, Tuple
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+# Python 3.11+: possessive quantifiers and atomic groups never backtrack into.
+_POSSESSIVE = getattr(sre_parse, "POSSESSIVE_REPEAT", None)
+_ATOMIC = getattr(sre_parse, "ATOMIC_GROUP", None)
+_ZERO_WIDTH = (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT)
+# Quantifiers with at least this much play ({0,16}, +, *) count as loops.
+_LOOP_SPAN = 16
+_ANY = "any"
+
+
+@functools.lru_cache(maxsize=None)
+def _re2():
+    """The ``re2`` module, imported on first use; None when not installed."""
+    try:
+        import re2
+    except ImportError:  # optional: linear-time engine
+        return None
+    return re2
+
+
+class BudgetExceeded(RuntimeError):
+    """Rule evaluation ran past its ``Budget``."""
+
+
+class Budget:
+    """A wall-clock deadline for evaluating rules (picklable, so it can travel to workers)."""
+
+    __slots__ = ("seconds", "deadline")
+
+    def __init__(self, seconds: float, deadline: Optional[float] = None):
+        self.seconds = seconds
+        self.deadline = time.time() + seconds if deadline is None else deadline
+
+    def __getstate__(self):
+        return (self.seconds, self.deadline)
+
+    def __setstate__(self, state):
+        self.seconds, self.deadline = state
+
+    def check(self, rule_id: Any, path: str) -> None:
+        """Raise ``BudgetExceeded`` (naming the rule and path at fault) once past the deadline."""
+        if time.time() > self.deadline:
+            where = f"rule {rule_id} ({path})" if rule_id is not None else path
+            raise BudgetExceeded(
+                f"rule evaluation exceeded its {self.seconds:g}s budget at {where}; "
+                "a not_matches pattern may be backtracking"
+            )
+
+
+class Re2Pattern:
+    """An RE2-compiled pattern with the parts of ``re.Pattern`` the rule engine uses."""
+
+    __slots__ = ("pattern", "_compiled")
+    flags = 0  # inline flags stay in the pattern text; RE2 scopes them to their group
+
+    def __init__(self, pattern: str):
+        re2 = _re2()
+        options = re2.Options()
+        options.log_errors = False
+        try:
+            self._compiled = re2.compile(pattern, options)
+        except re2.error as e:
+            raise re.error(str(e), pattern) from None
+        self.pattern = pattern
+
+    def search(self, string: str):
+        return self._compiled.search(string)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Re2Pattern) and other.pattern == self.pattern
+
+    def __hash__(self) -> int:
+        return hash((Re2Pattern, self.pattern))
+
+    def __repr__(self) -> str:
+        return f"Re2Pattern({self.pattern!r})"
+
+
+def engine() -> str:
+    """The engine patterns are compiled with: ``"re2"`` when requested and installed."""
+    wanted = os.environ.get("YG_REGEX_ENGINE", "re").strip().lower() or "re"
+    if wanted not in ("re", "re2"):
+        raise ValueError(f"YG_REGEX_ENGINE must be 're' or 're2', not {wanted!r}")
+    return "re2" if wanted == "re2" and _re2() is not None else "re"
+
+
+def compile_pattern(pattern: str):
+    """Compile a rule pattern on the configured engine; raises ``re.error`` when invalid."""
+    if engine() == "re2":
+        try:
+            return Re2Pattern(pattern)
+        except re.error:
+            pass  # not expressible in RE2: use re (and its checks) instead
+    return re.compile(pattern)
+
+
+def compile_like(like, pattern: str):
+    """Compile ``pattern`` on the same engine as the compiled pattern ``like``."""
+    return Re2Pattern(pattern) if isinstance(like, Re2Pattern) else re.compile(pattern)
+
+
+def pattern_risk(compiled) -> Optional[str]:
+    """``backtracking_risk`` for a compiled pattern; RE2 patterns never backtrack."""
+    if isinstance(compiled, Re2Pattern):
+        return None
+    return backtracking_risk(compiled.pattern)
+
+
+def backtracking_risk(pattern: str) -> Optional[str]:
+    """Why ``pattern`` may take exponential time on ``re``, or None if no risky shape is found.
+
+    This is a conservative syntactic check, not a proof: it flags unbounded
+    quantifiers over a body that an inner quantifier can match on its own
+    (``(a+)+``, ``(\\w+\\s?)*``) and over alternatives that can start with the
+    same character (``(a|aa)+``).
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None  # invalid; re.compile reports it
+    return _risk(list(parsed))
+
+
+def _risk(seq: list) -> Optional[str]:
+    for op, av in seq:
+        if op in _REPEATS:
+            lo, hi, body = av
+            body = list(body)
+            if hi == sre_parse.MAXREPEAT or hi - lo >= _LOOP_SPAN:
+                if _self_nested(body):
+                    return "nested quantifier"
+                flat = _flatten(body)
+                for inner_op, inner_av in flat:
+                    if inner_op is sre_parse.BRANCH and _overlap(inner_av[1], _first(flat)):
+                        return "quantified alternation with overlapping alternatives"
+            children = [body]
+        else:
+            children = _children(op, av)
+        for child in children:
+            found = _risk(child)
+            if found:
+                return found
+    return None
+
+
+def _children(op, av) -> list:
+    """Sub-sequences of a node that can backtrack (none for possessive/atomic nodes)."""
+    if op is sre_parse.SUBPATTERN:
+        return [list(av[3])]
+    if op is sre_parse.BRANCH:
+        return [list(b) for b in av[1]]
+    if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return [list(av[1])]
+    if op is sre_parse.GROUPREF_EXISTS:
+        return [list(b) for b in av[1:] if b is not None]
+    return []
+
+
+def _flatten(seq: list) -> list:
+    """``seq`` with groups that make up the whole sequence unwrapped."""
+    while len(seq) == 1 and seq[0][0] is sre_parse.SUBPATTERN:
+        seq = list(seq[0][1][3])
+    return seq
+
+
+def _has_repeat(op, av) -> bool:
+    if op in _REPEATS:
+        lo, hi, body = av
+        return hi > max(lo, 1) or any(_has_repeat(o, a) for o, a in body)
+    return any(_has_repeat(o, a) for child in _children(op, av) for o, a in child)
+
+
+def _self_nested(body: list) -> bool:
+    """Can one iteration of ``body`` be matched by an inner quantified element alone?"""
+    body = _flatten(body)
+    for i, (op, av) in enumerate(body):
+        if op is sre_parse.BRANCH:
+            if any(_self_nested(list(b)) for b in av[1]):
+                return True
+        elif _has_repeat(op, av) and _nullable(body[:i] + body[i + 1 :]):
+            return True
+    return False
+
+
+def _nullable(seq: list) -> bool:
+    """Can ``seq`` match the empty string? (Back-references are assumed not to.)"""
+    for op, av in seq:
+        if op in _ZERO_WIDTH:
+            continue
+        if op in _REPEATS or op is _POSSESSIVE:
+            ok = av[0] == 0 or _nullable(list(av[2]))
+        elif op is sre_parse.SUBPATTERN:
+            ok = _nullable(list(av[3]))
+        elif op is _ATOMIC:
+            ok = _nullable(list(av))
+        elif op is sre_parse.BRANCH:
+            ok = any(_nullable(list(b)) for b in av[1])
+        else:
+            ok = False
+        if not ok:
+            return False
+    return True
+
+
+def _intersects(a: frozenset, b: frozenset) -> bool:
+    return bool(a and b and (_ANY in a or _ANY in b or a & b))
+
+
+def _overlap(branches, loop_first: frozenset) -> bool:
+    """Can an iteration split between alternatives in more than one way?
+
+    Either two alternatives start alike, or one is empty while another starts
+    like the loop body itself (``re`` factors ``(a|aa)`` into ``a(?:|a)``).
+    """
+    branches = [list(b) for b in branches]
+    firsts = [_first(b) for b in branches]
+    for i, a in enumerate(firsts):
+        if any(_intersects(a, b) for b in firsts[i + 1 :]):
+            return True
+    if any(_nullable(b) for b in branches):
+        return any(_intersects(f, loop_first) for f in firsts)
+    return False
+
+
+def _first(seq: list) -> frozenset:
+    """Characters (or ``_ANY``) a match of ``seq`` can start with; approximate."""
+    out = set()
+    for op, av in seq:
+        if op in _ZERO_WIDTH:
+            continue
+        if op is sre_parse.LITERAL:
+            out.add(chr(av))
+            return frozenset(out)
+        if op is sre_parse.IN:
+            out |= _class_chars(av)
+            return frozenset(out)
+        if op in _REPEATS:
+            out |= _first(list(av[2]))
+            if av[0] > 0 and not _nullable(list(av[2])):
+                return frozenset(out)
+            continue
+        if op is sre_parse.SUBPATTERN:
+            out |= _first(list(av[3]))
+            if not _nullable(list(av[3])):
+                return frozenset(out)
+            continue
+        if op is sre_parse.BRANCH:
+            for b in av[1]:
+                out |= _first(list(b))
+            if not any(_nullable(list(b)) for b in av[1]):
+                return frozenset(out)
+            continue
+        out.add(_ANY)
+        return frozenset(out)
+    return frozenset(out)
+
+
+def _class_chars(items) -> set:
+    chars = set()
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_parse.RANGE and av[1] - av[0] < 256:
+            chars.update(chr(c) for c in range(av[0], av[1] + 1))
+        else:  # categories, negation, wide ranges
+            return {_ANY}
+    return chars
+
+
+def describe(risks: Tuple[Tuple[Any, str], ...]) -> str:
+    """``rule: message; ...`` for error responses."""
+    return "; ".join(f"{rule_id}: {msg}" for rule_id, msg in risks)
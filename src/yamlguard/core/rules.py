@@ -1,10 +1,22 @@
+import hashlib
+import heapq
+import json
 import re
-from typing import Any, Dict, Iterable, List
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
 
-from .jsonpath import match
+from .jsonpath import compile_accessor
+from .regex import Budget, compile_pattern, pattern_risk
+from .secrets import SCAN_ALL_PATH, SecretScanner
 
 Finding = Dict[str, Any]
 
+# Number of distinct ad-hoc rule lists (e.g. posted to /v1/validate) kept compiled.
+RULESET_CACHE_SIZE = 64
+
 
 def _iter_docs(doc: Any) -> Iterable[Any]:
     """Normalize input into a sequence of documents."""
@@ -15,68 +27,427 @@ def _iter_docs(doc: Any) -> Iterable[Any]:
     return [doc]
 
 
-def apply_rules(doc: Any, rules_yaml: List[dict]) -> List[Finding]:
-    findings: List[Finding] = []
-    rules_yaml = rules_yaml or []
-
-    for rule in rules_yaml:
-        for unit in _iter_docs(doc):
-            if not _applies(rule, unit):
-                continue
-            for assertion in rule.get("assert", []):
-                path = assertion.get("path")
-                if not path:
-                    continue
-                values = match(unit, path)
-
-                if "not_matches" in assertion:
-                    pat = re.compile(str(assertion["not_matches"]))
-                    bad = [v for v in values if isinstance(v, str) and pat.search(v)]
-                    if bad:
-                        findings.append(
-                            _finding(
-                                rule,
-                                path,
-                                f"Value matched forbidden pattern: {pat.pattern}",
-                                bad,
-                            )
-                        )
-
-                if "must_include" in assertion:
-                    req = str(assertion["must_include"])
-                    bad = [v for v in values if isinstance(v, str) and req not in v]
-                    if bad:
-                        findings.append(_finding(rule, path, f"Value must include '{req}'", bad))
-
-                if "equals" in assertion:
-                    want = assertion["equals"]
-                    bad = [v for v in values if v != want]
-                    if bad:
-                        findings.append(_finding(rule, path, f"Value must equal {want}", bad))
+@dataclass(frozen=True)
+class CompiledAssertion:
+    path: str
+    expr: Any  # jsonpath.FastPath / JsonPathNgPath, None when the path does not parse
+    not_matches: Optional[Pattern] = None
+    must_include: Optional[str] = None
+    has_equals: bool = False
+    equals: Any = None
+    scan: bool = False  # served by the rule set's SecretScanner instead of a JSONPath walk
+
+    def matches(self, unit: Any) -> list:
+        """Values the path selects in ``unit``."""
+        if self.expr is None:
+            return []
+        try:
+            return self.expr.values(unit)
+        except Exception:
+            return []
+
+    def concrete_paths(self, unit: Any, positions: List[int]) -> List[Optional[str]]:
+        """Concrete paths of the matches at ``positions`` (indexes into ``matches(unit)``).
+
+        Only needed for offending values, so locating is a second, rarer walk.
+        """
+        located = self.expr.located(unit)
+        return [located[i][1] for i in positions]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    id: str
+    severity: str
+    remediation: Optional[str]
+    kind: Any  # normalized when.kind, None when the rule is not gated by kind
+    assertions: tuple
+
+    def applies(self, unit: Any) -> bool:
+        if self.kind is None:
+            return True
+        return isinstance(unit, dict) and unit.get("kind") == self.kind
+
+
+class CompiledRuleSet:
+    """A rules list with JSONPaths parsed and patterns compiled once, reusable across calls."""
+
+    def __init__(self, rules: List[dict], fingerprint: Optional[str] = None):
+        self.source = list(rules or [])
+        self.fingerprint = fingerprint or rules_fingerprint(self.source)
+        compiled: List[CompiledRule] = []
+        errors: List[tuple] = []
+        for rule in self.source:
+            try:
+                compiled.append(_compile_rule(rule))
+            except re.error as e:
+                # One bad pattern must not take the rest of a policy set down:
+                # the rule is skipped and the error kept for reporting.
+                errors.append((rule.get("id", "RULE"), f"invalid not_matches pattern: {e}"))
+        self.rules = tuple(compiled)
+        self.errors = tuple(errors)  # (rule_id, message) for rules that failed to compile
+        # (rule_id, message) for patterns that may backtrack catastrophically
+        self.risky = tuple(
+            (r.id, f"not_matches {a.not_matches.pattern!r}: {why}")
+            for r in self.rules
+            for a in r.assertions
+            if a.not_matches is not None and (why := pattern_risk(a.not_matches))
+        )
+        patterns = [a.not_matches for r in self.rules for a in r.assertions if a.scan]
+        self.scanner = SecretScanner(patterns) if patterns else None
+        # Dispatch index: rule positions keyed by when.kind. Kind-less rules (and
+        # the rare unhashable kind) are "generic" and checked with applies().
+        self.by_kind: Dict[Any, tuple] = {}
+        generic: List[int] = []
+        for ri, rule in enumerate(self.rules):
+            if rule.kind is None or not _hashable(rule.kind):
+                generic.append(ri)
+            else:
+                self.by_kind[rule.kind] = self.by_kind.get(rule.kind, ()) + (ri,)
+        self.generic_order = tuple(generic)
+        self.generic = frozenset(generic)
+
+    def __len__(self) -> int:
+        return len(self.rules)
 
-    return findings
 
+def rules_fingerprint(rules: List[dict]) -> str:
+    """Stable hash of a rules list, independent of mapping key order."""
+    blob = json.dumps(rules or [], sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
 
-def _applies(rule: dict, unit: Any) -> bool:
-    """Return True if the rule should run against this unit (doc or element)."""
+
+def _compile_assertion(assertion: dict) -> Optional[CompiledAssertion]:
+    path = assertion.get("path")
+    if not path:
+        return None
+    try:
+        expr = compile_accessor(path)
+    except Exception:
+        expr = None
+    not_matches = (
+        compile_pattern(str(assertion["not_matches"])) if "not_matches" in assertion else None
+    )
+    must_include = str(assertion["must_include"]) if "must_include" in assertion else None
+    has_equals = "equals" in assertion
+    return CompiledAssertion(
+        path=path,
+        expr=expr,
+        not_matches=not_matches,
+        must_include=must_include,
+        has_equals=has_equals,
+        equals=assertion.get("equals"),
+        scan=(
+            str(path).strip() == SCAN_ALL_PATH
+            and not_matches is not None
+            and must_include is None
+            and not has_equals
+        ),
+    )
+
+
+def _compile_rule(rule: dict) -> CompiledRule:
     when = rule.get("when", {}) or {}
+    compiled = (_compile_assertion(a) for a in rule.get("assert", []))
+    return CompiledRule(
+        id=rule.get("id", "RULE"),
+        severity=rule.get("severity", "medium"),
+        remediation=rule.get("remediation"),
+        kind=when.get("kind") or None,
+        assertions=tuple(a for a in compiled if a is not None),
+    )
+
+
+_cache: "OrderedDict[str, CompiledRuleSet]" = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hit": 0, "miss": 0}
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hits and misses of the compiled rule set cache in this process."""
+    return dict(_cache_stats)
 
-    # Only gate by kind if unit is a mapping
-    kind = when.get("kind")
-    if kind:
-        if not isinstance(unit, dict):
-            return False
-        if unit.get("kind") != kind:
-            return False
+
+def compile_rules(
+    rules: Union[List[dict], CompiledRuleSet, None], fingerprint: Optional[str] = None
+) -> CompiledRuleSet:
+    """Return a CompiledRuleSet for ``rules``, reusing a cached one for identical lists.
+
+    ``fingerprint`` may be passed when already known (e.g. shipped to a worker
+    process alongside the rules) to skip re-hashing the list.
+    """
+    if isinstance(rules, CompiledRuleSet):
+        return rules
+    rules = rules or []
+    key = fingerprint or rules_fingerprint(rules)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache_stats["hit"] += 1
+            _cache.move_to_end(key)
+            return hit
+        _cache_stats["miss"] += 1
+    compiled = CompiledRuleSet(rules, fingerprint=key)
+    with _cache_lock:
+        _cache[key] = compiled
+        _cache.move_to_end(key)
+        while len(_cache) > RULESET_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
     return True
 
 
-def _finding(rule: dict, path: str, message: str, values: list) -> Finding:
+def _kind_of(unit: Any) -> Any:
+    return unit.get("kind") if isinstance(unit, dict) else None
+
+
+def apply_rules(
+    doc: Any,
+    rules_yaml: Union[List[dict], CompiledRuleSet],
+    order: str = "rule",
+    rule_times: Optional[Dict[str, float]] = None,
+    profiler=None,
+    budget: Optional[Budget] = None,
+) -> List[Finding]:
+    """Evaluate rules against every document in ``doc``.
+
+    ``doc`` is what ``loader.load_yaml`` returns; a list is taken as a list of
+    documents. To evaluate a stream without materializing it, and without
+    that ambiguity, use ``iter_findings``.
+
+    Documents are bucketed by ``kind`` so each one is only checked against the
+    rules gated on its kind plus the kind-less rules. ``order`` selects how
+    findings are grouped: ``"rule"`` (rule by rule, the default) or
+    ``"document"`` (document by document); both are deterministic.
+
+    When ``rule_times`` is given, the seconds spent evaluating each rule are
+    added to it under the rule id. A ``profile.RuleProfiler`` passed as
+    ``profiler`` receives per-assertion time, matched nodes, regex calls and
+    findings. A ``regex.Budget`` is checked before every regex search and
+    raises ``regex.BudgetExceeded`` once its deadline has passed.
+    """
+    if order not in ("rule", "document"):
+        raise ValueError(f"order must be 'rule' or 'document', not {order!r}")
+    findings: List[Finding] = []
+    ruleset = compile_rules(rules_yaml)
+    units = list(_iter_docs(doc))
+    scans: Dict[int, dict] = {}  # unit index -> SecretScanner hits, computed on first use
+
+    if order == "rule":
+        docs_by_kind: Dict[Any, List[int]] = {}
+        for i, unit in enumerate(units):
+            kind = _kind_of(unit)
+            if kind is not None and _hashable(kind):
+                docs_by_kind.setdefault(kind, []).append(i)
+        all_units = range(len(units))
+        for ri, rule in enumerate(ruleset.rules):
+            if ri in ruleset.generic:
+                targets = (i for i in all_units if rule.applies(units[i]))
+            else:
+                targets = docs_by_kind.get(rule.kind, ())
+            for i in targets:
+                _evaluate(ruleset, rule, units[i], i, scans, findings, rule_times, profiler, budget)
+    else:
+        for i, unit in enumerate(units):
+            _evaluate_unit(ruleset, unit, i, scans, findings, rule_times, profiler, budget)
+
+    return findings
+
+
+def iter_findings(
+    documents: Iterable[Tuple[int, int, Any]],
+    rules_yaml: Union[List[dict], CompiledRuleSet],
+    rule_times: Optional[Dict[str, float]] = None,
+    profiler=None,
+    budget: Optional[Budget] = None,
+) -> Iterator[Finding]:
+    """Evaluate rules one document at a time, yielding findings as they are produced.
+
+    ``documents`` yields ``(doc_index, start_line, document)`` as
+    ``loader.iter_documents`` does; each document is evaluated whole before
+    the next one is pulled, so none of them has to outlive its findings.
+    Findings come in ``apply_rules(..., order="document")`` order and the
+    other arguments mean the same as there.
+    """
+    ruleset = compile_rules(rules_yaml)
+    for index, _, unit in documents:
+        findings: List[Finding] = []
+        _evaluate_unit(ruleset, unit, index, {}, findings, rule_times, profiler, budget)
+        yield from findings
+
+
+def _evaluate_unit(
+    ruleset: CompiledRuleSet,
+    unit: Any,
+    index: int,
+    scans: Dict[int, dict],
+    findings: List[Finding],
+    rule_times: Optional[Dict[str, float]] = None,
+    profiler=None,
+    budget: Optional[Budget] = None,
+) -> None:
+    """Run every rule that applies to one document, in rule order."""
+    kind = _kind_of(unit)
+    keyed = ruleset.by_kind.get(kind, ()) if _hashable(kind) else ()
+    for ri in heapq.merge(keyed, ruleset.generic_order):
+        rule = ruleset.rules[ri]
+        if ri in ruleset.generic and not rule.applies(unit):
+            continue
+        _evaluate(ruleset, rule, unit, index, scans, findings, rule_times, profiler, budget)
+
+
+def _evaluate(
+    ruleset: CompiledRuleSet,
+    rule: CompiledRule,
+    unit: Any,
+    index: int,
+    scans: Dict[int, dict],
+    findings: List[Finding],
+    rule_times: Optional[Dict[str, float]] = None,
+    profiler=None,
+    budget: Optional[Budget] = None,
+) -> None:
+    """Run every assertion of ``rule`` against one document."""
+    if rule_times is not None:
+        start = time.perf_counter()
+        _evaluate(ruleset, rule, unit, index, scans, findings, None, profiler, budget)
+        rule_times[rule.id] = rule_times.get(rule.id, 0.0) + time.perf_counter() - start
+        return
+    for ai, assertion in enumerate(rule.assertions):
+        if profiler is None:
+            _check(ruleset, rule, assertion, unit, index, scans, findings, budget)
+        else:
+            _profiled_check(
+                ruleset, rule, ai, assertion, unit, index, scans, findings, profiler, budget
+            )
+
+
+def _check(
+    ruleset: CompiledRuleSet,
+    rule: CompiledRule,
+    assertion: CompiledAssertion,
+    unit: Any,
+    index: int,
+    scans: Dict[int, dict],
+    findings: List[Finding],
+    budget: Optional[Budget] = None,
+) -> Optional[list]:
+    """Evaluate one assertion; returns the matched values (None for scanner-served ones)."""
+    path = assertion.path
+    if assertion.scan:
+        if index not in scans:
+            scans[index] = ruleset.scanner.scan(unit, budget)
+        hits = scans[index].get(assertion.not_matches)
+        if hits:
+            findings.append(
+                _finding(
+                    rule,
+                    path,
+                    f"Value matched forbidden pattern: {assertion.not_matches.pattern}",
+                    [v for v, _ in hits],
+                    index,
+                    [where for _, where in hits],
+                )
+            )
+        return None
+    matches = assertion.matches(unit)
+
+    if assertion.not_matches is not None:
+        pat = assertion.not_matches
+        if budget is None:
+            bad = [i for i, v in enumerate(matches) if isinstance(v, str) and pat.search(v)]
+        else:
+            bad = []
+            for i, v in enumerate(matches):
+                if isinstance(v, str):
+                    budget.check(rule.id, path)
+                    if pat.search(v):
+                        bad.append(i)
+        if bad:
+            findings.append(
+                _finding(
+                    rule,
+                    path,
+                    f"Value matched forbidden pattern: {pat.pattern}",
+                    *_located(assertion, unit, index, matches, bad),
+                )
+            )
+
+    if assertion.must_include is not None:
+        req = assertion.must_include
+        bad = [i for i, v in enumerate(matches) if isinstance(v, str) and req not in v]
+        if bad:
+            findings.append(
+                _finding(
+                    rule,
+                    path,
+                    f"Value must include '{req}'",
+                    *_located(assertion, unit, index, matches, bad),
+                )
+            )
+
+    if assertion.has_equals:
+        want = assertion.equals
+        bad = [i for i, v in enumerate(matches) if v != want]
+        if bad:
+            findings.append(
+                _finding(
+                    rule,
+                    path,
+                    f"Value must equal {want}",
+                    *_located(assertion, unit, index, matches, bad),
+                )
+            )
+    return matches
+
+
+def _profiled_check(ruleset, rule, ai, assertion, unit, index, scans, findings, profiler, budget):
+    fresh_scan = assertion.scan and index not in scans
+    before = len(findings)
+    start = time.perf_counter()
+    matches = _check(ruleset, rule, assertion, unit, index, scans, findings, budget)
+    seconds = time.perf_counter() - start
+    if matches is None:
+        # The document scan is shared by all $..* assertions; its cost is
+        # charged to the assertion that triggered it.
+        nodes, calls = ruleset.scanner.scan_cost(unit, scans[index]) if fresh_scan else (0, 0)
+    else:
+        nodes = len(matches)
+        calls = 0
+        if assertion.not_matches is not None:
+            calls = sum(1 for v in matches if isinstance(v, str))
+    profiler.record(rule.id, ai, assertion.path, seconds, nodes, calls, len(findings) - before)
+
+
+def _located(
+    assertion: CompiledAssertion, unit: Any, index: int, matches: list, bad: List[int]
+) -> tuple:
+    """``(values, doc_index, concrete_paths)`` of the offending matches at positions ``bad``."""
+    return [matches[i] for i in bad], index, assertion.concrete_paths(unit, bad)
+
+
+def _finding(
+    rule: CompiledRule,
+    path: str,
+    message: str,
+    values: list,
+    doc_index: int,
+    paths: List[Optional[str]],
+) -> Finding:
     return {
-        "rule_id": rule.get("id", "RULE"),
-        "severity": rule.get("severity", "medium"),
+        "rule_id": rule.id,
+        "severity": rule.severity,
         "path": path,
         "message": message,
         "values": values,
-        "remediation": rule.get("remediation"),
+        "remediation": rule.remediation,
+        "doc_index": doc_index,
+        "paths": paths,
     }
@@ -0,0 +1,96 @@
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from .jsonpath import format_path
+from .regex import Budget, compile_like
+
+# Assertions on this path with only a `not_matches` check are served by SecretScanner.
+SCAN_ALL_PATH = "$..*"
+
+# Patterns that cannot be safely embedded in a combined alternation
+# (numbered/named back-references, named groups, inline global flags).
+_UNGATEABLE = re.compile(r"\\[1-9]|\(\?P[<=]")
+
+_NESTED = (dict, list)
+
+
+def iter_scalars(unit: Any) -> Iterator[Tuple[tuple, str, str]]:
+    """Yield ``(parent_segments, key, value)`` for string scalars, mirroring ``$..*``.
+
+    jsonpath's ``$..*`` matches the values of every mapping, recursing through
+    mappings and sequences; strings sitting directly in a sequence are not matched.
+    Order and coverage are identical to the jsonpath walk.
+    """
+    stack: List[Tuple[Any, tuple]] = [(unit, ())]
+    while stack:
+        node, prefix = stack.pop()
+        if isinstance(node, dict):
+            items = list(node.items())
+            for k, v in items:
+                if isinstance(v, str):
+                    yield prefix, k, v
+            children = [(v, prefix + (str(k),)) for k, v in items if isinstance(v, _NESTED)]
+        elif isinstance(node, list):
+            children = [(v, prefix + (i,)) for i, v in enumerate(node) if isinstance(v, _NESTED)]
+        else:
+            continue
+        stack.extend(reversed(children))
+
+
+class SecretScanner:
+    """Walk a document once and test every string against many patterns.
+
+    Strings are first checked against one combined alternation of all patterns
+    (one per regex engine in use); only strings that hit it are re-checked per
+    pattern to attribute the match.
+    """
+
+    def __init__(self, patterns: Iterable[Pattern]):
+        self.patterns = tuple(dict.fromkeys(patterns))
+        by_engine: Dict[type, List[Pattern]] = {}
+        self._always: List[Pattern] = []
+        for p in self.patterns:
+            if p.flags & ~re.UNICODE or _UNGATEABLE.search(p.pattern):
+                self._always.append(p)
+            else:
+                by_engine.setdefault(type(p), []).append(p)
+        self._gates: List[Tuple[Any, Tuple[Pattern, ...]]] = []
+        for gated in by_engine.values():
+            try:
+                gate = compile_like(gated[0], "|".join(f"(?:{p.pattern})" for p in gated))
+            except re.error:
+                self._always.extend(gated)
+                continue
+            self._gates.append((gate, tuple(gated)))
+
+    def scan(self, unit: Any, budget: Optional[Budget] = None) -> Dict[Pattern, list]:
+        """Return ``(value, concrete_path)`` hits per pattern, in ``$..*`` order."""
+        hits: Dict[Pattern, list] = {}
+        gates, always = self._gates, self._always
+        for prefix, key, s in iter_scalars(unit):
+            if budget is not None:
+                budget.check(None, SCAN_ALL_PATH)
+            matched = []
+            for gate, gated in gates:
+                if gate.search(s):
+                    matched.extend(p for p in gated if p.search(s))
+            matched.extend(p for p in always if p.search(s))
+            if matched:
+                where = format_path(prefix + (str(key),))
+                for p in matched:
+                    hits.setdefault(p, []).append((s, where))
+        return hits
+
+    def scan_cost(self, unit: Any, hits: Dict[Pattern, list]) -> Tuple[int, int]:
+        """``(scalars visited, regex searches run)`` by ``scan(unit)``, given its result.
+
+        Only used for profiling, so it re-walks the document rather than
+        slowing down ``scan`` with counters.
+        """
+        scalars = sum(1 for _ in iter_scalars(unit))
+        calls = scalars * (len(self._always) + len(self._gates))
+        for _gate, gated in self._gates:
+            members = set(gated)
+            gate_hits = len({w for p, found in hits.items() if p in members for _, w in found})
+            calls += gate_hits * len(gated)
+        return scalars, calls
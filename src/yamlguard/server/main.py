@@ -1,24 +1,30 @@
 # src/yamlguard/server/main.py
-import glob
+import asyncio
+import importlib.metadata
+import math
 import os
 import pathlib
 import time
-from collections import defaultdict
 from typing import List, Optional
 
-import importlib.metadata
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
-from ruamel.yaml import YAML
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from yamlguard.core.loader import dump_yaml, load_yaml
-from yamlguard.core.locate import guess_location
-from yamlguard.core.optimize import canonicalize
-from yamlguard.core.recommend import suggest_for_file, suggest_for_finding
-from yamlguard.core.rules import apply_rules
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+
+from yamlguard.core.policy import PolicyRegistry
+from yamlguard.core.regex import Budget, BudgetExceeded, describe
+from yamlguard.core.rules import compile_rules
+from yamlguard.server import metrics, stream
+from yamlguard.server.ratelimit import RateLimiter
+from yamlguard.server.workers import (
+    Saturated,
+    TooLarge,
+    WorkPool,
+    suggest_file,
+    validate_file,
+)
 
 app = FastAPI(title="YAML Guard API", version="1.0.0")
 
@@ -39,52 +45,96 @@ app.add_middleware(
 
 # Request size limit middleware
 MAX_BYTES = int(os.environ.get("MAX_BYTES", "2000000"))
+# The streaming endpoint is exempt: it limits each file to MAX_BYTES and
+# archive uploads to STREAM_MAX_BYTES instead.
+STREAM_PATH = "/v1/validate/stream"
+
+
+async def _plain(scope, receive, send, status: int, text: str) -> None:
+    response = Response(content=text, status_code=status, media_type="text/plain")
+    await response(scope, receive, send)
 
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.method in ["POST", "PUT", "PATCH"]:
-            content_length = request.headers.get("content-length")
+
+# Both middlewares are plain ASGI rather than BaseHTTPMiddleware so request
+# bodies can be read while a streaming response is being sent.
+class RequestSizeLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] in ["POST", "PUT", "PATCH"]
+            and scope["path"] != STREAM_PATH
+        ):
+            content_length = Headers(scope=scope).get("content-length")
             if content_length and int(content_length) > MAX_BYTES:
-                return Response(
-                    content="Request too large",
-                    status_code=413,
-                    media_type="text/plain"
-                )
-        return await call_next(request)
+                await _plain(scope, receive, send, 413, "Request too large")
+                return
+        await self.app(scope, receive, send)
 
 app.add_middleware(RequestSizeLimitMiddleware)
 
-# Simple in-memory rate limiting
-RL_WINDOW_SECONDS = int(os.environ.get("RL_WINDOW_SECONDS", "60"))
-RL_MAX_REQUESTS = int(os.environ.get("RL_MAX_REQUESTS", "120"))
-rate_limit_storage = defaultdict(list)
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        
-        # Clean old entries
-        rate_limit_storage[client_ip] = [
-            timestamp for timestamp in rate_limit_storage[client_ip]
-            if now - timestamp < RL_WINDOW_SECONDS
-        ]
-        
-        # Check rate limit
-        if len(rate_limit_storage[client_ip]) >= RL_MAX_REQUESTS:
-            return Response(
+# Per-client rate limiting (see yamlguard.server.ratelimit for the RL_* settings)
+rate_limiter = RateLimiter.from_env()
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        allowed, wait = rate_limiter.check(client_ip, scope["path"])
+        if not allowed:
+            metrics.ratelimit_rejections.inc()
+            response = Response(
                 content="Rate limit exceeded",
                 status_code=429,
-                media_type="text/plain"
+                media_type="text/plain",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
             )
-        
-        # Record this request
-        rate_limit_storage[client_ip].append(now)
-        
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
 
 app.add_middleware(RateLimitMiddleware)
 
+
+class MetricsMiddleware:
+    """Request count, latency and declared body size per route (outermost, so 429s count)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.enabled():
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to keep cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.request_seconds.observe(time.perf_counter() - start, route)
+            metrics.requests_total.inc(route, scope["method"], str(status[0]))
+            length = Headers(scope=scope).get("content-length")
+            if length and length.isdigit():
+                metrics.request_bytes.observe(int(length), route)
+
+app.add_middleware(MetricsMiddleware)
+
 # ---- Models ----
 
 
@@ -102,7 +152,10 @@ class AssertionFinding(BaseModel):
     remediation: Optional[str] = None
     file: Optional[str] = None
     line: Optional[int] = None
+    column: Optional[int] = None
     snippet: Optional[str] = None
+    doc_index: Optional[int] = None
+    paths: List[Optional[str]] = []
 
 
 class OptimizedFile(BaseModel):
@@ -135,7 +188,12 @@ class SuggestionOut(BaseModel):
 
 
 class SuggestReq(ValidateReq):
-    pass
+    findings: Optional[List[AssertionFinding]] = Field(
+        default=None,
+        description="Findings from a previous /v1/validate call; when given, files are not "
+        "re-validated and rules are ignored. Findings are matched to files by 'file' "
+        "(findings without one apply when a single file is posted).",
+    )
 
 
 class SuggestResp(BaseModel):
@@ -158,9 +216,21 @@ class PolicyFileResp(BaseModel):
     content: str
 
 
+class PolicyReloadResp(BaseModel):
+    policies: int
+    rules: int
+
+
 # ---- Routes ----
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    if not metrics.enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled (set YG_METRICS=1)")
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -196,60 +266,26 @@ def _policy_dir() -> str:
     return alt if os.path.isdir(alt) else ""
 
 
-def _count_rules(text: str) -> int:
-    return sum(1 for ln in text.splitlines() if ln.lstrip().startswith("- id:"))
-
-
-def _load_all_policy_rules() -> list[dict]:
-    base = _policy_dir()
-    if not base:
-        return []
-    yaml = YAML(typ="safe")
-    out: list[dict] = []
-    for group in sorted(os.listdir(base)):
-        gpath = os.path.join(base, group)
-        if not os.path.isdir(gpath):
-            continue
-        for file in sorted(glob.glob(os.path.join(gpath, "*.yaml"))):
-            try:
-                with open(file, "r", encoding="utf-8") as fh:
-                    docs = list(yaml.load_all(fh))
-                for doc in docs:
-                    if isinstance(doc, list):
-                        for item in doc:
-                            if isinstance(item, dict) and "id" in item:
-                                out.append(item)
-                    elif isinstance(doc, dict) and "id" in doc:
-                        out.append(doc)
-            except Exception:
-                continue
-    return out
+POLICY_RECHECK_SECONDS = float(os.environ.get("POLICY_RECHECK_SECONDS", "2"))
+policy_registry = PolicyRegistry(_policy_dir, recheck_seconds=POLICY_RECHECK_SECONDS)
 
 
 @app.get("/v1/policies", response_model=PolicyListResp, summary="List available policy files")
 def list_policies():
-    base = _policy_dir()
-    if not base:
-        return PolicyListResp(policies=[])
-    metas: List[PolicyMeta] = []
-    for group in sorted(os.listdir(base)):
-        gpath = os.path.join(base, group)
-        if not os.path.isdir(gpath):
-            continue
-        for file in sorted(glob.glob(os.path.join(gpath, "*.yaml"))):
-            try:
-                with open(file, "r", encoding="utf-8") as fh:
-                    txt = fh.read()
-                metas.append(
-                    PolicyMeta(
-                        group=group,
-                        file=os.path.basename(file),
-                        rules=_count_rules(txt),
-                    )
-                )
-            except Exception:
-                continue
-    return PolicyListResp(policies=metas)
+    snap = policy_registry.snapshot()
+    return PolicyListResp(
+        policies=[PolicyMeta(group=f.group, file=f.file, rules=f.rules) for f in snap.files]
+    )
+
+
+@app.post(
+    "/v1/policies/reload",
+    response_model=PolicyReloadResp,
+    summary="Re-read policy files from disk",
+)
+def reload_policies():
+    snap = policy_registry.reload()
+    return PolicyReloadResp(policies=len(snap.files), rules=len(snap.rules))
 
 
 @app.get(
@@ -271,69 +307,164 @@ def get_policy(group: str, file: str):
 _here = pathlib.Path(__file__).resolve().parent
 _ui_dist = _here.parent.parent.parent / "ui" / "dist"
 if _ui_dist.is_dir():
+    from fastapi.staticfiles import StaticFiles
+
     app.mount("/ui", StaticFiles(directory=str(_ui_dist), html=True), name="ui")
 
 
+work_pool = WorkPool.from_env()
+app.router.on_shutdown.append(work_pool.shutdown)
+
+# Wall-clock budget for rule evaluation per request (per file on the stream
+# endpoint); 0 disables it.
+EVAL_BUDGET = float(os.environ.get("YG_EVAL_BUDGET", "10"))
+
+
+def _budget() -> Optional[Budget]:
+    return Budget(EVAL_BUDGET) if EVAL_BUDGET > 0 else None
+
+
+async def _run_files(fn, calls: list) -> list:
+    """Run per-file work on the work pool, mapping saturation and timeouts to HTTP errors."""
+    try:
+        return await work_pool.map(fn, calls)
+    except TooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many files in one request (max {work_pool.max_pending}); "
+            "split the batch or use /v1/validate/stream",
+        ) from None
+    except Saturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, retry later",
+            headers={"Retry-After": str(work_pool.retry_after)},
+        ) from None
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Validation timed out") from None
+    except BudgetExceeded as e:
+        raise HTTPException(status_code=422, detail=str(e)) from None
+
+
+def _rules_for(req: ValidateReq):
+    """Compiled rules posted with the request, or the cached server policies.
+
+    Posted rules whose patterns may backtrack catastrophically are refused
+    with 422 (with ``YG_REGEX_ENGINE=re2`` they compile to linear-time RE2 and
+    pass, unless RE2 cannot express them).
+    """
+    if req.rules not in (None, []) and len(req.rules) > 0:
+        ruleset = compile_rules(req.rules)
+        if ruleset.risky:
+            raise HTTPException(
+                status_code=422,
+                detail="Pattern may backtrack catastrophically: " + describe(ruleset.risky),
+            )
+        return ruleset
+    return policy_registry.snapshot().compiled
+
+
 @app.post("/v1/validate", response_model=ValidateResp, summary="Validate YAML using rules")
-def validate(req: ValidateReq):
+async def validate(req: ValidateReq):
     findings: List[dict] = []
     optimized: List[OptimizedFile] = []
-    rules = (
-        req.rules
-        if (req.rules not in (None, []) and len(req.rules) > 0)
-        else _load_all_policy_rules()
+    rules = work_pool.task_rules(_rules_for(req))
+    timed = metrics.enabled()
+    budget = _budget()
+    results = await _run_files(
+        validate_file,
+        [(f.path, f.content, rules, req.optimize, timed, budget) for f in req.files],
     )
-    for f in req.files:
-        original_text = f.content
-        doc = load_yaml(f.content)
-        fs = apply_rules(doc, rules)
-        for x in fs:
-            x["file"] = f.path
-            ln, snip = guess_location(original_text, x.get("path", ""), x.get("values", []))
-            if ln is not None:
-                x["line"] = ln
-            if snip:
-                x["snippet"] = snip
-        findings.extend(fs)
+    for f, res in zip(req.files, results, strict=True):
+        if timed:
+            metrics.record_file(len(f.content), res["timings"], res["rule_times"])
+        findings.extend(res["findings"])
         if req.optimize:
-            opt = canonicalize(doc)
-            optimized.append(OptimizedFile(path=f.path, content=dump_yaml(opt)))
+            optimized.append(OptimizedFile(path=f.path, content=res["optimized"]))
     return ValidateResp(ok=(len(findings) == 0), findings=findings, optimized=optimized)
 
 
 @app.post("/v1/suggest", response_model=SuggestResp, summary="Suggest fixes for YAML findings")
-def suggest(req: SuggestReq):
-    suggestions: list[SuggestionOut] = []
-    rules = (
-        req.rules
-        if (req.rules not in (None, []) and len(req.rules) > 0)
-        else _load_all_policy_rules()
-    )
-    for f in req.files:
-        doc = load_yaml(f.content)
-        fs = apply_rules(doc, rules)
-        combo = suggest_for_file(f.path, fs, f.content)
-        if combo:
-            suggestions.append(
-                SuggestionOut(
-                    file=f.path,
-                    title=combo.title,
-                    rationale=combo.rationale,
-                    diff=combo.diff,
-                    confidence=combo.confidence,
-                )
+async def suggest(req: SuggestReq):
+    timed = metrics.enabled()
+    if req.findings is None:
+        rules = work_pool.task_rules(_rules_for(req))
+        budget = _budget()
+        calls = [(f.path, f.content, rules, timed, budget) for f in req.files]
+    else:
+        single = len(req.files) == 1
+        calls = [
+            (
+                f.path,
+                f.content,
+                None,
+                timed,
+                None,
+                [
+                    x.model_dump()
+                    for x in req.findings
+                    if x.file == f.path or (x.file is None and single)
+                ],
             )
-            continue
-        for x in fs:
-            s = suggest_for_finding(f.path, x, f.content)
-            if s:
-                suggestions.append(
-                    SuggestionOut(
-                        file=f.path,
-                        title=s.title,
-                        rationale=s.rationale,
-                        diff=s.diff,
-                        confidence=s.confidence,
-                    )
-                )
-    return SuggestResp(suggestions=suggestions)
+            for f in req.files
+        ]
+    results = await _run_files(suggest_file, calls)
+    if timed:
+        for f, res in zip(req.files, results, strict=True):
+            metrics.record_file(len(f.content), res["timings"])
+    return SuggestResp(
+        suggestions=[SuggestionOut(**s) for res in results for s in res["suggestions"]]
+    )
+
+
+STREAM_MAX_BYTES = int(os.environ.get("STREAM_MAX_BYTES", str(1024 * 1024 * 1024)))
+STREAM_WINDOW = int(os.environ.get("STREAM_WINDOW", "8"))
+
+
+@app.post(STREAM_PATH, summary="Validate a stream of files, streaming results back as NDJSON")
+async def validate_stream(request: Request):
+    """Body: NDJSON lines ``{"path", "content"}`` (an optional first line
+    ``{"rules": [...]}`` overrides the server policies), or a tar / tar.gz /
+    zip archive whose YAML members are validated. The response is NDJSON: one
+    ``{"path", "ok", "findings"}`` or ``{"path", "error"}`` line per file, in
+    input order, then a ``{"summary": ...}`` line.
+    """
+    ctype = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if ctype not in stream.NDJSON_TYPES + stream.TAR_TYPES + stream.ZIP_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail="Expected application/x-ndjson, application/x-tar, application/gzip "
+            "or application/zip",
+        )
+    try:
+        slots = work_pool.reserve(STREAM_WINDOW)
+    except Saturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, retry later",
+            headers={"Retry-After": str(work_pool.retry_after)},
+        ) from None
+    if ctype in stream.NDJSON_TYPES:
+        items = stream.iter_ndjson(request.stream(), max_line=2 * MAX_BYTES)
+    else:
+        kind = "zip" if ctype in stream.ZIP_TYPES else "tar"
+        try:
+            body = await stream.spool(request.stream(), STREAM_MAX_BYTES)
+        except stream.StreamError as e:
+            slots.close()
+            raise HTTPException(status_code=413, detail=str(e)) from None
+        except BaseException:
+            slots.close()
+            raise
+        items = stream.iter_sync(stream.iter_archive(body, kind, MAX_BYTES))
+    results = stream.validate_stream(
+        items,
+        work_pool,
+        slots,
+        policy_registry.snapshot().compiled,
+        STREAM_WINDOW,
+        EVAL_BUDGET,
+    )
+    return stream.NdjsonResponse(
+        results, media_type="application/x-ndjson", background=BackgroundTask(slots.close)
+    )
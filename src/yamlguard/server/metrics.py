@@ -0,0 +1,216 @@
+# src/yamlguard/server/metrics.py
+"""In-process metrics in the Prometheus text format, served at ``/metrics``.
+
+Enabled with ``YG_METRICS=1``. When disabled every ``inc``/``observe`` is a
+single attribute check and ``/metrics`` answers 404; workers are not asked
+to time their stages.
+
+Per-file stage timings (parse, rule evaluation per rule id, locating,
+suggesting, canonicalizing) are measured inside the worker task, returned
+with its result and recorded here in the API process, so they work the same
+with the thread and the process pool.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from yamlguard.core.rules import cache_stats
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Registry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: List = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> "Counter":
+        return self._add(Counter(self, name, help, tuple(labels)))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> "Histogram":
+        return self._add(Histogram(self, name, help, tuple(labels), tuple(buckets)))
+
+    def callback(
+        self, name: str, help: str, kind: str, labels: Sequence[str], fn: Callable[[], Dict]
+    ) -> "Callback":
+        """A metric whose values (``{label_values: value}``) are read from ``fn`` at scrape time."""
+        return self._add(Callback(name, help, kind, tuple(labels), fn))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        out: List[str] = []
+        with self._lock:
+            for metric in self._metrics:
+                out.extend(metric.render())
+        return "\n".join(out) + "\n"
+
+
+class Counter:
+    def __init__(self, registry: Registry, name: str, help: str, labels: Tuple[str, ...]):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        if not self._registry.enabled:
+            return
+        with self._registry._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, values)} {_num(v)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        registry: Registry,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...],
+        buckets: Tuple[float, ...],
+    ):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        if not self._registry.enabled:
+            return
+        i = bisect_left(self.buckets, value)
+        with self._registry._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][i] += 1
+            state[1] += value
+
+    def count(self, *label_values: str) -> int:
+        state = self._values.get(label_values)
+        return sum(state[0]) if state else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts, strict=True):
+                cumulative += n
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{_num(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class Callback:
+    def __init__(self, name: str, help: str, kind: str, labels: Tuple[str, ...], fn: Callable):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labels = labels
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, v in sorted(self.fn().items()):
+            lines.append(f"{self.name}{_labels(self.labels, values)} {_num(v)}")
+        return lines
+
+
+REGISTRY = Registry(enabled=os.environ.get("YG_METRICS", "").lower() in ("1", "true", "yes"))
+
+requests_total = REGISTRY.counter(
+    "yamlguard_http_requests_total",
+    "HTTP requests by route, method and status.",
+    ("route", "method", "status"),
+)
+request_seconds = REGISTRY.histogram(
+    "yamlguard_http_request_duration_seconds", "HTTP request latency by route.", ("route",)
+)
+request_bytes = REGISTRY.histogram(
+    "yamlguard_http_request_bytes",
+    "Declared request body size by route.",
+    ("route",),
+    SIZE_BUCKETS,
+)
+file_bytes = REGISTRY.histogram(
+    "yamlguard_file_bytes", "Size of each validated YAML file.", (), SIZE_BUCKETS
+)
+stage_seconds = REGISTRY.histogram(
+    "yamlguard_stage_duration_seconds",
+    "Per-file processing time by stage (load_yaml, apply_rules, locate, canonicalize, "
+    "suggest_for_file).",
+    ("stage",),
+)
+rule_seconds = REGISTRY.histogram(
+    "yamlguard_rule_duration_seconds", "Per-file evaluation time of each rule.", ("rule_id",)
+)
+ratelimit_rejections = REGISTRY.counter(
+    "yamlguard_ratelimit_rejections_total", "Requests refused by the rate limiter."
+)
+
+# Compiled rule set cache of the API process (request rules and policies).
+REGISTRY.callback(
+    "yamlguard_rule_cache_lookups_total",
+    "Compiled rule set cache lookups by result.",
+    "counter",
+    ("result",),
+    lambda: {(k,): v for k, v in cache_stats().items()},
+)
+
+
+def enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def record_file(size: int, timings: Optional[Dict[str, float]], rule_times=None) -> None:
+    """Record what a worker task measured for one file."""
+    if not REGISTRY.enabled:
+        return
+    file_bytes.observe(size)
+    for stage, seconds in (timings or {}).items():
+        stage_seconds.observe(seconds, stage)
+    for rule_id, seconds in (rule_times or {}).items():
+        rule_seconds.observe(seconds, str(rule_id))
@@ -0,0 +1,155 @@
+# src/yamlguard/server/ratelimit.py
+"""Per-client rate limiting (GCRA, the constant-memory form of a token bucket).
+
+Each client is one float, its theoretical arrival time (TAT). With
+``RL_MAX_REQUESTS`` per ``RL_WINDOW_SECONDS`` a request of weight ``w`` costs
+``w * window / max`` seconds of TAT and is allowed while the TAT stays within
+``window`` of now, so a client can burst up to ``RL_MAX_REQUESTS`` and then
+gets one request per emission interval. Clients whose TAT is in the past have
+a full bucket and are evicted periodically.
+
+Backends (``RL_BACKEND``):
+
+* ``memory`` (default): a dict guarded by a lock, per process.
+* ``sqlite``: a table in ``RL_SQLITE_PATH``, updated in an immediate
+  transaction, so every uvicorn worker on the host shares the same limits.
+
+``RL_ROUTE_WEIGHTS`` sets per-route costs, e.g. ``/v1/validate=4,/health=0``
+(weight 0 exempts a route); unlisted routes cost 1.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+SWEEP_SECONDS = 60.0
+
+
+class MemoryBackend:
+    def __init__(self):
+        self._tat: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def acquire(self, key: str, now: float, cost: float, tolerance: float) -> float:
+        """Charge ``cost`` seconds to ``key``; returns 0 if allowed, else seconds to wait."""
+        with self._lock:
+            if now - self._swept_at >= SWEEP_SECONDS:
+                self._sweep(now)
+            tat = max(self._tat.get(key, now), now)
+            new_tat = tat + cost
+            if new_tat - now > tolerance + 1e-9:  # float slack for exact bursts
+                return new_tat - now - tolerance
+            self._tat[key] = new_tat
+            return 0.0
+
+    def _sweep(self, now: float) -> None:
+        self._swept_at = now
+        idle = [k for k, tat in self._tat.items() if tat <= now]
+        for k in idle:
+            del self._tat[k]
+
+
+class SqliteBackend:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._swept_at = 0.0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+    def acquire(self, key: str, now: float, cost: float, tolerance: float) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now - self._swept_at >= SWEEP_SECONDS:
+                self._swept_at = now
+                conn.execute("DELETE FROM buckets WHERE tat <= ?", (now,))
+            row = conn.execute("SELECT tat FROM buckets WHERE key = ?", (key,)).fetchone()
+            tat = max(row[0], now) if row else now
+            new_tat = tat + cost
+            if new_tat - now > tolerance + 1e-9:  # float slack for exact bursts
+                wait = new_tat - now - tolerance
+            else:
+                wait = 0.0
+                conn.execute(
+                    "INSERT INTO buckets (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """``"/v1/validate=4,/health=0"`` -> ``{"/v1/validate": 4.0, "/health": 0.0}``."""
+    weights: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        route, _, weight = item.partition("=")
+        try:
+            weights[route.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"RL_ROUTE_WEIGHTS: bad entry {item.strip()!r}") from None
+    return weights
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        max_requests: int = 120,
+        window_seconds: float = 60.0,
+        backend=None,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.interval = window_seconds / max(1, max_requests)
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.weights = weights or {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        kind = os.environ.get("RL_BACKEND", "memory")
+        if kind == "sqlite":
+            backend = SqliteBackend(os.environ.get("RL_SQLITE_PATH", "yamlguard-ratelimit.db"))
+        elif kind == "memory":
+            backend = MemoryBackend()
+        else:
+            raise ValueError(f"RL_BACKEND must be 'memory' or 'sqlite', not {kind!r}")
+        return cls(
+            max_requests=int(os.environ.get("RL_MAX_REQUESTS", "120")),
+            window_seconds=float(os.environ.get("RL_WINDOW_SECONDS", "60")),
+            backend=backend,
+            weights=parse_weights(os.environ.get("RL_ROUTE_WEIGHTS", "")),
+        )
+
+    def check(self, client: str, route: str, now: Optional[float] = None) -> Tuple[bool, float]:
+        """(allowed, retry_after_seconds) for one request from ``client`` to ``route``."""
+        weight = self.weights.get(route, 1.0)
+        if weight <= 0:
+            return True, 0.0
+        now = time.time() if now is None else now
+        # A full bucket is one window of TAT, i.e. max_requests unit requests.
+        wait = self.backend.acquire(client, now, weight * self.interval, self.window_seconds)
+        return wait == 0.0, wait
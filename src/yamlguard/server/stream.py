@@ -0,0 +1,253 @@
+# src/yamlguard/server/stream.py
+"""Incremental batch validation for POST /v1/validate/stream.
+
+Files arrive as NDJSON lines (``{"path": ..., "content": ...}``, optionally
+preceded by a ``{"rules": [...]}`` line) read straight off the request
+stream, or inside a tar / tar.gz / zip upload that is spooled to a temporary
+file (in memory up to a threshold, then on disk). Results are streamed back
+as NDJSON, one line per file, with at most ``window`` files in flight, so
+memory is bounded by the window rather than the batch.
+"""
+
+import asyncio
+import fnmatch
+import json
+import tarfile
+import tempfile
+import zipfile
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from yamlguard.core.regex import Budget, describe
+from yamlguard.core.rules import CompiledRuleSet, compile_rules
+from yamlguard.server import metrics
+from yamlguard.server.workers import Reservation, WorkPool, validate_file
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+TAR_TYPES = ("application/x-tar", "application/gzip", "application/x-gzip", "application/x-gtar")
+ZIP_TYPES = ("application/zip", "application/x-zip-compressed")
+
+_YAML_GLOB = "*.y*ml"
+_SPOOL_IN_MEMORY = 8 * 1024 * 1024
+
+
+class NdjsonResponse(StreamingResponse):
+    """StreamingResponse that leaves ``receive`` to the body iterator.
+
+    The stock class listens for disconnects on ``receive`` while streaming
+    (ASGI < 2.4), which would swallow the request body messages this endpoint
+    is still reading; a disconnect surfaces from ``request.stream()`` instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class StreamError(Exception):
+    """The request body cannot be read as the declared stream type."""
+
+
+@dataclass(frozen=True)
+class Item:
+    """One entry read from the stream: a file, a rules header, or a bad entry."""
+
+    path: Optional[str] = None
+    content: Optional[str] = None
+    rules: Optional[List[dict]] = None
+    error: Optional[str] = None
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes], max_line: int) -> AsyncIterator[Item]:
+    buf = b""
+    lineno = 0
+
+    def parse(raw: bytes) -> Optional[Item]:
+        if not raw.strip():
+            return None
+        try:
+            obj = json.loads(raw)
+        except ValueError as e:
+            return Item(error=f"line {lineno}: invalid JSON: {e}")
+        if not isinstance(obj, dict):
+            return Item(error=f"line {lineno}: expected an object")
+        if "rules" in obj and "content" not in obj:
+            if lineno != 1 or not isinstance(obj["rules"], list):
+                return Item(error=f"line {lineno}: rules must be a list on the first line")
+            return Item(rules=obj["rules"])
+        path, content = obj.get("path"), obj.get("content")
+        if not isinstance(path, str) or not isinstance(content, str):
+            return Item(path=path, error=f"line {lineno}: 'path' and 'content' must be strings")
+        return Item(path=path, content=content)
+
+    async for chunk in chunks:
+        buf += chunk
+        while True:
+            nl = buf.find(b"\n")
+            if nl == -1:
+                break
+            raw, buf = buf[:nl], buf[nl + 1 :]
+            lineno += 1
+            item = parse(raw)
+            if item is not None:
+                yield item
+        if len(buf) > max_line:
+            raise StreamError(f"line {lineno + 1} exceeds {max_line} bytes")
+    if buf:
+        lineno += 1
+        item = parse(buf)
+        if item is not None:
+            yield item
+
+
+async def spool(chunks: AsyncIterator[bytes], max_bytes: int):
+    """Copy the request body into a SpooledTemporaryFile, enforcing ``max_bytes``."""
+    tmp = tempfile.SpooledTemporaryFile(max_size=_SPOOL_IN_MEMORY)
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_bytes:
+            tmp.close()
+            raise StreamError(f"upload exceeds {max_bytes} bytes")
+        await run_in_threadpool(tmp.write, chunk)
+    tmp.seek(0)
+    return tmp
+
+
+def _decode(path: str, data: bytes, max_file: int) -> Item:
+    if len(data) > max_file:
+        return Item(path=path, error=f"file exceeds {max_file} bytes")
+    try:
+        return Item(path=path, content=data.decode("utf-8"))
+    except UnicodeDecodeError as e:
+        return Item(path=path, error=f"not UTF-8: {e}")
+
+
+def iter_archive(fileobj, kind: str, max_file: int) -> Iterator[Item]:
+    """YAML members of a tar(.gz) or zip archive, read one at a time; closes ``fileobj``."""
+    try:
+        if kind == "zip":
+            with zipfile.ZipFile(fileobj) as zf:
+                for info in zf.infolist():
+                    if info.is_dir() or not fnmatch.fnmatch(info.filename, _YAML_GLOB):
+                        continue
+                    if info.file_size > max_file:
+                        yield Item(path=info.filename, error=f"file exceeds {max_file} bytes")
+                        continue
+                    yield _decode(info.filename, zf.read(info), max_file)
+        else:
+            with tarfile.open(fileobj=fileobj, mode="r:*") as tf:
+                for member in tf:
+                    if not member.isfile() or not fnmatch.fnmatch(member.name, _YAML_GLOB):
+                        continue
+                    if member.size > max_file:
+                        yield Item(path=member.name, error=f"file exceeds {max_file} bytes")
+                        continue
+                    fh = tf.extractfile(member)
+                    yield _decode(member.name, fh.read() if fh else b"", max_file)
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError) as e:
+        raise StreamError(f"invalid {kind} archive: {e}") from e
+    finally:
+        fileobj.close()
+
+
+async def iter_sync(it: Iterator[Item]) -> AsyncIterator[Item]:
+    """Drive a blocking iterator from the threadpool."""
+    sentinel = object()
+    while True:
+        item = await run_in_threadpool(next, it, sentinel)
+        if item is sentinel:
+            return
+        yield item
+
+
+async def validate_stream(
+    items: AsyncIterator[Item],
+    pool: WorkPool,
+    slots: Reservation,
+    default_rules: CompiledRuleSet,
+    window: int,
+    budget_seconds: float = 0.0,
+) -> AsyncIterator[bytes]:
+    """Validate items as they arrive and yield NDJSON result lines in input order.
+
+    At most ``window`` files are submitted through ``slots`` (a reservation on
+    ``pool``) ahead of the line being written; reading from ``items`` pauses
+    until the oldest one finishes. ``slots`` is closed when the stream ends.
+    Each file's rule evaluation gets ``budget_seconds`` (0: unbounded).
+    """
+    rules: Any = pool.task_rules(default_rules)
+    inflight: deque = deque()
+    files = findings = errors = 0
+
+    timed = metrics.enabled()
+
+    async def result_line(path: str, size: int, fut) -> Tuple[bytes, int, bool]:
+        try:
+            res = await asyncio.wait_for(fut, pool.timeout)
+        except asyncio.TimeoutError:
+            return _line({"path": path, "error": "validation timed out"}), 0, True
+        except Exception as e:
+            return _line({"path": path, "error": str(e)}), 0, True
+        if timed:
+            metrics.record_file(size, res.get("timings"), res.get("rule_times"))
+        fs = res["findings"]
+        return _line({"path": path, "ok": not fs, "findings": fs}), len(fs), False
+
+    async def drain_one():
+        nonlocal findings, errors
+        path, size, fut = inflight.popleft()
+        line, n, failed = await result_line(path, size, fut)
+        findings += n
+        errors += failed
+        return line
+
+    try:
+        async for item in items:
+            if item.rules is not None:
+                try:
+                    ruleset = compile_rules(item.rules)
+                except Exception as e:
+                    raise StreamError(f"invalid rules: {e}") from e
+                if ruleset.risky:
+                    raise StreamError(
+                        "pattern may backtrack catastrophically: " + describe(ruleset.risky)
+                    )
+                rules = pool.task_rules(ruleset)
+                continue
+            files += 1
+            if item.error is not None:
+                errors += 1
+                while inflight:
+                    yield await drain_one()
+                yield _line({"path": item.path, "error": item.error})
+                continue
+            budget = Budget(budget_seconds) if budget_seconds > 0 else None
+            fut = await slots.submit(
+                validate_file, item.path, item.content, rules, False, timed, budget
+            )
+            inflight.append((item.path, len(item.content), fut))
+            while len(inflight) >= window:
+                yield await drain_one()
+        while inflight:
+            yield await drain_one()
+    except StreamError as e:
+        while inflight:
+            yield await drain_one()
+        errors += 1
+        yield _line({"error": str(e)})
+    finally:
+        for _path, _size, fut in inflight:
+            fut.cancel()
+        slots.close()
+    ok = not (findings or errors)
+    yield _line({"summary": {"ok": ok, "files": files, "findings": findings, "errors": errors}})
+
+
+def _line(obj: dict) -> bytes:
+    return (json.dumps(obj) + "\n").encode("utf-8")
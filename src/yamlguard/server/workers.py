@@ -0,0 +1,334 @@
+# src/yamlguard/server/workers.py
+"""Off-event-loop execution of per-file validation work for the API.
+
+Per-file tasks run on a dedicated executor: a process pool of ``YG_WORKERS``
+processes (default: one per CPU, so CPU-bound parsing and regex matching
+scale with cores instead of contending for the GIL), or with
+``YG_WORKERS=0`` a thread pool of ``YG_THREADS`` threads. Either way the
+work stays off the event loop and off Starlette's threadpool, so ``/health``
+keeps answering. Admission is bounded: at most ``YG_MAX_PENDING`` files may
+be queued or running, beyond which requests are refused with 503 +
+``Retry-After`` (a single request with more files than that is refused with
+413); each request must finish within ``YG_REQUEST_TIMEOUT`` seconds or gets
+a 504.
+
+The task functions only import ``yamlguard.core`` so they are cheap to load
+in spawned workers; canonicalization and suggestions are imported on first use.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from yamlguard.core.loader import PositionIndex, dump_yaml, iter_documents
+from yamlguard.core.locate import locate_finding
+from yamlguard.core.regex import Budget
+from yamlguard.core.rules import CompiledRuleSet, compile_rules, iter_findings
+
+
+class Saturated(Exception):
+    """Raised when accepting a request would exceed the pending-work bound."""
+
+
+class TooLarge(Exception):
+    """Raised for a request with more files than the pending bound itself."""
+
+
+# ---- Task functions (run in a worker) ----
+
+
+def _rules(rules: Any) -> CompiledRuleSet:
+    """Rules arrive compiled (thread mode) or as (fingerprint, source) (process mode)."""
+    if isinstance(rules, CompiledRuleSet):
+        return rules
+    fingerprint, source = rules
+    return compile_rules(source, fingerprint=fingerprint)
+
+
+def validate_file(
+    path: str,
+    content: str,
+    rules: Any,
+    optimize: bool = False,
+    timed: bool = False,
+    budget: Optional[Budget] = None,
+) -> dict:
+    """Findings (and the canonicalized text when ``optimize``) for one file.
+
+    With ``timed`` the result also carries ``timings`` (seconds per stage) and
+    ``rule_times`` (seconds per rule id) for the metrics endpoint. Rule
+    evaluation raises ``BudgetExceeded`` past ``budget``'s deadline.
+    """
+    clock = _Clock() if timed else None
+    rule_times: Optional[dict] = {} if timed else None
+    ruleset = _rules(rules)
+    positions = PositionIndex(content)
+    lines = content.splitlines()
+    docs = [] if optimize else None
+    fs = []
+    # Documents are parsed, evaluated and located one at a time; the stage
+    # timings add up each stage's share over all of them.
+    for item in _timed(clock, "load_yaml", iter_documents(content)):
+        if docs is not None:
+            docs.append(item[2])
+        found = list(iter_findings([item], ruleset, rule_times, budget=budget))
+        _lap(clock, "apply_rules")
+        for x in found:
+            x["file"] = path
+            ln, col, snip = locate_finding(content, x, positions, lines)
+            if ln is not None:
+                x["line"] = ln
+            if col is not None:
+                x["column"] = col
+            if snip:
+                x["snippet"] = snip
+        fs.extend(found)
+        _lap(clock, "locate")
+    optimized = None
+    if optimize:
+        from yamlguard.core.optimize import canonicalize
+
+        optimized = dump_yaml(canonicalize(docs[0] if len(docs) == 1 else docs or None))
+        _lap(clock, "canonicalize")
+    result = {"findings": fs, "optimized": optimized}
+    if timed:
+        result["timings"] = clock.laps
+        result["rule_times"] = rule_times
+    return result
+
+
+def suggest_file(
+    path: str,
+    content: str,
+    rules: Any,
+    timed: bool = False,
+    budget: Optional[Budget] = None,
+    findings: Optional[list] = None,
+) -> dict:
+    """``{"suggestions": [...]}`` for one file, plus ``timings`` when ``timed``.
+
+    ``findings`` computed earlier (e.g. by ``/v1/validate``) skip parsing and
+    rule evaluation; ``rules`` is then unused.
+    """
+    clock = _Clock() if timed else None
+    if findings is None:
+        ruleset = _rules(rules)
+        findings = []
+        for item in _timed(clock, "load_yaml", iter_documents(content)):
+            findings.extend(iter_findings([item], ruleset, budget=budget))
+            _lap(clock, "apply_rules")
+    from yamlguard.core.recommend import suggest_for_file
+
+    combo = suggest_for_file(path, findings, content)
+    _lap(clock, "suggest_for_file")
+    suggestions = []
+    if combo:
+        suggestions.append(
+            {
+                "file": path,
+                "title": combo.title,
+                "rationale": combo.rationale,
+                "diff": combo.diff,
+                "confidence": combo.confidence,
+            }
+        )
+    result = {"suggestions": suggestions}
+    if timed:
+        result["timings"] = clock.laps
+    return result
+
+
+class _Clock:
+    def __init__(self):
+        self.laps: dict = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Add the time since the previous lap to ``stage`` (stages may recur)."""
+        now = time.perf_counter()
+        self.laps[stage] = self.laps.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+def _lap(clock: Optional[_Clock], stage: str) -> None:
+    if clock is not None:
+        clock.lap(stage)
+
+
+def _timed(clock: Optional[_Clock], stage: str, items: Iterator) -> Iterator:
+    """``items``, with the time spent producing each one lapped as ``stage``."""
+    for item in items:
+        _lap(clock, stage)
+        yield item
+    _lap(clock, stage)
+
+
+# ---- Pool ----
+
+
+class WorkPool:
+    def __init__(
+        self,
+        workers: int = 0,
+        threads: int = 4,
+        max_pending: int = 256,
+        timeout: float = 30.0,
+        retry_after: int = 1,
+    ):
+        self.workers = workers
+        self.threads = threads
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "WorkPool":
+        return cls(
+            workers=int(os.environ.get("YG_WORKERS", str(os.cpu_count() or 1))),
+            threads=int(os.environ.get("YG_THREADS", "4")),
+            max_pending=int(os.environ.get("YG_MAX_PENDING", "256")),
+            timeout=float(os.environ.get("YG_REQUEST_TIMEOUT", "30")),
+            retry_after=int(os.environ.get("YG_RETRY_AFTER", "1")),
+        )
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.uses_processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.threads, thread_name_prefix="yamlguard-work"
+                    )
+            return self._executor
+
+    def task_rules(self, ruleset: CompiledRuleSet) -> Any:
+        """The form of the rule set shipped with each task."""
+        if self.uses_processes:
+            return (ruleset.fingerprint, ruleset.source)
+        return ruleset
+
+    async def map(self, fn: Callable, calls: Sequence[tuple]) -> list:
+        """Run ``fn(*args)`` for each args tuple; results are returned in order.
+
+        Raises TooLarge when ``calls`` alone exceeds the pending bound,
+        Saturated when the bound would be exceeded (a request that fits is
+        always admitted when nothing else is pending) and asyncio.TimeoutError
+        when the results do not arrive in time.
+        """
+        n = len(calls)
+        with self._lock:
+            self._admit(n)
+            self.pending += n
+        # Each task releases its slot when it finishes (or is cancelled), so
+        # work that outlives a timed-out request still counts against the bound.
+        submitted = []
+        try:
+            executor = self._get_executor()
+            for args in calls:
+                fut = executor.submit(fn, *args)
+                submitted.append(fut)
+                fut.add_done_callback(self._release)
+        except BaseException:
+            with self._lock:
+                self.pending -= n - len(submitted)
+            for fut in submitted:
+                fut.cancel()
+            raise
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(f) for f in submitted)), self.timeout
+            )
+        except BaseException:
+            for fut in submitted:
+                fut.cancel()
+            raise
+
+    def _admit(self, n: int) -> None:
+        if n > self.max_pending:
+            raise TooLarge()
+        if self.pending and self.pending + n > self.max_pending:
+            raise Saturated()
+
+    def reserve(self, n: int) -> "Reservation":
+        """Hold ``n`` pending slots for a long-lived caller such as a stream.
+
+        Raises Saturated like ``map``. The slots count against the bound until
+        the reservation is closed (or, for tasks still running then, until
+        they finish).
+        """
+        n = max(1, min(n, self.max_pending))
+        with self._lock:
+            self._admit(n)
+            self.pending += n
+        return Reservation(self, n)
+
+    def _release(self, _fut) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Reservation:
+    """A window of ``n`` slots on a WorkPool; ``submit`` waits for a free slot."""
+
+    def __init__(self, pool: WorkPool, n: int):
+        self._pool = pool
+        self._n = n
+        self._running = 0
+        self._closed = False
+        self._slots = asyncio.Semaphore(n)
+        self._loop = asyncio.get_running_loop()
+
+    async def submit(self, fn: Callable, *args) -> "asyncio.Future":
+        """Schedule ``fn(*args)`` once a slot is free; returns an awaitable future."""
+        await self._slots.acquire()
+        pool = self._pool
+        with pool._lock:
+            if self._closed:
+                self._slots.release()
+                raise RuntimeError("reservation is closed")
+            self._running += 1
+        try:
+            fut = pool._get_executor().submit(fn, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        fut.add_done_callback(self._done)
+        return asyncio.wrap_future(fut)
+
+    def _done(self, _fut) -> None:
+        pool = self._pool
+        with pool._lock:
+            self._running -= 1
+            if self._closed:
+                pool.pending -= 1
+                return
+        self._loop.call_soon_threadsafe(self._slots.release)
+
+    def close(self) -> None:
+        pool = self._pool
+        with pool._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pool.pending -= self._n - self._running
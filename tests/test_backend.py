@@ -0,0 +1,61 @@
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from yamlguard.core import backend as backends
+from yamlguard.core.loader import iter_documents
+
+ROOT = Path(__file__).resolve().parents[1]
+CORPUS = sorted(
+    [
+        *(ROOT / "tests" / "conformance").glob("*.yaml"),
+        *(ROOT / "examples").glob("*.y*ml"),
+        *(ROOT / "policies").glob("*/*.yaml"),
+    ]
+)
+
+
+def _typed(value):
+    """``value`` with the type of every node spelled out, so 1 != 1.0 != True."""
+    if isinstance(value, dict):
+        items = [(_typed(k), _typed(v)) for k, v in value.items()]
+        return type(value).__name__, items
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, [_typed(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return type(value).__name__, sorted(repr(_typed(v)) for v in value)
+    return type(value).__name__, repr(value)
+
+
+def _parse(name, text):
+    """(typed documents with start lines, error type or None) for one backend."""
+    docs = []
+    try:
+        for line, doc in backends.backend(name).documents(StringIO(text)):
+            docs.append((line, _typed(doc)))
+    except Exception as e:
+        return docs, type(e).__name__
+    return docs, None
+
+
+@pytest.mark.parametrize("path", CORPUS, ids=lambda p: str(p.relative_to(ROOT)))
+def test_backends_agree_with_ruamel(path):
+    text = path.read_text(encoding="utf-8")
+    docs, error = _parse("ruamel", text)
+    assert (error is not None) == path.name.startswith("error-")
+    for name in backends.available():
+        got, got_error = _parse(name, text)
+        assert got == docs, name
+        assert (got_error is None) == (error is None), name
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.delenv("YG_YAML_BACKEND", raising=False)
+    assert backends.backend().name == backends.available()[0]
+    monkeypatch.setenv("YG_YAML_BACKEND", "ruamel")
+    assert backends.backend().name == "ruamel"
+    assert [doc for _, _, doc in iter_documents("a: on\n")] == [{"a": "on"}]
+    monkeypatch.setenv("YG_YAML_BACKEND", "nope")
+    with pytest.raises(ValueError, match="YG_YAML_BACKEND"):
+        backends.backend()
@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from yamlguard.core.backend import available
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _bench(*argv):
+    return subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", *argv],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def test_benchmark_run_and_regression_gate(tmp_path):
+    results = tmp_path / "results.json"
+    proc = _bench(
+        "run", "--scale", "0.001", "--repeat", "1", "--only", "secret_env/*", "-o", str(results)
+    )
+    assert proc.returncode == 0, proc.stderr
+    data = json.loads(results.read_text())
+    assert set(data["results"]) == {
+        f"secret_env/{stage}"
+        for stage in (
+            "load_yaml",
+            *(f"parse_{name}" for name in available()),
+            "apply_rules",
+            "guess_location",
+            "suggest_for_file",
+            "canonicalize",
+            "cli",
+            "api_validate",
+        )
+    }
+    assert all(r["seconds"] > 0 and r["bytes"] > 0 for r in data["results"].values())
+
+    assert _bench("compare", str(results), str(results)).returncode == 0
+
+    # A baseline 10x faster than the results makes every gated case a regression.
+    faster = json.loads(results.read_text())
+    for r in faster["results"].values():
+        r["seconds"] /= 10
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(faster))
+    proc = _bench("compare", str(baseline), str(results), "--min-seconds", "0")
+    assert proc.returncode == 1
+    assert "REGRESSION" in proc.stdout
@@ -0,0 +1,238 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from yamlguard.cli.main import main
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(monkeypatch, capsys, *argv):
+    monkeypatch.setattr(sys, "argv", ["yamlguard", *argv])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    return exc.value.code, capsys.readouterr().out
+
+
+def test_parallel_jobs_match_serial_output(monkeypatch, capsys):
+    args = [
+        str(ROOT / "examples"),
+        "--rules",
+        str(ROOT / "policies" / "k8s" / "core.yaml"),
+        "--no-cache",
+    ]
+    code1, out1 = _run(monkeypatch, capsys, *args)
+    code2, out2 = _run(monkeypatch, capsys, *args, "-j", "2")
+    assert code1 == code2 == 1
+    assert out1 == out2
+    assert json.loads(out1)["findings"]
+
+
+def test_result_cache_reuses_unchanged_files(monkeypatch, capsys, tmp_path):
+    target = tmp_path / "pod.yaml"
+    target.write_text((ROOT / "examples" / "pod-mixed.yaml").read_text(encoding="utf-8"))
+    cache_dir = tmp_path / "cache"
+    rules = str(ROOT / "policies" / "k8s" / "core.yaml")
+    args = [str(target), "--rules", rules, "--cache-dir", str(cache_dir)]
+
+    code1, out1 = _run(monkeypatch, capsys, *args)
+    entries = list(cache_dir.rglob("*.json"))
+    assert len(entries) == 1
+
+    # a cached entry is served as-is, without re-evaluating the file
+    calls = []
+    monkeypatch.setattr("yamlguard.cli.main._evaluate", lambda *a: calls.append(a) or [])
+    code2, out2 = _run(monkeypatch, capsys, *args)
+    assert (code2, out2) == (code1, out1)
+    assert calls == []
+
+    target.write_text("kind: Pod\n")
+    _run(monkeypatch, capsys, *args)
+    assert len(calls) == 1
+
+
+def test_cache_eviction_only_walks_when_over_budget(monkeypatch, tmp_path):
+    from yamlguard.cli.cache import ResultCache
+
+    cache = ResultCache(str(tmp_path), "rules", max_bytes=64)
+    cache.put(cache.key("a"), [{"x": "1" * 20}])
+    assert 0 < cache.usage() <= 64
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(os, "walk", lambda *a: walks.append(a) or real_walk(*a))
+    cache.evict()
+    assert walks == []
+
+    cache.put(cache.key("b"), [{"x": "2" * 40}])
+    cache.evict()
+    assert len(walks) == 1
+    assert len(list(tmp_path.rglob("*.json"))) == 1  # the older entry was dropped
+    assert cache.usage() <= 64
+
+
+def test_changed_since_only_sees_the_diff(tmp_path):
+    import subprocess
+
+    from yamlguard.cli.files import changed_yaml_files
+
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "t")
+    (tmp_path / "old.yaml").write_text("a: 1\n")
+    (tmp_path / "touched.yml").write_text("a: 1\n")
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / ".yamlguardignore").write_text("# generated\nvendor/\n!vendor/keep.yaml\n")
+    git("add", "-A")
+    git("commit", "-qm", "base")
+
+    (tmp_path / "touched.yml").write_text("a: 2\n")
+    for rel in ["new.yaml", "notes.txt", "build/out.yaml", "vendor/x.yaml", "sub/deep.yaml"]:
+        (tmp_path / rel).parent.mkdir(exist_ok=True)
+        (tmp_path / rel).write_text("b: 1\n")
+
+    got = changed_yaml_files("HEAD", cwd=str(tmp_path))
+    assert got == ["new.yaml", "sub/deep.yaml", "touched.yml"]
+    assert changed_yaml_files("HEAD", ["sub"], cwd=str(tmp_path)) == ["sub/deep.yaml"]
+    out = tmp_path / "leak.txt"
+    with pytest.raises(SystemExit, match="is not a commit"):
+        changed_yaml_files(f"--output={out}", cwd=str(tmp_path))
+    assert not out.exists()
+
+
+def test_walker_prunes_dedupes_and_survives_symlink_loops(tmp_path, monkeypatch):
+    from yamlguard.cli.files import iter_yaml_files
+
+    for rel in [
+        "a.yaml",
+        "b.yml",
+        "c.json",
+        "sub/d.yaml",
+        "sub/gen/e.yaml",
+        "node_modules/pkg/f.yaml",
+        ".github/workflows/ci.yml",
+    ]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("a: 1\n")
+    (tmp_path / "sub" / "loop").symlink_to(tmp_path, target_is_directory=True)
+    monkeypatch.chdir(tmp_path)
+
+    got = list(iter_yaml_files([".", "sub", "a.yaml"], exclude=["gen/"]))
+    assert [os.path.relpath(p) for p in got] == ["a.yaml", "b.yml", os.path.join("sub", "d.yaml")]
+
+    hidden = list(iter_yaml_files(["."], include=["*.yml"], hidden=True))
+    assert sorted(os.path.relpath(p) for p in hidden) == [
+        os.path.join(".github", "workflows", "ci.yml"),
+        "b.yml",
+    ]
+
+
+def test_streaming_formats(monkeypatch, capsys):
+    args = [
+        str(ROOT / "examples" / "pod-mixed.yaml"),
+        "--rules",
+        str(ROOT / "policies" / "k8s" / "core.yaml"),
+        "--no-cache",
+    ]
+    _, out = _run(monkeypatch, capsys, *args)
+    expected = json.loads(out)["findings"]
+
+    code, out = _run(monkeypatch, capsys, *args, "--format", "ndjson")
+    lines = [json.loads(ln) for ln in out.splitlines()]
+    assert code == 1
+    assert lines[:-1] == expected
+    assert lines[-1]["summary"]["findings"] == len(expected)
+
+    code, out = _run(monkeypatch, capsys, *args, "--format", "sarif")
+    sarif = json.loads(out)
+    results = sarif["runs"][0]["results"]
+    assert code == 1 and sarif["version"] == "2.1.0"
+    assert [r["ruleId"] for r in results] == [f["rule_id"] for f in expected]
+    assert results[0]["locations"][0]["physicalLocation"]["region"]["startLine"] == 14
+    assert {r["id"] for r in sarif["runs"][0]["tool"]["driver"]["rules"]} >= {"K8S-NO-LATEST-TAG"}
+
+
+def test_ignore_file_is_anchored_to_its_own_directory(tmp_path, monkeypatch):
+    from yamlguard.cli.files import find_ignore_file, iter_yaml_files
+
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".yamlguardignore").write_text("k8s/legacy/\n/top.yaml\n")
+    for rel in ["top.yaml", "k8s/legacy/x.yaml", "k8s/new/y.yaml", "k8s/top.yaml"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("a: 1\n")
+
+    def walk(cwd, *paths):
+        monkeypatch.chdir(cwd)
+        found = iter_yaml_files(paths, ignore_file=find_ignore_file())
+        return sorted(os.path.relpath(p, tmp_path).replace(os.sep, "/") for p in found)
+
+    expected = ["k8s/new/y.yaml", "k8s/top.yaml"]
+    assert walk(tmp_path, ".") == expected
+    assert walk(tmp_path, "k8s") == expected
+    assert walk(tmp_path / "k8s", ".") == expected
+    assert walk(tmp_path / "k8s" / "legacy", "..") == expected
+
+
+def test_profile_rules_serial_and_parallel_agree(monkeypatch, capsys, tmp_path):
+    args = [
+        str(ROOT / "examples"),
+        "--rules",
+        str(ROOT / "policies" / "k8s" / "core.yaml"),
+        "--no-cache",
+        "--profile-rules",
+    ]
+    counts = []
+    for jobs in ("1", "2"):
+        out_json = tmp_path / f"profile-{jobs}.json"
+        _run(monkeypatch, capsys, *args, "-j", jobs, "--profile-json", str(out_json))
+        rows = json.loads(out_json.read_text())["assertions"]
+        assert rows and all(r["evaluations"] > 0 for r in rows)
+        assert [r["seconds"] for r in rows] == sorted((r["seconds"] for r in rows), reverse=True)
+        counts.append(sorted((r["rule_id"], r["index"], r["nodes"], r["findings"]) for r in rows))
+    assert counts[0] == counts[1]
+
+
+def _run_err(monkeypatch, capsys, *argv):
+    monkeypatch.setattr(sys, "argv", ["yamlguard", *argv])
+    with pytest.raises(SystemExit):
+        main()
+    return capsys.readouterr().err
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_autofix_writes_each_file_once_keeping_mode_and_line_endings(
+    monkeypatch, capsys, tmp_path, jobs
+):
+    pod = (ROOT / "examples" / "pod-mixed.yaml").read_text(encoding="utf-8")
+    crlf = tmp_path / "crlf.yaml"
+    crlf.write_bytes(pod.replace("\n", "\r\n").encode("utf-8"))
+    os.chmod(crlf, 0o640)
+    clean = tmp_path / "clean.yaml"
+    clean.write_text("kind: ConfigMap\ndata: {a: b}\n")
+    clean_mtime = clean.stat().st_mtime_ns
+    args = [str(tmp_path), "--rules", str(ROOT / "policies" / "k8s" / "core.yaml"), "--no-cache"]
+
+    err = _run_err(monkeypatch, capsys, *args, "--autofix", "--dry-run", "-j", jobs)
+    assert f"would fix {crlf} (-6/+35 bytes)" in err  # latest -> 1.0@sha256:...
+    assert "autofix: would fix 1 file(s)" in err
+    assert crlf.read_bytes() == pod.replace("\n", "\r\n").encode("utf-8")
+
+    _run_err(monkeypatch, capsys, *args, "--autofix", "-j", jobs)
+    fixed = crlf.read_bytes()
+    # both findings on the image (tag and digest) land in one write
+    expected = pod.replace(
+        "image: nginx:latest", "image: nginx:1.0@sha256:REPLACE_WITH_REAL_DIGEST"
+    )
+    assert fixed == expected.replace("\n", "\r\n").encode("utf-8")
+    assert oct(crlf.stat().st_mode & 0o777) == oct(0o640)
+    assert clean.stat().st_mtime_ns == clean_mtime
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
+
+    # nothing left to fix
+    err = _run_err(monkeypatch, capsys, *args, "--autofix", "-j", jobs)
+    assert "autofix: fixed 0 file(s)" in err
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from yamlguard.cli import daemon
+from yamlguard.cli.main import main
+
+ROOT = Path(__file__).resolve().parents[1]
+ARGS = ["examples", "--rules", "policies/k8s/core.yaml", "--no-cache", "--format", "ndjson"]
+
+
+def _run(capsys, *argv):
+    with pytest.raises(SystemExit) as exc:
+        main(list(argv))
+    captured = capsys.readouterr()
+    return exc.value.code, captured.out, captured.err
+
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    sock = str(tmp_path / "yg.sock")
+    monkeypatch.setenv(daemon.SOCKET_ENV, sock)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "yamlguard.cli.main", "daemon"],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    deadline = time.monotonic() + 30
+    while not os.path.exists(sock):
+        assert proc.poll() is None, proc.stderr.read()
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.05)
+    yield sock
+    if proc.poll() is None:
+        proc.terminate()
+    proc.wait(timeout=10)
+    proc.stderr.close()
+
+
+def test_cli_runs_in_the_daemon_with_the_same_output(served, capsys, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    local = _run(capsys, *ARGS, "--no-daemon")
+    assert local[0] == 1 and local[1]
+
+    assert _run(capsys, *ARGS) == local  # relative paths resolve in the client's cwd
+    monkeypatch.setenv("YG_YAML_BACKEND", "nope")  # the client's YG_* environment applies
+    code, out, err = _run(capsys, *ARGS)
+    assert code == 1 and "YG_YAML_BACKEND must be" in err
+    monkeypatch.delenv("YG_YAML_BACKEND")
+    assert _run(capsys, "--bogus")[0] == 2  # argparse errors come back as they are
+
+    assert daemon.main(["--status"]) == 0
+    assert "3 invocation(s) served" in capsys.readouterr().out
+
+
+def test_client_falls_back_in_process(served, capsys, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    local = _run(capsys, *ARGS, "--no-daemon")
+
+    # a daemon running other code refuses, and the CLI runs here instead
+    monkeypatch.setattr(daemon, "identity", lambda: "elsewhere")
+    code, out, err = _run(capsys, *ARGS)
+    assert (code, out) == local[:2] and "restart it" in err
+    monkeypatch.undo()
+    monkeypatch.chdir(ROOT)
+
+    monkeypatch.setenv(daemon.SOCKET_ENV, served)
+    assert daemon.main(["--stop"]) == 0
+    deadline = time.monotonic() + 10
+    while os.path.exists(served):
+        assert time.monotonic() < deadline, "daemon did not stop"
+        time.sleep(0.05)
+    assert daemon.run_via_daemon(ARGS) is None
+    assert _run(capsys, *ARGS) == local
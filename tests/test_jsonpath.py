@@ -0,0 +1,126 @@
+import datetime
+import random
+
+from jsonpath_ng.ext import parse
+
+from yamlguard.core.jsonpath import (
+    FastPath,
+    JsonPathNgPath,
+    compile_accessor,
+    concrete_path,
+    fast_path,
+)
+from yamlguard.core.rules import compile_rules
+
+NAMES = ["a", "b", "image", "spec", "env", "x-y"]
+LEAVES = [
+    "s",
+    "",
+    "nginx:latest",
+    0,
+    7,
+    -1,
+    1.5,
+    True,
+    False,
+    None,
+    datetime.date(2024, 1, 2),
+    b"\x00\x01",
+]
+
+
+def _doc(rng: random.Random, depth: int = 0):
+    roll = rng.random()
+    if depth >= 4 or roll < 0.35:
+        return rng.choice(LEAVES)
+    if roll < 0.7:
+        keys = rng.sample(NAMES + [1, "where"], rng.randint(0, 4))
+        return {k: _doc(rng, depth + 1) for k in keys}
+    return [_doc(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+def _path(rng: random.Random) -> str:
+    steps = []
+    for _ in range(rng.randint(0, 4)):
+        roll = rng.random()
+        if roll < 0.35:
+            steps.append("." + rng.choice(NAMES))
+        elif roll < 0.45:
+            steps.append(".*")
+        elif roll < 0.6:
+            steps.append("[*]")
+        elif roll < 0.75:
+            steps.append(f"[{rng.randint(-3, 3)}]")
+        elif roll < 0.9:
+            steps.append(".." + rng.choice(NAMES))
+        else:
+            steps.append("..*")
+    return "$" + "".join(steps)
+
+
+def _reference(doc, path: str) -> list:
+    try:
+        return [(m.value, concrete_path(doc, m)) for m in parse(path).find(doc)]
+    except Exception:
+        return []
+
+
+def _native(doc, accessor) -> list:
+    try:
+        return accessor.located(doc)
+    except Exception:
+        return []
+
+
+def _same(got: list, want: list) -> bool:
+    def key(items):
+        return [(type(v), repr(v), p) for v, p in items]
+
+    return key(got) == key(want)
+
+
+def test_native_paths_match_jsonpath_ng_on_a_fuzz_corpus():
+    rng = random.Random(20240)
+    for _ in range(3000):
+        doc, path = _doc(rng), _path(rng)
+        accessor = compile_accessor(path)
+        assert isinstance(accessor, FastPath), path
+        want = _reference(doc, path)
+        got = _native(doc, accessor)
+        assert _same(got, want), (path, doc)
+        values = [v for v, _ in want]
+        try:
+            native_values = accessor.values(doc)
+        except Exception:
+            native_values = []
+        assert [repr(v) for v in native_values] == [repr(v) for v in values], (path, doc)
+
+
+def test_other_syntax_falls_back_to_jsonpath_ng():
+    for path in (
+        "$.spec.containers[?(@.name == 'a')].image",
+        "$.a[0:2]",
+        "$['a b']",
+        "$.a,b",
+        "$.where",
+        "spec.containers",
+        "$.a[ 1 ]",
+    ):
+        assert fast_path(path) is None, path
+    doc = {"spec": {"containers": [{"name": "a", "image": "x"}, {"name": "b", "image": "y"}]}}
+    accessor = compile_accessor("$.spec.containers[?(@.name == 'b')].image")
+    assert isinstance(accessor, JsonPathNgPath)
+    assert accessor.located(doc) == [("y", "$.spec.containers[1].image")]
+
+
+def test_shipped_policy_paths_are_native():
+    import pathlib
+
+    import yaml
+
+    root = pathlib.Path(__file__).resolve().parents[1] / "policies"
+    for policy in root.rglob("*.yaml"):
+        ruleset = compile_rules(yaml.safe_load(policy.read_text(encoding="utf-8")))
+        for rule in ruleset.rules:
+            for a in rule.assertions:
+                assert isinstance(a.expr, FastPath), (policy.name, a.path)
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from yamlguard.core.loader import PositionIndex, iter_documents
+from yamlguard.core.rules import iter_findings
+
+RULES = [
+    {
+        "id": "NO_LATEST",
+        "when": {"kind": "Pod"},
+        "assert": [{"path": "$.spec.containers[*].image", "not_matches": ":latest$"}],
+    }
+]
+POD = "kind: Pod\nspec:\n  containers:\n  - image: nginx:{tag}\n"
+
+
+def test_documents_are_read_lazily_from_a_file_object():
+    stream = io.StringIO("---\n".join(POD.format(tag=i) for i in range(20000)))
+    docs = iter_documents(stream)
+    index, line, doc = next(docs)
+    assert (index, line) == (0, 1)
+    assert doc["spec"]["containers"][0]["image"] == "nginx:0"
+    assert stream.tell() < len(stream.getvalue()) // 10  # only the first chunks were read
+    assert next(docs)[:2] == (1, 6)
+
+
+def test_a_top_level_sequence_is_one_document():
+    text = "# list\n- kind: Pod\n- kind: Service\n---\nkind: Pod\n"
+    docs = list(iter_documents(text))
+    assert [(i, line) for i, line, _ in docs] == [(0, 2), (1, 5)]
+    assert docs[0][2] == [{"kind": "Pod"}, {"kind": "Service"}]
+
+
+def test_findings_stream_per_document_with_positions():
+    text = "---\n".join([POD.format(tag="latest"), "kind: Service\n", POD.format(tag="latest")])
+    text += "---\nbroken: [\n"
+    positions = PositionIndex(text)
+    found = iter_findings(iter_documents(text), RULES)
+
+    first = next(found)
+    assert first["doc_index"] == 0
+    assert positions.get(0, first["paths"][0]) == (4, 12)
+    second = next(found)
+    assert second["doc_index"] == 2
+    assert positions.get(2, second["paths"][0]) == (11, 12)
+    assert positions.get(0, "$.kind") == (1, 7)  # looking back composes again
+    with pytest.raises(ValueError, match="YAML_PARSE_ERROR"):
+        next(found)
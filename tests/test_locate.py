@@ -0,0 +1,59 @@
+from yamlguard.core.loader import load_yaml_with_positions
+from yamlguard.core.locate import locate_finding
+from yamlguard.core.rules import apply_rules
+
+RULES = [
+    {
+        "id": "NO_LATEST",
+        "when": {"kind": "Pod"},
+        "assert": [{"path": "$.spec.containers[*].image", "not_matches": ":latest$"}],
+    }
+]
+
+
+def test_exact_location_for_repeated_values():
+    text = (
+        "kind: Pod\n"
+        "spec:\n"
+        "  initContainers:\n"
+        "    - image: nginx:latest\n"
+        "  containers:\n"
+        "    - name: a\n"
+        "      image: nginx:1.25\n"
+        "    - name: b\n"
+        "      image: nginx:latest\n"
+    )
+    doc, positions = load_yaml_with_positions(text)
+    (finding,) = apply_rules(doc, RULES)
+    assert finding["paths"] == ["$.spec.containers[1].image"]
+
+    line, column, snippet = locate_finding(text, finding, positions)
+    assert (line, column) == (9, 14)
+    assert "image: nginx:latest" in snippet.splitlines()[-1]
+
+
+def test_positions_are_per_document():
+    text = (
+        "kind: Pod\n"
+        "spec: {containers: [{image: a:1}]}\n"
+        "---\n"
+        "kind: Pod\n"
+        "spec:\n"
+        "  containers:\n"
+        "  - image: b:latest\n"
+    )
+    doc, positions = load_yaml_with_positions(text)
+    (finding,) = apply_rules(doc, RULES)
+    assert finding["doc_index"] == 1
+    assert positions.get(1, "$.spec.containers[0].image") == (7, 12)
+    assert locate_finding(text, finding, positions)[0] == 7
+
+
+def test_positions_are_lazy_and_follow_merge_keys():
+    text = "base: &b\n  image: a:latest\n  port: 80\nsvc:\n  <<: *b\n  port: 81\n"
+    doc, positions = load_yaml_with_positions(text)
+    assert positions._docs is None  # nothing composed until a lookup
+    assert positions.get(0, "$.svc.port") == (6, 9)
+    assert positions.get(0, "$.svc.image") == (2, 10)  # via the merged anchor
+    assert positions.get(0, "$.svc.missing") is None
+    assert positions.get(1, "$.svc") is None
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from yamlguard.server import main as server
+from yamlguard.server import metrics
+from yamlguard.server.workers import WorkPool
+
+ROOT = Path(__file__).resolve().parents[1]
+POD = (ROOT / "examples" / "pod-mixed.yaml").read_text(encoding="utf-8")
+RULES = [{"id": "NO_LATEST", "assert": [{"path": "$..image", "not_matches": ":latest$"}]}]
+
+
+def test_metrics_disabled_by_default():
+    assert TestClient(server.app).get("/metrics").status_code == 404
+
+
+def test_metrics_expose_routes_stages_and_rules(monkeypatch):
+    monkeypatch.setattr(metrics.REGISTRY, "enabled", True)
+    monkeypatch.setattr(server, "work_pool", WorkPool())
+    client = TestClient(server.app)
+    payload = {"files": [{"path": "p.yaml", "content": POD}], "rules": RULES, "optimize": True}
+    assert client.post("/v1/validate", json=payload).status_code == 200
+    assert client.post("/v1/suggest", json=payload).status_code == 200
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    assert 'yamlguard_http_requests_total{route="/v1/validate",method="POST",status="200"}' in text
+    for stage in ("load_yaml", "apply_rules", "locate", "canonicalize", "suggest_for_file"):
+        assert f'yamlguard_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'yamlguard_rule_duration_seconds_count{rule_id="NO_LATEST"} 1' in text
+    assert 'yamlguard_rule_cache_lookups_total{result="hit"}' in text
+    assert "yamlguard_file_bytes_bucket{le=\"+Inf\"}" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = metrics.Registry(enabled=True)
+    h = reg.histogram("t_seconds", "test", ("k",), buckets=(1, 2))
+    for v in (0.5, 1, 1.5, 3):
+        h.observe(v, "a")
+    lines = reg.render().splitlines()
+    assert 't_seconds_bucket{k="a",le="1"} 2' in lines
+    assert 't_seconds_bucket{k="a",le="2"} 3' in lines
+    assert 't_seconds_bucket{k="a",le="+Inf"} 4' in lines
+    assert 't_seconds_sum{k="a"} 6' in lines
@@ -0,0 +1,65 @@
+import os
+
+from fastapi.testclient import TestClient
+
+from yamlguard.core.policy import PolicyRegistry
+from yamlguard.server import main as server
+
+RULE = """- id: {rid}
+  severity: high
+  when: {{}}
+  assert:
+    - path: $.image
+      not_matches: ':latest$'
+"""
+
+
+def test_registry_reuses_snapshot_until_files_change(tmp_path):
+    (tmp_path / "k8s").mkdir()
+    policy = tmp_path / "k8s" / "core.yaml"
+    policy.write_text(RULE.format(rid="A"))
+    reg = PolicyRegistry(str(tmp_path), recheck_seconds=0)
+
+    first = reg.snapshot()
+    assert [r["id"] for r in first.rules] == ["A"]
+    assert [(f.group, f.file, f.rules) for f in first.files] == [("k8s", "core.yaml", 1)]
+    assert reg.snapshot() is first
+
+    policy.write_text(RULE.format(rid="A") + "\n" + RULE.format(rid="B"))
+    os.utime(policy, ns=(first.signature[-1][1] + 10**9,) * 2)
+    second = reg.snapshot()
+    assert second is not first
+    assert [r["id"] for r in second.rules] == ["A", "B"]
+    assert second.compiled is not first.compiled
+
+
+def test_reload_endpoint(tmp_path, monkeypatch):
+    (tmp_path / "k8s").mkdir()
+    (tmp_path / "k8s" / "core.yaml").write_text(RULE.format(rid="ONLY"))
+    monkeypatch.setattr(server, "policy_registry", PolicyRegistry(str(tmp_path), 3600))
+    client = TestClient(server.app)
+
+    assert client.post("/v1/policies/reload").json() == {"policies": 1, "rules": 1}
+    listing = client.get("/v1/policies").json()["policies"]
+    assert listing == [{"group": "k8s", "file": "core.yaml", "rules": 1}]
+    files = [{"path": "x", "content": "image: a:latest"}]
+    resp = client.post("/v1/validate", json={"files": files})
+    assert [f["rule_id"] for f in resp.json()["findings"]] == ["ONLY"]
+
+
+def test_bad_pattern_skips_only_that_rule(tmp_path, monkeypatch):
+    (tmp_path / "k8s").mkdir()
+    (tmp_path / "k8s" / "a.yaml").write_text(RULE.format(rid="GOOD"))
+    (tmp_path / "k8s" / "b.yaml").write_text(
+        "- id: BROKEN\n  when: {kind: Nope}\n  assert:\n    - path: $.x\n      not_matches: '('\n"
+    )
+    monkeypatch.setattr(server, "policy_registry", PolicyRegistry(str(tmp_path), 3600))
+    client = TestClient(server.app)
+
+    assert client.get("/v1/policies").status_code == 200
+    files = [{"path": "p.yaml", "content": "image: a:latest\n"}]
+    resp = client.post("/v1/validate", json={"files": files})
+    assert resp.status_code == 200
+    assert [f["rule_id"] for f in resp.json()["findings"]] == ["GOOD"]
+    errors = server.policy_registry.snapshot().compiled.errors
+    assert [rid for rid, _msg in errors] == ["BROKEN"]
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+
+from yamlguard.server import main as server
+from yamlguard.server.ratelimit import (
+    SWEEP_SECONDS,
+    MemoryBackend,
+    RateLimiter,
+    SqliteBackend,
+    parse_weights,
+)
+
+
+def test_burst_then_steady_rate():
+    rl = RateLimiter(max_requests=3, window_seconds=3)
+    assert [rl.check("a", "/x", now=100)[0] for _ in range(4)] == [True, True, True, False]
+    allowed, wait = rl.check("a", "/x", now=100)
+    assert not allowed and wait == 1.0
+    assert rl.check("b", "/x", now=100)[0]  # clients are independent
+    assert rl.check("a", "/x", now=101)[0]  # one interval refills one request
+    assert not rl.check("a", "/x", now=101)[0]
+
+
+def test_route_weights_and_exemptions():
+    rl = RateLimiter(max_requests=4, window_seconds=4, weights=parse_weights("/v=2, /health=0"))
+    assert rl.check("a", "/v", now=0)[0]
+    assert rl.check("a", "/v", now=0)[0]
+    assert not rl.check("a", "/v", now=0)[0]
+    assert not rl.check("a", "/other", now=0)[0]
+    assert all(rl.check("a", "/health", now=0)[0] for _ in range(10))
+
+
+def test_idle_clients_are_evicted():
+    backend = MemoryBackend()
+    rl = RateLimiter(max_requests=10, window_seconds=10, backend=backend)
+    for i in range(50):
+        rl.check(f"10.0.0.{i}", "/x", now=SWEEP_SECONDS)
+    assert len(backend) == 50
+    rl.check("late", "/x", now=2 * SWEEP_SECONDS + 1)
+    assert len(backend) == 1
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    path = str(tmp_path / "rl.db")
+    one = RateLimiter(max_requests=2, window_seconds=2, backend=SqliteBackend(path))
+    two = RateLimiter(max_requests=2, window_seconds=2, backend=SqliteBackend(path))
+    assert one.check("a", "/x", now=5)[0]
+    assert two.check("a", "/x", now=5)[0]
+    assert not one.check("a", "/x", now=5)[0]
+    assert two.check("a", "/x", now=6)[0]
+
+
+def test_middleware_answers_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(server, "rate_limiter", RateLimiter(max_requests=2, window_seconds=60))
+    client = TestClient(server.app)
+    assert [client.get("/health").status_code for _ in range(3)] == [200, 200, 429]
+    resp = client.get("/health")
+    assert resp.headers["retry-after"] == "30"
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import yaml
+from fastapi.testclient import TestClient
+
+from yamlguard.core import recommend
+from yamlguard.core.loader import load_yaml
+from yamlguard.core.recommend import suggest_for_file, suggest_for_finding
+from yamlguard.core.rules import apply_rules
+from yamlguard.server import main as server
+
+ROOT = Path(__file__).resolve().parents[1]
+POD = (ROOT / "examples" / "pod-mixed.yaml").read_text(encoding="utf-8")
+RULES = yaml.safe_load((ROOT / "policies" / "k8s" / "core.yaml").read_text(encoding="utf-8"))
+
+
+def _changed_lines(diff: str):
+    return [ln for ln in diff.splitlines() if ln[:1] in "+-" and not ln.startswith(("+++", "---"))]
+
+
+def test_file_suggestion_parses_once_and_edits_only_flagged_nodes(monkeypatch):
+    findings = apply_rules(load_yaml(POD), RULES)
+    assert len(findings) == 2  # latest tag + missing digest on the same image
+
+    parses = []
+    real = recommend._SpanDocument
+    monkeypatch.setattr(recommend, "_SpanDocument", lambda text: parses.append(text) or real(text))
+    s = suggest_for_file("pod.yaml", findings, POD)
+
+    assert len(parses) == 1
+    assert _changed_lines(s.diff) == [
+        "-      image: nginx:latest",
+        "+      image: nginx:1.0@sha256:REPLACE_WITH_REAL_DIGEST",
+    ]
+    # comments and the compliant container are untouched
+    assert s.patched_text.startswith("# A Pod containing two containers")
+    assert "nginx:1.25@sha256:" + "a" * 64 in s.patched_text
+
+
+def test_limits_are_inserted_without_touching_the_rest_of_the_file():
+    text = (
+        "kind: Pod  # keep me\n"
+        "spec:\n"
+        "    containers:\n"
+        "    -   name: a\n"
+        "        image: 'nginx:latest'   # pinned later\n"
+        "        resources:\n"
+        "            requests: {cpu: 1}\n"
+        "    -   {name: b, image: nginx:1.0}\n"
+    )
+    findings = [
+        {"rule_id": "NO_LATEST", "doc_index": 0, "paths": ["$.spec.containers[0].image"]},
+        {
+            "rule_id": "K8S-RESOURCES-LIMITS-PRESENT",
+            "doc_index": 0,
+            "paths": ["$.spec.containers[0].resources.limits.cpu"],
+        },
+    ]
+    s = suggest_for_file("pod.yaml", findings, text)
+    assert s.patched_text == text.replace(
+        "'nginx:latest'", "'nginx:1.0" + recommend.DIGEST_PLACEHOLDER + "'"
+    ).replace(
+        "{cpu: 1}\n",
+        "{cpu: 1}\n            limits:\n                cpu: 100m\n                memory: 128Mi\n",
+    )
+
+    # a flow-style container cannot be spliced into: the tree fallback still fixes it
+    flow = [
+        {
+            "rule_id": "K8S-RESOURCES-LIMITS-PRESENT",
+            "doc_index": 0,
+            "paths": ["$.spec.containers[1].resources"],
+        }
+    ]
+    s = suggest_for_file("pod.yaml", flow, text)
+    b = yaml.safe_load(s.patched_text)["spec"]["containers"][1]
+    assert b["resources"] == {"limits": {"cpu": "100m", "memory": "128Mi"}}
+    assert "# keep me" in s.patched_text
+
+
+def test_secret_masking_replaces_only_the_scalar():
+    text = "env:\n  TOKEN: |\n    ghp_abc\n\n  # next\n  OTHER: x\nkey: 'a''b'\n"
+    findings = [
+        {"rule_id": "SECRET-GH", "doc_index": 0, "paths": ["$.env.TOKEN"]},
+        {"rule_id": "SECRET-K", "doc_index": 0, "paths": ["$.key"]},
+    ]
+    s = suggest_for_file("a.yaml", findings, text)
+    assert s.patched_text == "env:\n  TOKEN: \"*****\"\n\n  # next\n  OTHER: x\nkey: '*****'\n"
+
+
+def test_findings_without_paths_fall_back_to_values():
+    text = "kind: Pod\nspec:\n  containers:\n  - name: a\n    image: nginx:latest\n"
+    s = suggest_for_finding("p.yaml", {"rule_id": "NO_LATEST", "values": ["nginx:latest"]}, text)
+    assert s.title == "Pin image tag (avoid :latest)"
+    assert "image: nginx:1.0@sha256:REPLACE_WITH_REAL_DIGEST" in s.patched_text
+    assert suggest_for_finding("p.yaml", {"rule_id": "UNKNOWN"}, text) is None
+
+
+def test_suggest_accepts_precomputed_findings():
+    client = TestClient(server.app)
+    payload = {"files": [{"path": "pod.yaml", "content": POD}], "rules": RULES}
+    fresh = client.post("/v1/suggest", json=payload).json()
+
+    findings = client.post("/v1/validate", json=payload).json()["findings"]
+    reused = client.post(
+        "/v1/suggest",
+        json={"files": payload["files"], "findings": findings, "rules": [{"id": "IGNORED"}]},
+    ).json()
+    assert reused == fresh and len(fresh["suggestions"]) == 1
+
+    other = client.post(
+        "/v1/suggest",
+        json={"files": [{"path": "other.yaml", "content": POD}], "findings": findings},
+    ).json()
+    assert other["suggestions"] == []
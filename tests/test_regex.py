@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from yamlguard.core.policy import PolicyRegistry
+from yamlguard.core.regex import Budget, BudgetExceeded, backtracking_risk, compile_pattern
+from yamlguard.core.rules import apply_rules, compile_rules
+from yamlguard.server import main as server
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _rule(rule_id, pattern, path="$.spec.containers[*].image"):
+    return {"id": rule_id, "severity": "high", "assert": [{"path": path, "not_matches": pattern}]}
+
+
+def test_backtracking_risk_flags_exponential_shapes_only():
+    for risky in (r"(a+)+$", r"(\w+\s?)*$", r"^(\d+)+$", r"(a|aa)+$", r"(?:a|b|ab)*c"):
+        assert backtracking_risk(risky), risky
+    for safe in (
+        r".*:latest$",
+        r"^.*@(main|master|latest)$",
+        r"\bAKIA[0-9A-Z]{16}\b",
+        r"[a-z]+(-[a-z]+)*",
+        r"(\s*,\s*\w+)*",
+        r"(ab|cd)*$",
+        r"(a|ab)*c",
+    ):
+        assert backtracking_risk(safe) is None, safe
+
+
+def test_shipped_policies_have_no_risky_patterns():
+    assert PolicyRegistry(str(ROOT / "policies")).snapshot().compiled.risky == ()
+
+
+def test_risky_rules_are_flagged_and_refused_by_the_api():
+    rules = [_rule("REDOS", r"^(a+)+$"), _rule("FINE", r":latest$")]
+    assert [rid for rid, _ in compile_rules(rules).risky] == ["REDOS"]
+
+    resp = TestClient(server.app).post(
+        "/v1/validate",
+        json={"files": [{"path": "a.yaml", "content": "kind: Pod\n"}], "rules": rules},
+    )
+    assert resp.status_code == 422
+    assert "REDOS" in resp.json()["detail"]
+
+
+def test_budget_aborts_evaluation_with_a_clear_error():
+    pod = {"kind": "Pod", "spec": {"containers": [{"image": "nginx:latest"}]}}
+    rules = [_rule("SLOW", r":latest$")]
+    expired = Budget(2.0, deadline=0.0)
+    with pytest.raises(BudgetExceeded, match=r"2s budget at rule SLOW \(\$\.spec"):
+        apply_rules(pod, rules, budget=expired)
+    with pytest.raises(BudgetExceeded, match=r"\$\.\.\*"):
+        apply_rules(pod, [_rule("SCAN", "latest", "$..*")], budget=expired)
+    assert apply_rules(pod, rules, budget=Budget(60.0))
+
+
+def test_budget_exceeded_maps_to_422(monkeypatch):
+    monkeypatch.setattr(server, "EVAL_BUDGET", 1e-9)
+    resp = TestClient(server.app).post(
+        "/v1/validate",
+        json={
+            "files": [{"path": "a.yaml", "content": "kind: Pod\nspec: {containers: [{image: x}]}"}],
+            "rules": [_rule("BUDGETED", r":latest$")],
+        },
+    )
+    assert resp.status_code == 422
+    assert "budget" in resp.json()["detail"]
+
+
+def test_re2_engine_is_used_when_requested(monkeypatch):
+    pytest.importorskip("re2")
+    monkeypatch.setenv("YG_REGEX_ENGINE", "re2")
+    assert type(compile_pattern(r"(a+)+$")).__name__ == "Re2Pattern"
+    # look-arounds are not RE2 syntax: fall back to re
+    assert type(compile_pattern(r"foo(?!bar)")).__name__ == "Pattern"
+
+    rules = [_rule("RE2-REDOS", r"^(a+)+$", "$..*"), _rule("RE2-TAG", r":latest$")]
+    ruleset = compile_rules(rules)
+    assert ruleset.risky == ()
+    pod = {"kind": "Pod", "spec": {"containers": [{"image": "nginx:latest", "x": "a" * 40 + "!"}]}}
+    assert [f["rule_id"] for f in apply_rules(pod, ruleset)] == ["RE2-TAG"]
@@ -28,3 +28,53 @@ def test_image_digest_required():
     ]
     f = apply_rules(pod, rules)
     assert f and f[0]["rule_id"] == "PIN_DIGEST"
+
+
+def test_compiled_ruleset_is_cached_and_reusable():
+    from yamlguard.core.rules import CompiledRuleSet, compile_rules
+
+    rules = [
+        {
+            "id": "NO_LATEST",
+            "when": {"kind": "Pod"},
+            "assert": [{"path": "$.spec.containers[*].image", "not_matches": ".*:latest$"}],
+        }
+    ]
+    compiled = compile_rules(rules)
+    assert isinstance(compiled, CompiledRuleSet)
+    # identical rule lists (even with different key order) share one compiled plan
+    assert compile_rules([dict(reversed(list(rules[0].items())))]) is compiled
+    assert compile_rules(compiled) is compiled
+
+    pods = [
+        {"kind": "Pod", "spec": {"containers": [{"image": "nginx:latest"}]}},
+        {"kind": "Service", "spec": {"containers": [{"image": "nginx:latest"}]}},
+    ]
+    assert apply_rules(pods, compiled) == apply_rules(pods, rules)
+    assert len(apply_rules(pods, compiled)) == 1
+
+
+def test_kind_dispatch_orders():
+    rules = [
+        {
+            "id": "POD_LATEST",
+            "when": {"kind": "Pod"},
+            "assert": [{"path": "$.spec.containers[*].image", "not_matches": ":latest$"}],
+        },
+        {"id": "HAS_NAME", "when": {}, "assert": [{"path": "$.metadata.name", "equals": "ok"}]},
+        {
+            "id": "SVC_TYPE",
+            "when": {"kind": "Service"},
+            "assert": [{"path": "$.type", "equals": "A"}],
+        },
+    ]
+    spec = {"containers": [{"image": "a:latest"}]}
+    pod = {"kind": "Pod", "metadata": {"name": "x"}, "spec": spec}
+    svc = {"kind": "Service", "metadata": {"name": "y"}, "type": "B"}
+    docs = [pod, svc, pod]
+
+    by_rule = [f["rule_id"] for f in apply_rules(docs, rules)]
+    assert by_rule == ["POD_LATEST", "POD_LATEST", "HAS_NAME", "HAS_NAME", "HAS_NAME", "SVC_TYPE"]
+
+    by_doc = [f["rule_id"] for f in apply_rules(docs, rules, order="document")]
+    assert by_doc == ["POD_LATEST", "HAS_NAME", "HAS_NAME", "SVC_TYPE", "POD_LATEST", "HAS_NAME"]
@@ -0,0 +1,73 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RUN = [
+    "-m",
+    "yamlguard.cli.main",
+    "examples/pod-mixed.yaml",
+    "--rules",
+    "policies/k8s/core.yaml",
+    "--no-cache",
+    "--no-daemon",
+]
+# What the CLI entry point may cost before it knows whether a daemon serves
+# the run (README: startup budget); measured ~20 ms, with room for slow CI.
+ENTRY_BUDGET_US = 100_000
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)")
+
+
+def _imports(tmp_path, *args) -> dict:
+    """``{module: cumulative microseconds}`` from ``python -X importtime *args``."""
+    env = dict(os.environ, YG_DAEMON_SOCKET=str(tmp_path / "none.sock"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    found = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            found[m.group(3)] = int(m.group(1))
+    assert found, proc.stderr
+    return found
+
+
+def test_cli_entry_point_only_loads_the_daemon_client(tmp_path):
+    found = _imports(tmp_path, "-c", "import yamlguard.cli.main")
+    loaded = [m for m in found if m.split(".")[0] in ("ruamel", "yaml", "jsonpath_ng")]
+    assert loaded + [m for m in found if m.startswith("yamlguard.core")] == []
+    assert found["yamlguard.cli.main"] < ENTRY_BUDGET_US
+
+
+def test_validation_does_not_load_fix_machinery(tmp_path):
+    heavy = ("yamlguard.core.recommend", "difflib", "yamlguard.cli.autofix")
+    found = _imports(tmp_path, *RUN)
+    assert "yamlguard.core.rules" in found
+    assert [m for m in heavy if m in found] == []
+    assert "yamlguard.core.profile" not in found
+    assert "jsonpath_ng" not in found  # the shipped policies' paths are evaluated natively
+
+    found = _imports(tmp_path, *RUN, "--suggest")
+    assert [m for m in heavy[:2] if m in found] == list(heavy[:2])
+
+
+def test_server_import_defers_ui_suggestions_and_optimize(tmp_path):
+    found = _imports(tmp_path, "-c", "import yamlguard.server.main")
+    lazy = (
+        "fastapi.staticfiles",
+        "yamlguard.core.recommend",
+        "yamlguard.core.optimize",
+        "difflib",
+        "jsonpath_ng",
+        "re2",
+    )
+    assert "yamlguard.server.workers" in found
+    assert [m for m in lazy if m in found] == []
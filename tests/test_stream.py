@@ -0,0 +1,108 @@
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from yamlguard.server import main as server
+from yamlguard.server.workers import WorkPool
+
+ROOT = Path(__file__).resolve().parents[1]
+POD = (ROOT / "examples" / "pod-mixed.yaml").read_text(encoding="utf-8")
+RULES = [{"id": "NO_LATEST", "assert": [{"path": "$..image", "not_matches": ":latest$"}]}]
+
+
+def _lines(resp):
+    return [json.loads(ln) for ln in resp.text.splitlines()]
+
+
+def test_ndjson_stream_matches_batch_validate():
+    files = [{"path": f"f{i}.yaml", "content": POD} for i in range(12)]
+    batch = TestClient(server.app).post("/v1/validate", json={"files": files}).json()
+
+    body = "".join(json.dumps(f) + "\n" for f in files)
+    resp = TestClient(server.app).post(
+        "/v1/validate/stream", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+    assert resp.status_code == 200
+    out = _lines(resp)
+    assert [r["path"] for r in out[:-1]] == [f["path"] for f in files]
+    assert [x for r in out[:-1] for x in r["findings"]] == batch["findings"]
+    assert out[-1]["summary"]["files"] == 12
+    assert out[-1]["summary"]["findings"] == len(batch["findings"])
+
+
+def test_ndjson_stream_reports_bad_lines_and_uses_rules_header(monkeypatch):
+    monkeypatch.setattr(server, "MAX_BYTES", 64)  # per-request limit does not apply here
+    body = "\n".join(
+        [
+            json.dumps({"rules": RULES}),
+            json.dumps({"path": "ok.yaml", "content": "image: nginx:1.25\n"}),
+            "{not json",
+            json.dumps({"path": "bad.yaml", "content": "image: nginx:latest\n"}),
+        ]
+    )
+    resp = TestClient(server.app).post(
+        "/v1/validate/stream", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+    out = _lines(resp)
+    assert out[0] == {"path": "ok.yaml", "ok": True, "findings": []}
+    assert "invalid JSON" in out[1]["error"]
+    assert [f["rule_id"] for f in out[2]["findings"]] == ["NO_LATEST"]
+    assert out[3]["summary"] == {"ok": False, "files": 3, "findings": 1, "errors": 1}
+
+
+def test_archive_uploads():
+    tar_buf = io.BytesIO()
+    with tarfile.open(fileobj=tar_buf, mode="w:gz") as tf:
+        for name, data in [("a/pod.yaml", POD), ("README.md", "skip me")]:
+            raw = data.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(raw)
+            tf.addfile(info, io.BytesIO(raw))
+    zip_buf = io.BytesIO()
+    with zipfile.ZipFile(zip_buf, "w") as zf:
+        zf.writestr("a/pod.yaml", POD)
+        zf.writestr("README.md", "skip me")
+
+    client = TestClient(server.app)
+    results = []
+    for ctype, buf in [("application/gzip", tar_buf), ("application/zip", zip_buf)]:
+        resp = client.post(
+            "/v1/validate/stream", content=buf.getvalue(), headers={"content-type": ctype}
+        )
+        assert resp.status_code == 200
+        results.append(_lines(resp))
+    assert results[0] == results[1]
+    assert [r.get("path") for r in results[0]] == ["a/pod.yaml", None]
+    assert results[0][0]["findings"]
+
+    resp = client.post(
+        "/v1/validate/stream", content=b"junk", headers={"content-type": "application/zip"}
+    )
+    assert "invalid zip archive" in _lines(resp)[0]["error"]
+    resp = client.post("/v1/validate/stream", content=b"x", headers={"content-type": "text/plain"})
+    assert resp.status_code == 415
+
+
+def test_stream_holds_a_window_of_pool_slots(monkeypatch):
+    pool = WorkPool(max_pending=4, retry_after=3)
+    monkeypatch.setattr(server, "work_pool", pool)
+    monkeypatch.setattr(server, "STREAM_WINDOW", 3)
+    client = TestClient(server.app)
+    body = "".join(json.dumps({"path": f"{i}.yaml", "content": POD}) + "\n" for i in range(10))
+    headers = {"content-type": "application/x-ndjson"}
+    try:
+        resp = client.post("/v1/validate/stream", content=body, headers=headers)
+        assert _lines(resp)[-1]["summary"]["files"] == 10
+        assert pool.pending == 0
+
+        pool.pending = 2  # another stream holds slots; 2 + 3 > 4
+        resp = client.post("/v1/validate/stream", content=body, headers=headers)
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "3"
+        assert pool.pending == 2
+    finally:
+        pool.shutdown()
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from yamlguard.server import main as server
+from yamlguard.server.workers import Saturated, WorkPool
+
+ROOT = Path(__file__).resolve().parents[1]
+POD = (ROOT / "examples" / "pod-mixed.yaml").read_text(encoding="utf-8")
+
+
+def test_process_pool_matches_inline_results(monkeypatch):
+    client = TestClient(server.app)
+    payload = {"files": [{"path": "a.yaml", "content": POD}, {"path": "b.yaml", "content": POD}]}
+    inline = client.post("/v1/validate", json=payload).json()
+
+    pool = WorkPool(workers=2)
+    monkeypatch.setattr(server, "work_pool", pool)
+    try:
+        pooled = client.post("/v1/validate", json=payload).json()
+    finally:
+        pool.shutdown()
+    assert pooled == inline
+    assert [f["file"] for f in pooled["findings"]][:1] == ["a.yaml"]
+
+
+def test_saturated_pool_answers_503_with_retry_after(monkeypatch):
+    pool = WorkPool(max_pending=1, retry_after=7)
+    pool.pending = 1  # another request is in flight
+    monkeypatch.setattr(server, "work_pool", pool)
+    resp = TestClient(server.app).post(
+        "/v1/validate", json={"files": [{"path": "a.yaml", "content": POD}]}
+    )
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "7"
+    assert TestClient(server.app).get("/health").status_code == 200
+
+
+def _slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_timeout_releases_pending_slots():
+    pool = WorkPool(threads=1, max_pending=2, timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.map(_slow, [(0.3,), (0.3,)])
+        # the running task still holds its slot after the request gave up
+        with pytest.raises(Saturated):
+            await pool.map(_slow, [(0,), (0,)])
+
+    asyncio.run(scenario())
+    time.sleep(0.4)
+    assert pool.pending == 0
+    pool.shutdown()
+
+
+def test_request_larger_than_the_bound_is_rejected(monkeypatch):
+    pool = WorkPool(max_pending=2)
+    monkeypatch.setattr(server, "work_pool", pool)
+    files = [{"path": f"{i}.yaml", "content": POD} for i in range(3)]
+    resp = TestClient(server.app).post("/v1/validate", json={"files": files})
+    assert resp.status_code == 413
+    assert pool.pending == 0